@@ -0,0 +1,235 @@
+"""Motor de animación para los demos de terminal.
+
+Redibujar con os.system('clear') lanza un shell en cada cuadro y
+console.clear() borra la pantalla entera antes de volver a imprimir: las
+dos cosas parpadean y limitan la tasa de cuadros. Aquí cada cuadro es una
+lista de líneas (con códigos ANSI) y TerminalScreen guarda la que está en
+pantalla: al dibujar la siguiente solo reescribe las líneas que cambiaron,
+posicionando el cursor con secuencias ANSI, y lo envía todo en una sola
+escritura. Sin subprocesos y sin borrar la pantalla entre cuadros.
+
+El ritmo lo marca FrameScheduler (pasos de tiempo fijos, compartido con
+keyboard_rgb.py): el cuadro k está programado en inicio + k / fps y los
+cuadros atrasados se saltan.
+
+Lo usan holi.py, pentaquark.py y ondads.py.
+
+Uso:
+    >>> with TerminalScreen() as screen:
+    ...     run_animation(screen, lambda index, t: [f"t = {t:.2f}"], fps=60)
+"""
+
+import re
+import shutil
+import sys
+import time
+
+DEFAULT_FPS = 30
+
+# Secuencias ANSI
+CSI = '\033['
+RESET = f'{CSI}0m'
+BOLD = f'{CSI}1m'
+DIM = f'{CSI}2m'
+ITALIC = f'{CSI}3m'
+HOME = f'{CSI}H'
+CLEAR_SCREEN = f'{CSI}2J'
+CLEAR_LINE = f'{CSI}K'  # Hasta el final de la línea
+CLEAR_BELOW = f'{CSI}J'  # Desde el cursor hasta el final de la pantalla
+HIDE_CURSOR = f'{CSI}?25l'
+SHOW_CURSOR = f'{CSI}?25h'
+ALT_SCREEN_ON = f'{CSI}?1049h'
+ALT_SCREEN_OFF = f'{CSI}?1049l'
+
+ANSI_RE = re.compile(r'\033\[[0-9;?]*[A-Za-z]')
+
+
+def fg256(n):
+    """Color de texto de la paleta de 256 colores."""
+    return f'{CSI}38;5;{n}m'
+
+
+def fg_rgb(r, g, b):
+    """Color de texto RGB (truecolor)."""
+    return f'{CSI}38;2;{r};{g};{b}m'
+
+
+# Los colores del arcoíris de rich (red, orange1, yellow1, green1, cyan,
+# blue, magenta) como números de la paleta de 256 colores
+RAINBOW_ANSI = [fg256(n) for n in (1, 214, 226, 46, 6, 4, 5)]
+
+
+def visible_len(text):
+    """Largo de la línea en pantalla, sin contar los códigos ANSI."""
+    return len(ANSI_RE.sub('', text))
+
+
+def center(text, width=None):
+    """Centra una línea con códigos ANSI en el ancho de la terminal."""
+    width = width or shutil.get_terminal_size().columns
+    return ' ' * max(0, (width - visible_len(text)) // 2) + text
+
+
+def move_to(row, col=1):
+    """Secuencia para mover el cursor (filas y columnas desde 1)."""
+    return f'{CSI}{row};{col}H'
+
+
+class FrameScheduler:
+    """Marca el ritmo de los cuadros con horarios fijos en lugar de pausas fijas.
+
+    El cuadro k está programado en start + k / fps. Tras cada cuadro solo
+    se duerme hasta el siguiente horario; si ya pasó, los cuadros perdidos
+    se saltan (no se envían en ráfaga para recuperar).
+
+    Args:
+        fps: Cuadros por segundo
+        clock: Reloj monótono (segundos)
+        sleep: Función para dormir (segundos)
+
+    Example:
+        >>> for index, t in FrameScheduler(30).ticks(frames=90):
+        ...     send(render(t))
+    """
+
+    def __init__(self, fps=DEFAULT_FPS, clock=time.monotonic, sleep=time.sleep):
+        if fps <= 0:
+            raise ValueError("fps debe ser positivo")
+        self.period = 1.0 / fps
+        self.clock = clock
+        self.sleep = sleep
+        self.frames = 0
+        self.skipped = 0
+        self.max_late = 0.0
+
+    def ticks(self, frames=None, duration=None):
+        """Genera (índice, segundos desde el inicio) en cada horario de cuadro.
+
+        Args:
+            frames: Número de cuadros a generar (None = sin límite)
+            duration: Segundos a generar (None = sin límite)
+        """
+        start = self.clock()
+        index = 0
+        while frames is None or self.frames < frames:
+            now = self.clock()
+            late = now - (start + index * self.period)
+            self.max_late = max(self.max_late, late)
+            if late >= self.period:
+                missed = int(late / self.period)
+                self.skipped += missed
+                index += missed
+            if duration is not None and index * self.period >= duration:
+                return
+            deadline = start + index * self.period
+            if deadline > now:
+                self.sleep(deadline - now)
+            yield index, deadline - start
+            self.frames += 1
+            index += 1
+
+    def stats(self):
+        return {'frames': self.frames, 'skipped': self.skipped,
+                'max_late_ms': round(self.max_late * 1000, 2)}
+
+
+class TerminalScreen:
+    """Pantalla de terminal con doble buffer.
+
+    draw() compara el cuadro nuevo con el que está en pantalla y escribe
+    solo las líneas distintas. Como context manager oculta el cursor y,
+    con alt_screen, usa la pantalla alternativa de la terminal (al salir
+    se recupera lo que había antes); sin ella el último cuadro queda
+    visible y el cursor termina debajo.
+
+    Args:
+        stream: Donde escribir (default: sys.stdout)
+        alt_screen: Usar la pantalla alternativa
+    """
+
+    def __init__(self, stream=None, alt_screen=True):
+        self.stream = stream or sys.stdout
+        self.alt_screen = alt_screen
+        self._front = None  # Cuadro en pantalla (None = hay que borrar todo)
+        self.frames = 0
+        self.lines_written = 0
+        self.bytes_written = 0
+
+    def __enter__(self):
+        self._write((ALT_SCREEN_ON if self.alt_screen else '') + HIDE_CURSOR)
+        self._front = None
+        return self
+
+    def __exit__(self, *exc):
+        tail = RESET + SHOW_CURSOR
+        if self.alt_screen:
+            tail += ALT_SCREEN_OFF
+        elif self._front is not None:
+            tail = move_to(len(self._front) + 1) + tail
+        self._write(tail)
+        return False
+
+    def invalidate(self):
+        """Fuerza a redibujar toda la pantalla en el próximo cuadro."""
+        self._front = None
+
+    def render(self, lines):
+        """Secuencia que lleva la pantalla del cuadro actual a `lines`."""
+        out = []
+        front = self._front
+        if front is None:
+            out.append(HOME + CLEAR_SCREEN)
+            front = []
+        for row, line in enumerate(lines):
+            if row < len(front) and front[row] == line:
+                continue
+            out.append(f'{move_to(row + 1)}{line}{RESET}{CLEAR_LINE}')
+        if len(lines) < len(front):
+            out.append(move_to(len(lines) + 1) + CLEAR_BELOW)
+        return ''.join(out)
+
+    def draw(self, lines):
+        """Dibuja un cuadro (lista de líneas) con una sola escritura.
+
+        Returns:
+            int: Líneas reescritas
+        """
+        lines = list(lines)
+        front = self._front or []
+        changed = sum(1 for row, line in enumerate(lines)
+                      if row >= len(front) or front[row] != line)
+        self._write(self.render(lines))
+        self._front = lines
+        self.frames += 1
+        self.lines_written += changed
+        return changed
+
+    def _write(self, data):
+        if data:
+            self.stream.write(data)
+            self.stream.flush()
+            self.bytes_written += len(data)
+
+    def stats(self):
+        return {'frames': self.frames, 'lines_written': self.lines_written,
+                'bytes_written': self.bytes_written}
+
+
+def run_animation(screen, render, fps=DEFAULT_FPS, frames=None, duration=None, scheduler=None):
+    """Dibuja render(índice, t) en cada paso de un FrameScheduler.
+
+    Args:
+        screen: TerminalScreen (ya abierta)
+        render: Función (índice, segundos) -> lista de líneas
+        fps: Cuadros por segundo
+        frames: Número de cuadros (None = sin límite)
+        duration: Segundos de animación (None = sin límite)
+        scheduler: FrameScheduler a usar (por defecto uno nuevo con `fps`)
+
+    Returns:
+        FrameScheduler: Con las estadísticas de la animación
+    """
+    scheduler = scheduler or FrameScheduler(fps)
+    for index, t in scheduler.ticks(frames, duration):
+        screen.draw(render(index, t))
+    return scheduler
@@ -0,0 +1,139 @@
+"""Fuentes de audio sintéticas y deterministas para pruebas sin micrófono.
+
+El dashboard y los demos de audio leen del micrófono; sin él (servidores,
+CI, pruebas de carga) necesitan una señal que ejercite el análisis de
+bandas igual que el audio real y que sea la misma en cada ejecución:
+
+    sweep:  Barrido senoidal logarítmico que recorre todas las bandas
+    sine:   Tono fijo
+    noise:  Ruido uniforme con semilla fija
+    file:   Clip grabado (.npy, .wav o .flac, como los de hydra_observer)
+
+Cada fuente es un generador infinito de bloques (blocksize, 1) float32.
+paced() los entrega al ritmo del tiempo real, como lo haría el micrófono.
+
+Especificación en texto (DASHBOARD_AUDIO_SOURCE, --source):
+    sweep                 Barrido de 55 a 8000 Hz cada 5 s
+    sweep:100-4000:2      Barrido de 100 a 4000 Hz cada 2 s
+    sine:440              Tono de 440 Hz
+    noise / noise:7       Ruido con semilla 0 / 7
+    file:logs/clip.npy    Clip en bucle (también basta con la ruta)
+
+Uso:
+    >>> blocks = parse_source('sweep', fs=44100, blocksize=4410)
+    >>> for block in paced(blocks, fs=44100, blocksize=4410):
+    ...     bands = band_amps(block, 44100, 7)
+"""
+
+import os
+
+import numpy as np
+
+from animation import FrameScheduler
+
+SWEEP_START = 55.0
+SWEEP_END = 8000.0
+SWEEP_PERIOD = 5.0
+AMPLITUDE = 0.5
+AUDIO_EXTENSIONS = ('.npy', '.wav', '.flac')
+
+
+def sine_sweep(fs, blocksize, f_start=SWEEP_START, f_end=SWEEP_END, period=SWEEP_PERIOD,
+               amplitude=AMPLITUDE):
+    """Barrido logarítmico de f_start a f_end que se repite cada `period` segundos.
+
+    La fase se acumula entre bloques, así que la señal es continua.
+    """
+    if not 0 < f_start < f_end:
+        raise ValueError("El barrido requiere 0 < f_start < f_end")
+    ratio = np.log(f_end / f_start)
+    n = 0
+    phase = 0.0
+    offsets = np.arange(blocksize)
+    while True:
+        t = ((n + offsets) / fs) % period
+        freqs = f_start * np.exp(ratio * t / period)
+        phases = phase + np.cumsum(2 * np.pi * freqs / fs)
+        phase = float(phases[-1] % (2 * np.pi))
+        n += blocksize
+        yield (amplitude * np.sin(phases)).astype(np.float32).reshape(-1, 1)
+
+
+def sine(fs, blocksize, freq=440.0, amplitude=AMPLITUDE):
+    """Tono fijo (continuo entre bloques)."""
+    n = 0
+    offsets = np.arange(blocksize)
+    while True:
+        t = (n + offsets) / fs
+        n += blocksize
+        yield (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32).reshape(-1, 1)
+
+
+def noise(fs, blocksize, seed=0, amplitude=AMPLITUDE):
+    """Ruido uniforme reproducible (misma semilla, mismos bloques)."""
+    rng = np.random.default_rng(seed)
+    while True:
+        yield rng.uniform(-amplitude, amplitude, size=(blocksize, 1)).astype(np.float32)
+
+
+def file_blocks(path, blocksize, loop=True):
+    """Bloques de un clip grabado, mezclado a mono y en bucle.
+
+    La frecuencia de muestreo del archivo se ignora: los bloques se
+    entregan al ritmo que indique quien los consume.
+    """
+    # Import diferido: hydra_replay arrastra el motor de reglas y los logs
+    from hydra_replay import load_audio
+
+    data, _ = load_audio(path)
+    mono = data.mean(axis=1, dtype=np.float32)
+    if len(mono) < blocksize:
+        raise ValueError(f"{path}: el clip es más corto que un bloque ({blocksize} muestras)")
+    while True:
+        for start in range(0, len(mono) - blocksize + 1, blocksize):
+            yield mono[start:start + blocksize].reshape(-1, 1)
+        if not loop:
+            return
+
+
+def parse_source(spec, fs, blocksize):
+    """Crea una fuente a partir de su especificación en texto.
+
+    Raises:
+        ValueError: Si la especificación no es válida
+    """
+    kind, _, arg = spec.partition(':')
+    try:
+        if kind == 'sweep':
+            if not arg:
+                return sine_sweep(fs, blocksize)
+            bounds, _, period = arg.partition(':')
+            f_start, f_end = (float(f) for f in bounds.split('-'))
+            return sine_sweep(fs, blocksize, f_start, f_end, float(period or SWEEP_PERIOD))
+        if kind == 'sine':
+            return sine(fs, blocksize, float(arg or 440.0))
+        if kind == 'noise':
+            return noise(fs, blocksize, int(arg or 0))
+    except ValueError as e:
+        raise ValueError(f"Fuente de audio inválida '{spec}': {e}") from None
+    if kind == 'file':
+        return file_blocks(arg, blocksize)
+    if os.path.splitext(spec)[1].lower() in AUDIO_EXTENSIONS:
+        return file_blocks(spec, blocksize)
+    raise ValueError(f"Fuente de audio desconocida '{spec}' (sweep, sine, noise o file:ruta)")
+
+
+def check_source(spec, fs, blocksize):
+    """Crea la fuente y lee un bloque para detectar errores antes de usarla.
+
+    Raises:
+        ValueError: Si la especificación o el clip no son válidos
+        OSError: Si el archivo del clip no se puede leer
+    """
+    next(parse_source(spec, fs, blocksize))
+
+
+def paced(blocks, fs, blocksize):
+    """Entrega los bloques al ritmo del tiempo real (un bloque cada blocksize/fs s)."""
+    for (_index, _t), block in zip(FrameScheduler(fs / blocksize).ticks(), blocks):
+        yield block
@@ -0,0 +1,66 @@
+"""
+Benchmarks del análisis de audio y del dibujo del visualizador de terminal.
+"""
+import io
+
+import numpy as np
+import pytest
+
+import ondads
+from animation import TerminalScreen
+from spectrum import normalized_band_amps
+
+FS = 44100
+BLOCKSIZES = (512, 2205, 4410, 8192)  # keyboard_rgb, ondads, dashboard, bloque largo
+BAND_COUNTS = (7, 24, 64)
+
+
+def audio_block(blocksize, seed=0):
+    """Bloque reproducible: dos tonos más ruido, como el micrófono."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(blocksize) / FS
+    signal = 0.5 * np.sin(2 * np.pi * 440 * t) + 0.2 * np.sin(2 * np.pi * 3000 * t)
+    return (signal + 0.05 * rng.standard_normal(blocksize)).reshape(-1, 1)
+
+
+@pytest.mark.parametrize('n_bands', BAND_COUNTS)
+@pytest.mark.parametrize('blocksize', BLOCKSIZES)
+def bench_get_band_amps(benchmark, blocksize, n_bands):
+    benchmark.group = 'get_band_amps'
+    block = audio_block(blocksize)
+    amps = benchmark(ondads.get_band_amps, block, FS, n_bands)
+    assert len(amps) == n_bands
+
+
+@pytest.mark.parametrize('n_bands', (7, 64))
+def bench_normalized_band_amps(benchmark, n_bands):
+    """Variante del dashboard (lista normalizada para enviar por WebSocket)."""
+    benchmark.group = 'get_band_amps'
+    block = audio_block(4410)
+    amps = benchmark(normalized_band_amps, block, FS, n_bands)
+    assert len(amps) == n_bands
+
+
+def bench_visualizer_render_bars(benchmark):
+    """Paso de render de run_visualizer: análisis, ganancias y línea de barras."""
+    benchmark.group = 'run_visualizer'
+    block = audio_block(ondads.BLOCKSIZE)
+    line = benchmark(ondads.render_bars, block)
+    assert '█' in line
+
+
+def bench_visualizer_frame(benchmark):
+    """Cuadro completo: render de barras y escritura en la pantalla ANSI."""
+    benchmark.group = 'run_visualizer'
+    blocks = [audio_block(ondads.BLOCKSIZE, seed) for seed in range(16)]
+    screen = TerminalScreen(stream=io.StringIO())
+    counter = iter(range(1 << 30))
+
+    def frame():
+        screen.stream.seek(0)
+        screen.stream.truncate()
+        screen.draw(['Presiona Ctrl+C para detener', '',
+                     ondads.render_bars(blocks[next(counter) % len(blocks)])])
+
+    benchmark(frame)
+    assert screen.frames > 0
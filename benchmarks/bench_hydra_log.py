@@ -0,0 +1,51 @@
+"""
+Benchmarks de escritura de logs de hydra_observer (hydra_log.SessionLogWriter).
+
+Se miden por separado el coste en el thread que registra el evento
+(write(): solo encola) y el rendimiento de punta a punta del thread
+escritor (serializar a NDJSON, comprimir y escribir a disco).
+"""
+import itertools
+
+import pytest
+
+from hydra_log import SessionLogWriter
+
+EVENTS = 5000
+
+
+def event(i):
+    return {'time': 1700000000.0 + i * 0.01, 'event': 'key',
+            'info': {'key': 'a', 'window': 'README.md - Visual Studio Code', 'n': i}}
+
+
+def bench_log_write_enqueue(benchmark, tmp_path):
+    """Coste de write() para el thread de teclado/ratón."""
+    benchmark.group = 'hydra log'
+    writer = SessionLogWriter(str(tmp_path), 'bench', max_queue=1_000_000).start()
+    counter = itertools.count()
+    try:
+        assert benchmark(lambda: writer.write(event(next(counter))))
+    finally:
+        writer.close()
+    assert writer.dropped == 0
+
+
+@pytest.mark.parametrize('compress', (None, 'gzip'))
+def bench_log_write_throughput(benchmark, tmp_path, compress):
+    """EVENTS eventos de punta a punta, hasta quedar en disco."""
+    benchmark.group = 'hydra log'
+    benchmark.extra_info['events'] = EVENTS
+    entries = [event(i) for i in range(EVENTS)]
+    runs = itertools.count()
+
+    def run():
+        writer = SessionLogWriter(str(tmp_path / str(next(runs))), 'bench', compress=compress,
+                                  max_queue=EVENTS * 2, fsync_interval=3600).start()
+        for entry in entries:
+            writer.write(entry)
+        writer.close()
+        return writer
+
+    writer = benchmark.pedantic(run, rounds=5, warmup_rounds=1)
+    assert writer.written == EVENTS
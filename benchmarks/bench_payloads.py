@@ -0,0 +1,69 @@
+"""
+Benchmarks de codificación del payload de audio para WebSocket: JSON vs binario.
+
+Candidatos para el evento audio_update del dashboard:
+    json:    {"bands": [0.12, ...]} como lo envía hoy dashboard.py
+    float32: bandas como float32 little-endian (4 bytes por banda)
+    uint8:   bandas cuantizadas a 0-255 (1 byte por banda, suficiente para
+             una barra de 150 px)
+"""
+import json
+
+import numpy as np
+import pytest
+
+BAND_COUNTS = (7, 64, 256)
+
+
+def bands(n_bands, seed=0):
+    return np.random.default_rng(seed).random(n_bands).tolist()
+
+
+def encode_json(values):
+    return json.dumps({'bands': values}, separators=(',', ':')).encode()
+
+
+def decode_json(payload):
+    return json.loads(payload)['bands']
+
+
+def encode_float32(values):
+    return np.asarray(values, dtype='<f4').tobytes()
+
+
+def decode_float32(payload):
+    return np.frombuffer(payload, dtype='<f4')
+
+
+def encode_uint8(values):
+    return np.round(np.clip(values, 0.0, 1.0) * 255).astype(np.uint8).tobytes()
+
+
+def decode_uint8(payload):
+    return np.frombuffer(payload, dtype=np.uint8) / 255.0
+
+
+CODECS = {
+    'json': (encode_json, decode_json),
+    'float32': (encode_float32, decode_float32),
+    'uint8': (encode_uint8, decode_uint8),
+}
+
+
+@pytest.mark.parametrize('codec', CODECS)
+@pytest.mark.parametrize('n_bands', BAND_COUNTS)
+def bench_encode_payload(benchmark, codec, n_bands):
+    benchmark.group = f'payload encode ({n_bands} bandas)'
+    encode, decode = CODECS[codec]
+    values = bands(n_bands)
+    payload = benchmark(encode, values)
+    benchmark.extra_info['bytes'] = len(payload)
+    assert np.allclose(decode(payload), values, atol=1 / 255)
+
+
+@pytest.mark.parametrize('codec', CODECS)
+def bench_decode_payload(benchmark, codec):
+    benchmark.group = 'payload decode (64 bandas)'
+    encode, decode = CODECS[codec]
+    payload = encode(bands(64))
+    assert len(benchmark(decode, payload)) == 64
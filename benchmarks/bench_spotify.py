@@ -0,0 +1,50 @@
+"""
+Benchmarks del caché de búsquedas de spotify_live bajo contención.
+
+Varios threads (como los del servidor Flask con threaded=True) consultan
+y guardan búsquedas a la vez; cache_lookup y cache_store comparten un
+único lock, así que lo que se mide es el coste de esa serialización.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from spotify_live import app as spotify_app
+
+OPS_PER_THREAD = 2000
+QUERIES = [f'query {i}' for i in range(150)]  # Más que CACHE_MAX_SIZE: fuerza desalojos
+TRACKS = [{'id': f'{i:022d}', 'name': f'Track {i}', 'artists': 'Artist'} for i in range(5)]
+
+
+@pytest.fixture
+def search_cache():
+    spotify_app.SEARCH_CACHE.clear()
+    yield spotify_app
+    spotify_app.SEARCH_CACHE.clear()
+
+
+def worker(app, offset, hit_ratio):
+    """Mezcla de aciertos y fallos: cada fallo se guarda, como search_tracks()."""
+    hot = QUERIES[:int(len(QUERIES) * hit_ratio) or 1]
+    for i in range(OPS_PER_THREAD):
+        query = hot[(offset + i) % len(hot)] if i % 4 else QUERIES[(offset * 7 + i) % len(QUERIES)]
+        if app.cache_lookup(query) is None:
+            app.cache_store(query, TRACKS)
+
+
+@pytest.mark.parametrize('threads', (1, 4, 16))
+def bench_search_cache_contention(benchmark, search_cache, threads):
+    benchmark.group = 'search cache'
+    benchmark.extra_info['ops'] = threads * OPS_PER_THREAD
+    with ThreadPoolExecutor(threads) as pool:
+        def run():
+            start = threading.Barrier(threads)
+
+            def task(offset):
+                start.wait()
+                worker(search_cache, offset, hit_ratio=0.5)
+
+            list(pool.map(task, range(threads)))
+
+        benchmark.pedantic(run, rounds=5, warmup_rounds=1)
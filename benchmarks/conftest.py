@@ -0,0 +1,12 @@
+"""Configuración común de los benchmarks."""
+import os
+import sys
+from pathlib import Path
+
+# Agregar el directorio raíz al path para importar módulos
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Credenciales ficticias: spotify_live.app crea SpotifyOAuth al importarse
+os.environ.setdefault('SPOTIPY_CLIENT_ID', 'bench_id')
+os.environ.setdefault('SPOTIPY_CLIENT_SECRET', 'bench_secret')
+os.environ.setdefault('FLASK_SECRET', 'bench_secret')
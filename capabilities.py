@@ -0,0 +1,135 @@
+"""Detección de componentes opcionales sin importarlos.
+
+Importar un módulo solo para saber si está instalado cuesta lo mismo que
+usarlo: sounddevice carga PortAudio, spotipy arrastra requests, etc. En
+una Raspberry Pi eso son segundos de arranque para componentes que quizá
+nunca se usen. Aquí la detección usa importlib.util.find_spec (busca el
+módulo en sys.path sin ejecutarlo) y la importación real se hace en el
+primer uso, desde el thread que lo necesita.
+
+También lleva la cuenta de cuánto tarda cada importación diferida y de
+las etapas del arranque, para mostrar un informe de tiempos.
+
+Uso:
+    >>> sd = OptionalModule('sounddevice')
+    >>> sd.installed          # find_spec, sin importar
+    True
+    >>> sd.InputStream        # Se importa aquí
+    >>> sd.available          # False si la importación falló (p. ej. sin PortAudio)
+"""
+
+import importlib
+import importlib.util
+import threading
+import time
+
+# {módulo: ms} importaciones diferidas ya realizadas
+IMPORT_TIMES = {}
+
+
+def module_available(name):
+    """True si el módulo está instalado (sin importarlo).
+
+    Para submódulos ('a.b') find_spec importa el paquete padre; se
+    recomienda pasar solo el nombre del paquete.
+    """
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class OptionalModule:
+    """Módulo opcional que se importa la primera vez que se usa.
+
+    Los atributos se resuelven contra el módulo real (sd.InputStream,
+    openrgb.OpenRGBClient...). Si la importación falla el error se guarda,
+    `available` pasa a False y el acceso a atributos lanza ImportError.
+
+    Args:
+        name: Nombre del módulo
+        errors: Excepciones que indican que el módulo no se puede usar
+            (algunos lanzan OSError o NotImplementedError al importarse)
+    """
+
+    def __init__(self, name, errors=(ImportError, OSError)):
+        self.name = name
+        self.installed = module_available(name)
+        self.error = None
+        self._errors = errors
+        self._module = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        """Instalado y, si ya se intentó importar, sin errores."""
+        return self.installed and self.error is None
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def load(self):
+        """Importa el módulo (una sola vez).
+
+        Returns:
+            module o None si no está instalado o falló la importación
+        """
+        if self._module is not None or not self.available:
+            return self._module
+        with self._lock:
+            if self._module is None and self.error is None:
+                started = time.perf_counter()
+                try:
+                    self._module = importlib.import_module(self.name)
+                except self._errors as e:
+                    self.error = e
+                IMPORT_TIMES[self.name] = (time.perf_counter() - started) * 1000
+        return self._module
+
+    def __getattr__(self, attr):
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        module = self.load()
+        if module is None:
+            reason = self.error or 'no instalado'
+            raise ImportError(f"{self.name} no disponible: {reason}")
+        return getattr(module, attr)
+
+    def __repr__(self):
+        state = 'cargado' if self.loaded else ('no disponible' if not self.available else 'diferido')
+        return f"<OptionalModule {self.name} ({state})>"
+
+
+class StartupTimer:
+    """Marca las etapas del arranque y arma un informe de tiempos.
+
+    Example:
+        >>> timer = StartupTimer()
+        >>> import dashboard
+        >>> timer.mark('import dashboard')
+        >>> print(timer.report())
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.stages = []  # [(etapa, ms)]
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages.append((stage, (now - self._last) * 1000))
+        self._last = now
+
+    @property
+    def total_ms(self):
+        return (self._last - self.started) * 1000
+
+    def report(self):
+        """Texto con cada etapa y las importaciones diferidas ya hechas."""
+        lines = [f"⏱  Arranque en {self.total_ms:.0f} ms"]
+        lines += [f"   {stage:<28} {ms:7.1f} ms" for stage, ms in self.stages]
+        if IMPORT_TIMES:
+            lines.append("   Importaciones diferidas:")
+            lines += [f"     {name:<26} {ms:7.1f} ms" for name, ms in IMPORT_TIMES.items()]
+        return '\n'.join(lines)
@@ -0,0 +1,307 @@
+"""Recolectores de datos del dashboard sobre un pool de threads compartido.
+
+Cada fuente de datos (métricas del sistema, estado de OpenRGB, Spotify...)
+es un Collector: una función que devuelve un dict y declara cada cuánto se
+ejecuta (interval), cuánto puede tardar como máximo (timeout) y qué claves
+y tipos devuelve (schema). El CollectorScheduler los ejecuta en un único
+ThreadPoolExecutor y publica los resultados en un StateStore versionado.
+
+Reglas del scheduler:
+    - Un collector nunca tiene más de una ejecución en curso: si le toca
+      otra vez y la anterior no terminó, esa vez se salta (no se encolan)
+    - Si el scheduler se retrasa más de un intervalo, las ejecuciones
+      perdidas se saltan y se reprograma desde ahora
+    - Un resultado que llega fuera de presupuesto (timeout) o que no
+      cumple el schema no se publica
+    - El audio no es un collector: tiene su propio thread y solo escribe
+      en el StateStore, que no se bloquea mientras un collector trabaja
+
+Uso:
+    >>> registry = CollectorRegistry()
+    >>> @registry.register('system', interval=2.0, timeout=1.0,
+    ...                    schema={'cpu': float, 'memory': float})
+    ... def collect_system():
+    ...     return {'cpu': psutil.cpu_percent(), 'memory': psutil.virtual_memory().percent}
+    >>> store = StateStore()
+    >>> scheduler = CollectorScheduler(registry, store)
+    >>> scheduler.start()
+    >>> store.snapshot()
+    (3, {'cpu': 12.5, 'memory': 48.1})
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+TICK = 0.05  # Segundos entre revisiones del scheduler
+
+
+class StateStore:
+    """Estado compartido con número de versión.
+
+    Cada update() que cambia algún valor incrementa la versión global, y
+    cada clave recuerda la versión en la que cambió por última vez; así
+    los clientes pueden pedir solo lo que cambió desde su última lectura.
+
+    Args:
+        initial: Valores iniciales (versión 0)
+    """
+
+    def __init__(self, initial=None):
+        self._lock = threading.Lock()
+        self._values = dict(initial or {})
+        self._versions = dict.fromkeys(self._values, 0)
+        self.version = 0
+
+    def update(self, values):
+        """Publica valores; las claves sin cambios no suben de versión.
+
+        Returns:
+            int: Versión del estado tras la actualización
+        """
+        with self._lock:
+            changed = [key for key, value in values.items()
+                       if key not in self._values or self._values[key] != value]
+            if changed:
+                self.version += 1
+                for key in changed:
+                    self._values[key] = values[key]
+                    self._versions[key] = self.version
+            return self.version
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._values.get(key, default)
+
+    def snapshot(self, keys=None):
+        """Copia consistente del estado.
+
+        Args:
+            keys: Claves a incluir (None = todas)
+
+        Returns:
+            tuple: (versión, dict)
+        """
+        with self._lock:
+            if keys is None:
+                return self.version, dict(self._values)
+            return self.version, {key: self._values.get(key) for key in keys}
+
+    def changes_since(self, version):
+        """Claves que cambiaron después de `version`.
+
+        Returns:
+            tuple: (versión actual, dict con las claves modificadas)
+        """
+        with self._lock:
+            return self.version, {key: self._values[key]
+                                  for key, v in self._versions.items() if v > version}
+
+
+class Collector:
+    """Fuente de datos periódica.
+
+    Args:
+        name: Nombre único
+        fn: Función sin argumentos que devuelve un dict
+        interval: Segundos entre ejecuciones
+        timeout: Presupuesto de tiempo por ejecución (default: interval)
+        schema: {clave: tipo o tupla de tipos} que debe cumplir el resultado
+            (None = sin validación)
+        event: Evento WebSocket con el que se emiten los resultados (opcional)
+    """
+
+    def __init__(self, name, fn, interval, timeout=None, schema=None, event=None):
+        if interval <= 0:
+            raise ValueError(f"{name}: interval debe ser positivo")
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.timeout = timeout if timeout is not None else interval
+        self.schema = schema
+        self.event = event
+        self.runs = 0
+        self.skipped = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.last_ms = None
+        self.max_ms = 0.0
+        self.last_error = None
+
+    def validate(self, values):
+        """Comprueba el resultado contra el schema.
+
+        Raises:
+            ValueError: Si no es un dict o no cumple el schema
+        """
+        if not isinstance(values, dict):
+            raise ValueError(f"{self.name}: se esperaba dict, no {type(values).__name__}")
+        if self.schema is None:
+            return
+        missing = set(self.schema) - set(values)
+        extra = set(values) - set(self.schema)
+        if missing or extra:
+            raise ValueError(f"{self.name}: claves faltantes {sorted(missing)}, "
+                             f"sobrantes {sorted(extra)}")
+        for key, kind in self.schema.items():
+            if not isinstance(values[key], kind):
+                raise ValueError(f"{self.name}.{key}: tipo {type(values[key]).__name__} inválido")
+
+    def stats(self):
+        return {
+            'interval': self.interval,
+            'timeout': self.timeout,
+            'runs': self.runs,
+            'skipped': self.skipped,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'last_ms': round(self.last_ms, 2) if self.last_ms is not None else None,
+            'max_ms': round(self.max_ms, 2),
+            'last_error': self.last_error,
+        }
+
+
+class CollectorRegistry:
+    """Colección de collectors, con un decorador para registrarlos."""
+
+    def __init__(self):
+        self.collectors = {}
+
+    def add(self, collector):
+        if collector.name in self.collectors:
+            raise ValueError(f"Collector duplicado: {collector.name}")
+        self.collectors[collector.name] = collector
+        return collector
+
+    def register(self, name, interval, timeout=None, schema=None, event=None):
+        """Decorador que registra una función como collector."""
+        def decorator(fn):
+            self.add(Collector(name, fn, interval, timeout, schema, event))
+            return fn
+        return decorator
+
+    def __iter__(self):
+        return iter(self.collectors.values())
+
+    def __len__(self):
+        return len(self.collectors)
+
+
+class CollectorScheduler:
+    """Ejecuta los collectors de un registry en un pool compartido.
+
+    Args:
+        registry: CollectorRegistry
+        store: StateStore donde publicar los resultados
+        workers: Threads del pool (default: uno por collector, para que uno
+            lento no retrase a los demás; 0 = ejecutar en el thread que
+            llama a tick(), útil en tests)
+        on_publish: Callback(collector, values, version) tras cada publicación
+        clock: Reloj monotónico (inyectable en tests)
+    """
+
+    def __init__(self, registry, store, workers=None, on_publish=None, clock=time.monotonic):
+        self.registry = registry
+        self.store = store
+        self.on_publish = on_publish
+        self.clock = clock
+        workers = len(registry) if workers is None else workers
+        self._executor = (ThreadPoolExecutor(max(1, workers), thread_name_prefix='collector')
+                          if workers > 0 else None)
+        self._lock = threading.Lock()
+        self._next_run = {}
+        self._started = {}  # {nombre: inicio} de las ejecuciones en curso
+        self._over_budget = set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def tick(self, now=None):
+        """Lanza los collectors a los que les toca ejecutarse.
+
+        Returns:
+            list: Nombres de los collectors lanzados
+        """
+        now = self.clock() if now is None else now
+        launched = []
+        for collector in self.registry:
+            name = collector.name
+            due = self._next_run.get(name, now)
+            if due > now:
+                continue
+            # Ejecuciones perdidas por retraso del scheduler: se saltan
+            missed = int((now - due) // collector.interval)
+            collector.skipped += missed
+            self._next_run[name] = due + (missed + 1) * collector.interval
+
+            with self._lock:
+                started = self._started.get(name)
+                if started is not None:
+                    # Sigue en curso: no se encola otra ejecución
+                    collector.skipped += 1
+                    if now - started > collector.timeout and name not in self._over_budget:
+                        self._over_budget.add(name)
+                        collector.timeouts += 1
+                        collector.last_error = 'timeout'
+                    continue
+                self._started[name] = now
+            launched.append(name)
+            if self._executor is None:
+                self._run(collector, now)
+            else:
+                self._executor.submit(self._run, collector, now)
+        return launched
+
+    def _run(self, collector, started):
+        t0 = time.perf_counter()
+        try:
+            values = collector.fn()
+            collector.validate(values)
+        except Exception as e:
+            values = None
+            collector.errors += 1
+            collector.last_error = str(e)
+        elapsed = time.perf_counter() - t0
+        collector.runs += 1
+        collector.last_ms = elapsed * 1000
+        collector.max_ms = max(collector.max_ms, collector.last_ms)
+
+        with self._lock:
+            del self._started[collector.name]
+            flagged = collector.name in self._over_budget
+            self._over_budget.discard(collector.name)
+        if values is None:
+            return
+        if elapsed > collector.timeout:
+            # Fuera de presupuesto: el dato ya es viejo, no se publica
+            if not flagged:
+                collector.timeouts += 1
+            collector.last_error = 'timeout'
+            return
+        collector.last_error = None
+        version = self.store.update(values)
+        if self.on_publish is not None:
+            self.on_publish(collector, values, version)
+
+    def _loop(self):
+        while not self._stop.wait(TICK):
+            self.tick()
+
+    def start(self):
+        """Primera ronda inmediata y luego el thread del scheduler."""
+        if self._thread is None:
+            self.tick()
+            self._thread = threading.Thread(target=self._loop, daemon=True,
+                                            name='collector-scheduler')
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def stats(self):
+        """{nombre: estadísticas} de cada collector."""
+        return {collector.name: collector.stats() for collector in self.registry}
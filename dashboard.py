@@ -17,6 +17,12 @@ Características:
 
 Variables de entorno opcionales:
     DASHBOARD_PORT: Puerto del servidor (default: 5000)
+    DASHBOARD_AUDIO_BANDS: Bandas del visualizador de audio (default: 7)
+    DASHBOARD_AUDIO_FPS: Cuadros de audio por segundo enviados a los
+        clientes (default: 10, máximo 10: uno por bloque de audio); el
+        navegador interpola entre ellos
+    DASHBOARD_AUDIO_SOURCE: Fuente sintética en lugar del micrófono
+        (sweep, sine:440, noise, file:clip.npy; ver audio_sources.py)
     SPOTIPY_CLIENT_ID: Para integración con Spotify
     SPOTIPY_CLIENT_SECRET: Para integración con Spotify
 
@@ -26,39 +32,46 @@ Uso:
 El servidor escucha en http://0.0.0.0:5000
 """
 
-import os
-import time
-import threading
-import psutil
-import numpy as np
-from flask import Flask, render_template, jsonify
-from flask_socketio import SocketIO, emit
-
-# Importar componentes existentes
-try:
-    import sounddevice as sd
-    AUDIO_AVAILABLE = True
-except (ImportError, OSError):
-    AUDIO_AVAILABLE = False
-
-try:
-    import pygetwindow as gw
-    WINDOW_TRACKING = True
-except (ImportError, ModuleNotFoundError):
-    WINDOW_TRACKING = False
-
-try:
-    from openrgb import OpenRGBClient
-    RGB_AVAILABLE = True
-except ImportError:
-    RGB_AVAILABLE = False
-
-try:
-    import spotipy  # noqa: F401
-    from spotipy.oauth2 import SpotifyOAuth  # noqa: F401
-    SPOTIFY_AVAILABLE = True
-except ImportError:
-    SPOTIFY_AVAILABLE = False
+# El timer se crea antes que nada para que el informe de arranque incluya
+# el coste de las importaciones (Flask, Socket.IO y numpy son lo más caro)
+from capabilities import OptionalModule, StartupTimer, module_available
+
+STARTUP = StartupTimer()
+
+import os  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+import threading  # noqa: E402
+import psutil  # noqa: E402
+import numpy as np  # noqa: E402
+
+STARTUP.mark('import numpy, psutil')
+
+from flask import (  # noqa: E402
+    Flask, Response, abort, render_template, jsonify, request, send_file
+)
+
+STARTUP.mark('import flask')
+
+from flask_socketio import SocketIO, emit  # noqa: E402
+
+STARTUP.mark('import flask_socketio')
+
+from audio_sources import check_source, noise, paced, parse_source  # noqa: E402
+from collectors import CollectorRegistry, CollectorScheduler, StateStore  # noqa: E402
+from spectrum import normalized_band_amps  # noqa: E402
+from static_assets import StaticAssets  # noqa: E402
+from window_tracker import WINDOW_TRACKING, tracker as window_tracker  # noqa: E402
+
+STARTUP.mark('import módulos de rainvow')
+
+# Componentes opcionales: se detectan sin importarlos y se importan en el
+# primer uso, desde el thread que los necesita (ver capabilities.py)
+sd = OptionalModule('sounddevice')
+openrgb = OptionalModule('openrgb')
+AUDIO_AVAILABLE = sd.installed
+RGB_AVAILABLE = openrgb.installed
+SPOTIFY_AVAILABLE = module_available('spotipy')
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET', 'rainvow-dashboard-secret')
@@ -67,24 +80,43 @@ app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET', 'rainvow-dashboard-sec
 cors_origins = os.environ.get('DASHBOARD_CORS_ORIGINS', 'http://localhost:*,http://127.0.0.1:*')
 socketio = SocketIO(app, cors_allowed_origins=cors_origins)
 
-# Estado global del sistema
-system_state = {
-    'cpu': 0,
-    'memory': 0,
-    'active_window': 'N/A',
-    'audio_bands': [0] * 7,
-    'spotify': None,
-    'rgb_status': 'disconnected',
-    'uptime': time.time()
+# Librerías JS locales con hash en el nombre (ver static_assets.py)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+assets = StaticAssets()
+app.jinja_env.globals['asset_url'] = assets.url
+# Demos enlazados desde el dashboard: {ruta: archivo}
+DEMO_PAGES = {
+    'ar.html': 'ar.html',
+    'pdf_overlay.html': 'pdf_overlay.html',
+    'aurawave/': os.path.join('aurawave', 'index.html'),
 }
 
-state_lock = threading.Lock()
-
 # Configuración de audio
 FS = 44100
 DURATION = 0.1
 BLOCKSIZE = int(FS * DURATION)
-N_BANDS = 7
+N_BANDS = int(os.environ.get('DASHBOARD_AUDIO_BANDS', 7))
+AUDIO_EMIT_INTERVAL = 1.0 / float(os.environ.get('DASHBOARD_AUDIO_FPS', 10))
+# Se envía uno de cada AUDIO_EMIT_EVERY bloques: contar bloques en lugar de
+# comparar con el reloj evita perder cuadros cuando el intervalo de envío
+# coincide con la duración del bloque y el bloque llega con algo de jitter
+AUDIO_EMIT_EVERY = max(1, round(AUDIO_EMIT_INTERVAL / DURATION))
+AUDIO_SOURCE = os.environ.get('DASHBOARD_AUDIO_SOURCE')
+
+# Estado global del sistema: lo escriben los collectors y el thread de
+# audio, lo leen la API y el WebSocket (ver collectors.py)
+state = StateStore({
+    'cpu': 0,
+    'memory': 0,
+    'active_window': 'N/A',
+    'audio_bands': [0] * N_BANDS,
+    'spotify': None,
+    'rgb_status': 'disconnected'
+})
+STARTED = time.time()
+SYSTEM_KEYS = ('cpu', 'memory', 'active_window')
+
+registry = CollectorRegistry()
 
 
 def get_band_amps(audio_block: np.ndarray, fs: int, n_bands: int) -> list:
@@ -98,103 +130,94 @@ def get_band_amps(audio_block: np.ndarray, fs: int, n_bands: int) -> list:
     Returns:
         Lista de amplitudes normalizadas [0-1]
     """
-    if len(audio_block.shape) == 1:
-        audio_data = audio_block
-    else:
-        audio_data = audio_block[:, 0]
+    return normalized_band_amps(audio_block, fs, n_bands)
 
-    fft = np.fft.rfft(audio_data * np.hanning(len(audio_data)))
-    mag = np.abs(fft)
-    freqs = np.fft.rfftfreq(len(audio_data), 1 / fs)
-    max_freq = fs // 2
-    band_edges = np.linspace(0, max_freq, n_bands + 1)
 
-    amps = []
-    for i in range(n_bands):
-        idx = np.where((freqs >= band_edges[i]) & (freqs < band_edges[i + 1]))[0]
-        if len(idx) > 0:
-            amps.append(float(mag[idx].max()))
-        else:
-            amps.append(0.0)
+def audio_blocks():
+    """Bloques de audio: la fuente sintética si se configuró, si no el micrófono.
 
-    # Normalizar logarítmicamente
-    amps = np.log1p(amps)
-    max_amp = max(amps) if max(amps) > 0 else 1
-    return [float(a / max_amp) for a in amps]
+    Si la fuente o el micrófono fallan se sigue con ruido al mismo ritmo,
+    para que el visualizador no se congele.
+    """
+    if AUDIO_SOURCE:
+        try:
+            yield from paced(parse_source(AUDIO_SOURCE, FS, BLOCKSIZE), FS, BLOCKSIZE)
+        except (ValueError, OSError) as e:
+            print(f"Error en la fuente de audio '{AUDIO_SOURCE}': {e}")
+    else:
+        try:
+            with sd.InputStream(channels=1, samplerate=FS, blocksize=BLOCKSIZE) as stream:
+                while True:
+                    audio_block, _ = stream.read(BLOCKSIZE)
+                    yield audio_block
+        except Exception as e:
+            print(f"Error en monitoreo de audio: {e}")
+    # Fallback a datos de prueba
+    yield from paced(noise(FS, BLOCKSIZE), FS, BLOCKSIZE)
 
 
 def audio_monitor_thread():
-    """Thread que monitorea audio continuamente y actualiza el estado."""
-    if not AUDIO_AVAILABLE:
-        return
+    """Thread que monitorea audio continuamente y actualiza el estado.
 
-    try:
-        with sd.InputStream(channels=1, samplerate=FS, blocksize=BLOCKSIZE) as stream:
-            while True:
-                audio_block, _ = stream.read(BLOCKSIZE)
-                bands = get_band_amps(audio_block, FS, N_BANDS)
-
-                with state_lock:
-                    system_state['audio_bands'] = bands
-
-                socketio.emit('audio_update', {'bands': bands})
-                time.sleep(0.05)
-    except Exception as e:
-        print(f"Error en monitoreo de audio: {e}")
-        # Fallback a datos de prueba
-        while True:
-            bands = [float(np.random.random() * 0.5) for _ in range(N_BANDS)]
-            with state_lock:
-                system_state['audio_bands'] = bands
-            socketio.emit('audio_update', {'bands': bands})
-            time.sleep(0.1)
-
-
-def system_monitor_thread():
-    """Thread que monitorea métricas del sistema continuamente."""
-    while True:
-        cpu = psutil.cpu_percent(interval=0.5)
-        mem = psutil.virtual_memory().percent
-
-        # Obtener ventana activa si está disponible
-        active_window = 'N/A'
-        if WINDOW_TRACKING:
-            try:
-                win = gw.getActiveWindow()
-                if win:
-                    active_window = win.title[:50]  # Limitar longitud
-            except Exception:
-                pass
-
-        with state_lock:
-            system_state['cpu'] = cpu
-            system_state['memory'] = mem
-            system_state['active_window'] = active_window
-
-        socketio.emit('system_update', {
-            'cpu': cpu,
-            'memory': mem,
-            'active_window': active_window
-        })
-
-        time.sleep(2)
+    El audio tiene su propio thread y no pasa por el scheduler de
+    collectors, así que un collector lento nunca lo retrasa.
+
+    Se lee el micrófono sin pausas (para no perder muestras) y el estado
+    se actualiza con cada bloque, pero a los clientes solo se envía un
+    cuadro cada AUDIO_EMIT_EVERY bloques: el visualizador del
+    navegador interpola entre cuadros y anima a 60 fps igualmente.
+    Cada cuadro lleva la hora de envío ('t') para medir la latencia de
+    entrega (ver dashboard_loadtest.py).
+    """
+    for index, audio_block in enumerate(audio_blocks()):
+        bands = get_band_amps(audio_block, FS, N_BANDS)
+        state.update({'audio_bands': bands})
+        if index % AUDIO_EMIT_EVERY == 0:
+            socketio.emit('audio_update', {'bands': bands, 't': time.time()})
+
+
+@registry.register('system', interval=2.0, timeout=1.0, event='system_update',
+                   schema={'cpu': float, 'memory': float, 'active_window': str})
+def collect_system():
+    """Métricas del sistema: CPU, memoria y ventana activa."""
+    # interval=None: uso de CPU desde la llamada anterior, sin bloquear
+    cpu = float(psutil.cpu_percent(interval=None))
+    mem = float(psutil.virtual_memory().percent)
+
+    # Ventana activa desde la caché compartida (ver window_tracker.py)
+    title = window_tracker.title() if WINDOW_TRACKING else None
+    active_window = title[:50] if title else 'N/A'  # Limitar longitud
+
+    return {'cpu': cpu, 'memory': mem, 'active_window': active_window}
 
 
 def check_rgb_status():
     """Verifica si el servidor OpenRGB está disponible."""
-    if not RGB_AVAILABLE:
+    if not openrgb.available:
         return 'no_disponible'
 
     try:
-        client = OpenRGBClient(host='localhost', port=6742)
+        client = openrgb.OpenRGBClient(address='localhost', port=6742)
         keyboards = [d for d in client.devices if d.device_type.name == "KEYBOARD"]
         if keyboards:
             return 'conectado'
         return 'sin_teclado'
+    except ImportError:
+        return 'no_disponible'
     except Exception:
         return 'desconectado'
 
 
+def capabilities():
+    """Componentes disponibles (se actualiza si una importación diferida falla)."""
+    return {
+        'audio': sd.available or bool(AUDIO_SOURCE),
+        'spotify': SPOTIFY_AVAILABLE,
+        'rgb': openrgb.available,
+        'window_tracking': WINDOW_TRACKING
+    }
+
+
 def check_spotify_status():
     """Verifica si hay una sesión activa de Spotify."""
     if not SPOTIFY_AVAILABLE:
@@ -205,26 +228,81 @@ def check_spotify_status():
     return {'status': 'disponible', 'message': 'Usar Spotify Live app'}
 
 
+# Conectar con OpenRGB cuesta una conexión TCP y puede tardar segundos si
+# el servidor no responde: se consulta periódicamente y la API lee el estado
+@registry.register('rgb', interval=10.0, timeout=5.0, schema={'rgb_status': str})
+def collect_rgb():
+    return {'rgb_status': check_rgb_status()}
+
+
+@registry.register('spotify', interval=10.0, timeout=5.0,
+                   schema={'spotify': (dict, type(None))})
+def collect_spotify():
+    return {'spotify': check_spotify_status()}
+
+
+def publish_collector(collector, values, _version):
+    """Emite por WebSocket los resultados de los collectors con evento."""
+    if collector.event:
+        socketio.emit(collector.event, values)
+
+
+scheduler = CollectorScheduler(registry, state, on_publish=publish_collector)
+
+
 @app.route('/')
 def index():
     """Página principal del dashboard."""
+    caps = capabilities()
     return render_template('dashboard.html',
-                           audio_available=AUDIO_AVAILABLE,
-                           spotify_available=SPOTIFY_AVAILABLE,
-                           rgb_available=RGB_AVAILABLE,
-                           window_tracking=WINDOW_TRACKING)
+                           audio_available=caps['audio'],
+                           spotify_available=caps['spotify'],
+                           rgb_available=caps['rgb'],
+                           window_tracking=caps['window_tracking'])
+
+
+@app.route('/ar.html', defaults={'page': 'ar.html'})
+@app.route('/pdf_overlay.html', defaults={'page': 'pdf_overlay.html'})
+@app.route('/aurawave/', defaults={'page': 'aurawave/'})
+def demo_page(page):
+    """Demos AR/PDF/AuraWave con sus librerías servidas localmente."""
+    html = assets.page(os.path.join(BASE_DIR, DEMO_PAGES[page]))
+    response = Response(html, mimetype='text/html')
+    response.cache_control.no_cache = True
+    return response
+
+
+@app.route('/assets/<path:filename>')
+def static_asset(filename):
+    """Librería con hash en el nombre, precomprimida si el navegador lo acepta.
+
+    Status Codes:
+        200: Archivo servido (Content-Encoding br/gzip según Accept-Encoding)
+        304: El cliente ya tiene esta versión
+        404: No está en el manifest
+    """
+    resolved = assets.resolve(filename, request.headers.get('Accept-Encoding'))
+    if resolved is None:
+        abort(404)
+    path, encoding = resolved
+    response = send_file(path, mimetype='text/javascript', conditional=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response
 
 
 @app.route('/api/status')
 def api_status():
     """API endpoint que retorna el estado completo del sistema."""
-    with state_lock:
-        state_copy = system_state.copy()
+    version, state_copy = state.snapshot()
 
     # Agregar información adicional
-    state_copy['uptime_seconds'] = int(time.time() - system_state['uptime'])
-    state_copy['rgb_status'] = check_rgb_status()
-    state_copy['spotify'] = check_spotify_status()
+    state_copy['uptime_seconds'] = int(time.time() - STARTED)
+    state_copy['version'] = version
 
     return jsonify(state_copy)
 
@@ -232,33 +310,28 @@ def api_status():
 @app.route('/api/system')
 def api_system():
     """API endpoint para métricas del sistema."""
-    with state_lock:
-        return jsonify({
-            'cpu': system_state['cpu'],
-            'memory': system_state['memory'],
-            'active_window': system_state['active_window']
-        })
+    return jsonify(state.snapshot(SYSTEM_KEYS)[1])
 
 
 @app.route('/api/audio')
 def api_audio():
     """API endpoint para datos de audio."""
-    with state_lock:
-        return jsonify({
-            'bands': system_state['audio_bands'],
-            'available': AUDIO_AVAILABLE
-        })
+    return jsonify({
+        'bands': state.get('audio_bands'),
+        'available': sd.available or bool(AUDIO_SOURCE)
+    })
 
 
 @app.route('/api/capabilities')
 def api_capabilities():
     """API endpoint que retorna las capacidades disponibles."""
-    return jsonify({
-        'audio': AUDIO_AVAILABLE,
-        'spotify': SPOTIFY_AVAILABLE,
-        'rgb': RGB_AVAILABLE,
-        'window_tracking': WINDOW_TRACKING
-    })
+    return jsonify(capabilities())
+
+
+@app.route('/api/collectors')
+def api_collectors():
+    """API endpoint con las estadísticas de cada collector."""
+    return jsonify(scheduler.stats())
 
 
 @socketio.on('connect')
@@ -270,37 +343,53 @@ def handle_connect():
 @socketio.on('request_update')
 def handle_request_update():
     """Envía actualización inmediata del estado al cliente."""
-    with state_lock:
-        emit('system_update', {
-            'cpu': system_state['cpu'],
-            'memory': system_state['memory'],
-            'active_window': system_state['active_window']
-        })
-        emit('audio_update', {'bands': system_state['audio_bands']})
+    _, values = state.snapshot(SYSTEM_KEYS + ('audio_bands',))
+    emit('system_update', {key: values[key] for key in SYSTEM_KEYS})
+    emit('audio_update', {'bands': values['audio_bands']})
 
 
 def start_background_threads():
     """Inicia los threads de monitoreo en background."""
-    system_thread = threading.Thread(target=system_monitor_thread, daemon=True)
-    system_thread.start()
+    if WINDOW_TRACKING:
+        window_tracker.start()
+    scheduler.start()
 
-    if AUDIO_AVAILABLE:
+    if AUDIO_AVAILABLE or AUDIO_SOURCE:
         audio_thread = threading.Thread(target=audio_monitor_thread, daemon=True)
         audio_thread.start()
 
 
+STARTUP.mark('app, rutas y collectors')
+
+
 if __name__ == '__main__':
+    if AUDIO_SOURCE:
+        try:
+            check_source(AUDIO_SOURCE, FS, BLOCKSIZE)
+        except (ValueError, OSError) as e:
+            print(f"❌ DASHBOARD_AUDIO_SOURCE inválida: {e}", file=sys.stderr)
+            sys.exit(2)
     print("=" * 60)
     print("🌈 Dashboard Unificado de Rainvow")
     print("=" * 60)
-    print(f"Audio disponible: {'✓' if AUDIO_AVAILABLE else '✗'}")
+    print(f"Audio disponible: {'✓' if AUDIO_AVAILABLE else '✗'}"
+          + (f" (fuente sintética: {AUDIO_SOURCE})" if AUDIO_SOURCE else ''))
     print(f"Spotify disponible: {'✓' if SPOTIFY_AVAILABLE else '✗'}")
     print(f"RGB disponible: {'✓' if RGB_AVAILABLE else '✗'}")
     print(f"Seguimiento de ventanas: {'✓' if WINDOW_TRACKING else '✗'}")
+    print(f"Collectors: {', '.join(c.name for c in registry)}")
+    missing_assets = assets.missing()
+    if missing_assets:
+        print(f"⚠️  Librerías JS desde CDN ({', '.join(missing_assets)}): "
+              "ejecutar python3 static_assets.py fetch para servirlas localmente")
+    else:
+        print("Librerías JS: locales ✓")
     print("=" * 60)
     print("\nIniciando threads de monitoreo...")
 
     start_background_threads()
+    STARTUP.mark('threads de monitoreo')
+    print(STARTUP.report())
 
     port = int(os.environ.get('DASHBOARD_PORT', 5000))
     print(f"\n🚀 Dashboard disponible en http://0.0.0.0:{port}")
@@ -0,0 +1,190 @@
+"""Prueba de carga del WebSocket del dashboard con audio sintético.
+
+Levanta dashboard.py en su propio proceso con una fuente de audio
+determinista (DASHBOARD_AUDIO_SOURCE, ver audio_sources.py), así que no
+hace falta micrófono ni conexión a internet. Luego conecta N clientes
+socket.io a la vez y, durante unos segundos, mide para cada N:
+
+    - Latencia de entrega de audio_update (hora de recepción menos la
+      hora de envío 't' que incluye el servidor; mismo host, mismo reloj)
+    - Mensajes recibidos por cliente frente a los esperados (DASHBOARD_AUDIO_FPS)
+    - CPU del proceso del servidor y del propio generador de carga (si el
+      generador se satura, las latencias medidas dejan de ser del servidor)
+
+Uso:
+    python3 dashboard_loadtest.py
+    python3 dashboard_loadtest.py --clients 1,25,100,200 --duration 10
+    python3 dashboard_loadtest.py --source file:logs/clip.npy --bands 64 --fps 5
+    python3 dashboard_loadtest.py --json resultados.json
+
+Requiere python-socketio[asyncio_client] (aiohttp), además de las
+dependencias del dashboard.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import psutil
+
+from audio_sources import check_source
+from spotify_live.loadtest import free_port, percentile, wait_for_port
+
+DASHBOARD = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dashboard.py')
+DASHBOARD_FS = 44100
+DASHBOARD_BLOCKSIZE = 4410
+CONNECT_TIMEOUT = 30.0
+WARMUP = 1.0
+
+
+class Probe:
+    """Cliente socket.io que registra la latencia de cada audio_update."""
+
+    def __init__(self, url):
+        import socketio
+
+        self.url = url
+        self.client = socketio.AsyncClient(reconnection=False)
+        self.latencies = []
+        self.recording = False
+        self.client.on('audio_update', self.on_audio)
+
+    def on_audio(self, data):
+        if self.recording and 't' in data:
+            self.latencies.append(time.time() - data['t'])
+
+    async def connect(self):
+        await self.client.connect(self.url, transports=['websocket'],
+                                  wait_timeout=CONNECT_TIMEOUT)
+
+    async def disconnect(self):
+        if self.client.connected:
+            await self.client.disconnect()
+
+
+async def run_level(url, n_clients, duration, server):
+    """Conecta `n_clients` clientes y mide durante `duration` segundos.
+
+    Returns:
+        dict: clientes conectados, mensajes por cliente, percentiles de
+        latencia (ms) y CPU del servidor y del generador (%)
+    """
+    probes = [Probe(url) for _ in range(n_clients)]
+    results = await asyncio.gather(*(p.connect() for p in probes), return_exceptions=True)
+    connected = [p for p, r in zip(probes, results) if not isinstance(r, Exception)]
+    try:
+        await asyncio.sleep(WARMUP)
+        me = psutil.Process()
+        server.cpu_percent(None)
+        me.cpu_percent(None)
+        for probe in connected:
+            probe.recording = True
+        await asyncio.sleep(duration)
+        for probe in connected:
+            probe.recording = False
+        server_cpu = server.cpu_percent(None)
+        client_cpu = me.cpu_percent(None)
+    finally:
+        await asyncio.gather(*(p.disconnect() for p in connected), return_exceptions=True)
+
+    latencies = sorted(t for p in connected for t in p.latencies)
+    received = [len(p.latencies) for p in connected]
+    return {
+        'clients': n_clients,
+        'connected': len(connected),
+        'msgs_per_client': sum(received) / len(connected) if connected else 0.0,
+        'min_msgs': min(received, default=0),
+        'p50': percentile(latencies, 50) * 1000,
+        'p95': percentile(latencies, 95) * 1000,
+        'p99': percentile(latencies, 99) * 1000,
+        'max': latencies[-1] * 1000 if latencies else 0.0,
+        'server_cpu': server_cpu,
+        'loadgen_cpu': client_cpu,
+    }
+
+
+def spawn_dashboard(port, source, fps, bands):
+    """Lanza dashboard.py con la fuente sintética en un proceso aparte."""
+    env = dict(os.environ,
+               DASHBOARD_PORT=str(port),
+               DASHBOARD_AUDIO_SOURCE=source,
+               DASHBOARD_AUDIO_FPS=str(fps),
+               DASHBOARD_AUDIO_BANDS=str(bands),
+               PYTHONUNBUFFERED='1')
+    return subprocess.Popen([sys.executable, DASHBOARD], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_for_dashboard(proc, port, timeout=30.0):
+    """Espera al puerto del dashboard, fallando enseguida si el proceso termina."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'dashboard.py terminó al arrancar con código {proc.returncode}')
+        try:
+            wait_for_port(port, timeout=0.5)
+            return
+        except RuntimeError:
+            continue
+    raise RuntimeError(f'El dashboard en el puerto {port} no arrancó')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga del WebSocket del dashboard')
+    parser.add_argument('--clients', default='1,10,50,100',
+                        help='Clientes simultáneos por escenario (default: 1,10,50,100)')
+    parser.add_argument('--duration', type=float, default=5.0,
+                        help='Segundos de medición por escenario (default: 5)')
+    parser.add_argument('--source', default='sweep',
+                        help='Fuente de audio sintética (default: sweep, ver audio_sources.py)')
+    parser.add_argument('--fps', type=float, default=10,
+                        help='Cuadros de audio por segundo (default y máximo: 10)')
+    parser.add_argument('--bands', type=int, default=7,
+                        help='Bandas por cuadro (default: 7)')
+    parser.add_argument('--json', metavar='ARCHIVO',
+                        help='Guardar también los resultados en JSON')
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.clients.split(',') if c.strip()]
+    try:
+        check_source(args.source, DASHBOARD_FS, DASHBOARD_BLOCKSIZE)
+    except (ValueError, OSError) as e:
+        print(f"❌ Fuente de audio inválida: {e}", file=sys.stderr)
+        return 2
+    port = free_port()
+    proc = spawn_dashboard(port, args.source, args.fps, args.bands)
+    rows = []
+    try:
+        wait_for_dashboard(proc, port)
+        server = psutil.Process(proc.pid)
+        url = f'http://127.0.0.1:{port}'
+        expected = min(args.fps, 10) * args.duration
+
+        print(f"Dashboard con fuente '{args.source}', {args.bands} bandas a {args.fps:g} fps, "
+              f"{args.duration:g} s por escenario (~{expected:.0f} mensajes por cliente)\n")
+        print(f"{'clientes':>8} {'conect':>7} {'msg/cli':>8} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'p99 ms':>8} {'max ms':>8} {'CPU srv':>8} {'CPU gen':>8}")
+        for n_clients in levels:
+            r = asyncio.run(run_level(url, n_clients, args.duration, server))
+            rows.append(r)
+            print(f"{r['clients']:>8} {r['connected']:>7} {r['msgs_per_client']:>8.1f} "
+                  f"{r['p50']:>8.1f} {r['p95']:>8.1f} {r['p99']:>8.1f} {r['max']:>8.1f} "
+                  f"{r['server_cpu']:>7.0f}% {r['loadgen_cpu']:>7.0f}%")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'source': args.source, 'fps': args.fps, 'bands': args.bands,
+                       'duration': args.duration, 'levels': rows}, f, indent=2)
+        print(f"\nResultados guardados en {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,56 +5,45 @@ holi.py - Saludo colorido en el estilo Rainvow
 Un simple script de saludo que muestra "Holi!" con colores del arcoíris.
 """
 
-import time
-from rich.console import Console
-from rich.text import Text
-
-console = Console()
+from animation import (
+    BOLD, DIM, ITALIC, RAINBOW_ANSI, RESET, TerminalScreen, center, fg256, run_animation
+)
 
 # Colores del arcoíris (igual que en ondads.py)
-RAINBOW_COLORS = [
-    "red",
-    "orange1",
-    "yellow1",
-    "green1",
-    "cyan",
-    "blue",
-    "magenta",
-]
-
-
-def show_greeting():
-    """Muestra un saludo colorido animado."""
-    console.clear()
-
-    # Crear el texto "HOLI!" con colores del arcoíris
-    mensaje = "HOLI!"
+RAINBOW_COLORS = RAINBOW_ANSI
 
-    for i in range(len(RAINBOW_COLORS)):
-        console.clear()
-        text = Text()
+MENSAJE = "HOLI!"
+STEP = 0.3  # Segundos por cuadro de la animación
+CYAN = fg256(6)
+WHITE = fg256(7)
 
-        for j, letra in enumerate(mensaje):
-            color_idx = (j + i) % len(RAINBOW_COLORS)
-            text.append(letra, style=RAINBOW_COLORS[color_idx])
 
-        console.print(text, justify="center", style="bold")
-        console.print("\nGood Vibes! ✨🌈", justify="center", style="italic cyan")
-        time.sleep(0.3)
+def greeting_lines(shift, final=False):
+    """Líneas del saludo con los colores del arcoíris desplazados `shift` posiciones."""
+    letras = ''.join(RAINBOW_COLORS[(j + shift) % len(RAINBOW_COLORS)] + letra
+                     for j, letra in enumerate(MENSAJE))
+    lines = [
+        center(BOLD + letras + RESET),
+        "",
+        center(f"{ITALIC}{CYAN}Good Vibes! ✨🌈{RESET}"),
+    ]
+    if final:
+        lines += ["", center(f"{DIM}{WHITE}Bienvenido a Rainvow Tools{RESET}")]
+    return lines
 
-    console.clear()
-    # Mensaje final
-    text = Text()
-    for j, letra in enumerate(mensaje):
-        text.append(letra, style=RAINBOW_COLORS[j % len(RAINBOW_COLORS)])
 
-    console.print(text, justify="center", style="bold")
-    console.print("\nGood Vibes! ✨🌈", justify="center", style="italic cyan")
-    console.print("\nBienvenido a Rainvow Tools", justify="center", style="dim white")
+def show_greeting():
+    """Muestra un saludo colorido animado."""
+    # Sin pantalla alternativa: el mensaje final queda en la terminal
+    with TerminalScreen(alt_screen=False) as screen:
+        # Un cuadro por desplazamiento de color y, al final, el mensaje completo
+        n = len(RAINBOW_COLORS)
+        run_animation(screen, lambda i, _t: greeting_lines(i % n, final=i == n),
+                      fps=1 / STEP, frames=n + 1)
 
 
 if __name__ == "__main__":
     try:
         show_greeting()
     except KeyboardInterrupt:
-        console.print("\n¡Hasta luego! 👋", style="bold yellow")
+        print(f"\n{BOLD}{fg256(3)}¡Hasta luego! 👋{RESET}")
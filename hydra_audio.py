@@ -0,0 +1,254 @@
+"""Captura de audio continua con pre-roll para el modo música de Hydra.
+
+En lugar de grabar con sd.rec() + sd.wait() (que bloquea quien llama
+durante toda la grabación), un stream de entrada escribe sin parar en un
+buffer circular con los últimos segundos de audio. Al dispararse una
+captura se guarda al instante lo que ya sonó (pre-roll) y, opcionalmente,
+unos segundos más (post-roll). Un thread escritor vuelca los bloques a
+WAV o FLAC a medida que llegan.
+
+Características:
+    - trigger() nunca bloquea: solo copia el buffer y encola
+    - Debounce: triggers dentro de `cooldown` segundos se ignoran
+    - WAV (stdlib) o FLAC (requiere soundfile)
+    - Los archivos se escriben como .part y se renombran al completarse
+
+Requisitos:
+    pip install sounddevice numpy
+    pip install soundfile  # Opcional, para FLAC
+
+Uso:
+    >>> recorder = AudioRecorder("logs", pre_roll=5, post_roll=5)
+    >>> recorder.start()
+    >>> recorder.trigger()  # Guarda los 5 s anteriores y los 5 siguientes
+    'logs/audio_20250101_120000.wav'
+"""
+
+import datetime
+import os
+import queue
+import threading
+import time
+import wave
+
+import numpy as np
+
+try:
+    import sounddevice as sd
+    AUDIO_AVAILABLE = True
+except (ImportError, OSError):
+    sd = None
+    AUDIO_AVAILABLE = False
+
+try:
+    import soundfile
+    FLAC_AVAILABLE = True
+except (ImportError, OSError):
+    FLAC_AVAILABLE = False
+
+SAMPLERATE = 44100
+CHANNELS = 2
+BLOCKSIZE = 1024
+PRE_ROLL_SECONDS = 5.0
+POST_ROLL_SECONDS = 5.0
+TRIGGER_COOLDOWN_SECONDS = 30.0
+AUDIO_FORMATS = ('wav', 'flac')
+
+
+class AudioRingBuffer:
+    """Buffer circular de audio con los últimos `seconds` segundos.
+
+    Args:
+        seconds: Duración que conserva el buffer
+        samplerate: Frecuencia de muestreo en Hz
+        channels: Número de canales
+    """
+
+    def __init__(self, seconds, samplerate=SAMPLERATE, channels=CHANNELS):
+        self.samplerate = samplerate
+        self.capacity = max(1, int(seconds * samplerate))
+        self.data = np.zeros((self.capacity, channels), dtype=np.float32)
+        self.pos = 0  # Siguiente frame a escribir
+        self.filled = 0
+
+    def write(self, block):
+        """Agrega frames al buffer, pisando los más antiguos."""
+        n = len(block)
+        if n >= self.capacity:
+            self.data[:] = block[-self.capacity:]
+            self.pos = 0
+            self.filled = self.capacity
+            return
+        end = self.pos + n
+        if end <= self.capacity:
+            self.data[self.pos:end] = block
+        else:
+            split = self.capacity - self.pos
+            self.data[self.pos:] = block[:split]
+            self.data[:n - split] = block[split:]
+        self.pos = end % self.capacity
+        self.filled = min(self.capacity, self.filled + n)
+
+    def snapshot(self):
+        """Copia del contenido en orden cronológico (el más antiguo primero)."""
+        if self.filled < self.capacity:
+            return self.data[:self.filled].copy()
+        return np.concatenate((self.data[self.pos:], self.data[:self.pos]))
+
+
+class AudioRecorder:
+    """Grabador de clips con pre-roll, post-roll y escritura en background.
+
+    Args:
+        directory: Directorio donde se guardan los clips
+        pre_roll: Segundos anteriores al trigger que se guardan
+        post_roll: Segundos posteriores al trigger que se guardan
+        fmt: 'wav' o 'flac'
+        cooldown: Segundos mínimos entre dos capturas
+        samplerate: Frecuencia de muestreo en Hz
+        channels: Número de canales
+        on_saved: Callback(path, seconds) llamado desde el thread escritor
+            cuando un clip termina de escribirse
+        on_error: Callback(mensaje_de_error) si no se puede abrir el micrófono
+    """
+
+    def __init__(self, directory, pre_roll=PRE_ROLL_SECONDS, post_roll=POST_ROLL_SECONDS,
+                 fmt='wav', cooldown=TRIGGER_COOLDOWN_SECONDS, samplerate=SAMPLERATE,
+                 channels=CHANNELS, on_saved=None, on_error=None):
+        if fmt not in AUDIO_FORMATS:
+            raise ValueError(f"Formato no soportado: {fmt}")
+        if fmt == 'flac' and not FLAC_AVAILABLE:
+            raise ValueError("FLAC requiere: pip install soundfile")
+        self.directory = directory
+        self.fmt = fmt
+        self.cooldown = cooldown
+        self.samplerate = samplerate
+        self.channels = channels
+        self.post_roll_frames = int(post_roll * samplerate)
+        self.on_saved = on_saved
+        self.on_error = on_error
+        self.error = None
+        self.ring = AudioRingBuffer(pre_roll, samplerate, channels)
+        self.queue = queue.Queue()
+        self._post_remaining = 0
+        self._last_trigger = float('-inf')
+        self._lock = threading.Lock()
+        self._stream = None
+        self._writer = None
+        os.makedirs(directory, exist_ok=True)
+
+    def start(self):
+        """Abre el stream de entrada y el thread escritor.
+
+        Si no hay dispositivo de entrada el error se informa una vez por
+        on_error y el grabador queda inactivo (trigger() devuelve None).
+        """
+        self._writer = threading.Thread(target=self._write_loop, name='hydra-audio-writer',
+                                        daemon=True)
+        self._writer.start()
+        if AUDIO_AVAILABLE:
+            stream = None
+            try:
+                stream = sd.InputStream(samplerate=self.samplerate, channels=self.channels,
+                                        blocksize=BLOCKSIZE, dtype='float32',
+                                        callback=self._callback)
+                stream.start()
+                self._stream = stream
+            except (sd.PortAudioError, OSError) as e:
+                if stream is not None:
+                    stream.close()
+                self.error = str(e)
+                if self.on_error:
+                    self.on_error(f"Micrófono no disponible ({e}); captura de audio desactivada")
+        return self
+
+    def stop(self, timeout=10.0):
+        """Cierra el stream y espera a que se termine de escribir el clip en curso."""
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        with self._lock:
+            if self._post_remaining:
+                self._post_remaining = 0
+                self.queue.put(('close', None))
+        self.queue.put(None)
+        if self._writer is not None:
+            self._writer.join(timeout)
+
+    def _callback(self, indata, frames, time_info, status):
+        """Callback del stream de sounddevice (thread de audio, debe ser rápido)."""
+        with self._lock:
+            self.ring.write(indata)
+            if self._post_remaining:
+                take = min(frames, self._post_remaining)
+                self.queue.put(('data', indata[:take].copy()))
+                self._post_remaining -= take
+                if not self._post_remaining:
+                    self.queue.put(('close', None))
+
+    def trigger(self):
+        """Guarda el pre-roll y empieza a capturar el post-roll sin bloquear.
+
+        Returns:
+            str or None: Ruta del clip, o None si se ignoró por el cooldown o
+            no hay stream de entrada (sin él nunca llegaría el post-roll)
+        """
+        if self._stream is None:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_trigger < self.cooldown or self._post_remaining:
+                return None
+            self._last_trigger = now
+            pre_roll = self.ring.snapshot()
+            stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(self.directory, f"audio_{stamp}.{self.fmt}")
+            self.queue.put(('open', path))
+            self.queue.put(('data', pre_roll))
+            self._post_remaining = self.post_roll_frames
+            if not self._post_remaining:
+                self.queue.put(('close', None))
+        return path
+
+    def _open(self, path):
+        if self.fmt == 'flac':
+            return soundfile.SoundFile(path, 'w', self.samplerate, self.channels, format='FLAC')
+        out = wave.open(path, 'wb')
+        out.setnchannels(self.channels)
+        out.setsampwidth(2)
+        out.setframerate(self.samplerate)
+        return out
+
+    def _write_block(self, out, block):
+        if self.fmt == 'flac':
+            out.write(block)
+        else:
+            pcm = (np.clip(block, -1.0, 1.0) * 32767).astype('<i2')
+            out.writeframes(pcm.tobytes())
+
+    def _write_loop(self):
+        out = path = None
+        frames = 0
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            kind, value = item
+            if kind == 'open':
+                path, frames = value, 0
+                out = self._open(path + '.part')
+            elif kind == 'data' and out is not None:
+                self._write_block(out, value)
+                frames += len(value)
+            elif kind == 'close' and out is not None:
+                self._finish(out, path, frames)
+                out = None
+        if out is not None:
+            self._finish(out, path, frames)
+
+    def _finish(self, out, path, frames):
+        out.close()
+        os.replace(path + '.part', path)
+        if self.on_saved:
+            self.on_saved(path, frames / self.samplerate)
@@ -0,0 +1,277 @@
+"""Canal persistente hacia Hydra para los mensajes de hydra_observer.
+
+Antes, cada mensaje lanzaba un proceso nuevo del CLI de Hydra
+(`subprocess.Popen([HYDRA_CLI, mensaje])`) que nunca se esperaba: cada
+envío pagaba el arranque de un proceso y una sesión larga acumulaba
+procesos zombie. Este módulo mantiene una conexión abierta y envía los
+mensajes desde un thread propio, uno por línea.
+
+Transportes (HYDRA_CHANNEL):
+    socket: Socket Unix en HYDRA_SOCKET donde escucha Hydra
+    pipe:   Un único proceso `HYDRA_CLI <pipe_args>` que lee mensajes por
+            stdin; solo si el CLI lo soporta, así que hay que indicar los
+            argumentos explícitamente (HYDRA_PIPE_ARGS)
+    spawn:  Un proceso por mensaje (`HYDRA_CLI mensaje`, como antes),
+            esperando a que terminen para no dejar zombies
+    auto:   socket si HYDRA_SOCKET está definido, si no spawn (default)
+
+Si el transporte persistente falla (el proceso termina, el socket se
+cierra), los mensajes se envían con spawn y cada RECONNECT_SECONDS se
+vuelve a intentar la conexión.
+
+Características:
+    - send() no bloquea: encola y el thread escritor envía por lotes
+    - Cola acotada: con la cola llena, send() devuelve False (backpressure)
+    - Los mensajes que llegan casi juntos se envían en una sola escritura
+"""
+
+import queue
+import socket
+import subprocess
+import threading
+import time
+
+CHANNEL_MAX_QUEUE = 256
+BATCH_MAX_MESSAGES = 32
+BATCH_WINDOW = 0.05  # Segundos que se espera a más mensajes para agruparlos
+RECONNECT_SECONDS = 30.0
+PIPE_STARTUP_CHECK = 0.2  # Un CLI que no lee de stdin suele terminar enseguida
+CHANNEL_MODES = ('auto', 'socket', 'pipe', 'spawn')
+
+
+class SocketTransport:
+    """Conexión a un socket Unix; un mensaje por línea."""
+
+    name = 'socket'
+
+    def __init__(self, path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.connect(path)
+        except OSError:
+            self.sock.close()
+            raise
+
+    def write(self, messages):
+        self.sock.sendall(''.join(m + '\n' for m in messages).encode())
+
+    def reap(self):
+        pass
+
+    def close(self, timeout=None):
+        self.sock.close()
+
+
+class PipeTransport:
+    """Un proceso persistente que recibe los mensajes por stdin."""
+
+    name = 'pipe'
+
+    def __init__(self, command):
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE,
+                                        stdout=subprocess.DEVNULL)
+        try:
+            code = self.process.wait(PIPE_STARTUP_CHECK)
+        except subprocess.TimeoutExpired:
+            return
+        raise BrokenPipeError(f"Hydra terminó al arrancar con código {code}")
+
+    def write(self, messages):
+        if self.process.poll() is not None:
+            raise BrokenPipeError(f"Hydra terminó con código {self.process.returncode}")
+        self.process.stdin.write(''.join(m + '\n' for m in messages).encode())
+        self.process.stdin.flush()
+
+    def reap(self):
+        pass
+
+    def close(self, timeout=5.0):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.terminate()
+            self.process.wait()
+
+
+class SpawnTransport:
+    """Un proceso por mensaje; los terminados se esperan para no dejar zombies."""
+
+    name = 'spawn'
+
+    def __init__(self, cli):
+        self.cli = cli
+        self.children = []
+        self.spawned = 0
+
+    def write(self, messages):
+        for message in messages:
+            self.children.append(subprocess.Popen([self.cli, message]))
+            self.spawned += 1
+        self.reap()
+
+    def reap(self):
+        self.children = [p for p in self.children if p.poll() is None]
+
+    def close(self, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        for process in self.children:
+            try:
+                process.wait(max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                pass
+        self.reap()
+
+
+class HydraChannel:
+    """Envía mensajes a Hydra por un transporte persistente con cola y lotes.
+
+    Args:
+        cli: Ejecutable del CLI de Hydra
+        mode: 'auto', 'socket', 'pipe' o 'spawn'
+        socket_path: Socket Unix para el modo socket
+        pipe_args: Argumentos del CLI para leer mensajes por stdin
+            (obligatorios en modo pipe)
+        max_queue: Mensajes pendientes máximos
+        on_error: Callback(mensaje_de_error) para informar fallos
+
+    Example:
+        >>> channel = HydraChannel('hydra').start()
+        >>> channel.send('zip_hud')
+        True
+        >>> channel.close()
+    """
+
+    def __init__(self, cli, mode='auto', socket_path=None, pipe_args=None,
+                 max_queue=CHANNEL_MAX_QUEUE, on_error=None):
+        if mode not in CHANNEL_MODES:
+            raise ValueError(f"Modo de canal no soportado: {mode}")
+        if mode == 'pipe' and not pipe_args:
+            raise ValueError("El modo pipe requiere pipe_args (p. ej. HYDRA_PIPE_ARGS)")
+        if mode == 'auto':
+            mode = 'socket' if socket_path else 'spawn'
+        self.cli = cli
+        self.mode = mode
+        self.socket_path = socket_path
+        self.pipe_args = tuple(pipe_args or ())
+        self.on_error = on_error
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.fallback = SpawnTransport(cli)
+        self.transport = None
+        self.sent = 0
+        self.batches = 0
+        self.dropped = 0
+        self._retry_at = 0.0
+        self._thread = None
+
+    def start(self):
+        """Inicia el thread escritor (la conexión se abre con el primer lote)."""
+        self._thread = threading.Thread(target=self._run, name='hydra-channel', daemon=True)
+        self._thread.start()
+        return self
+
+    def send(self, message, timeout=0):
+        """Encola un mensaje.
+
+        Args:
+            message: Comando para Hydra (una línea)
+            timeout: Segundos a esperar si la cola está llena (0 = no esperar)
+
+        Returns:
+            bool: False si la cola estaba llena y el mensaje se descartó
+        """
+        try:
+            if timeout:
+                self.queue.put(message, timeout=timeout)
+            else:
+                self.queue.put_nowait(message)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout=5.0):
+        """Envía lo pendiente y cierra la conexión."""
+        if self._thread is not None:
+            self.queue.put(None)
+            self._thread.join(timeout)
+        if self.transport is not None and self.transport is not self.fallback:
+            self.transport.close(timeout)
+        self.fallback.close(timeout)
+
+    @property
+    def transport_name(self):
+        return self.transport.name if self.transport is not None else None
+
+    def _report(self, text):
+        if self.on_error:
+            self.on_error(text)
+
+    def _connect(self):
+        """Abre el transporte persistente; si falla usa spawn hasta el próximo intento."""
+        self._retry_at = time.monotonic() + RECONNECT_SECONDS
+        if self.mode == 'spawn':
+            return self.fallback
+        try:
+            if self.mode == 'socket':
+                return SocketTransport(self.socket_path)
+            return PipeTransport([self.cli, *self.pipe_args])
+        except OSError as e:
+            self._report(f"Hydra {self.mode} no disponible ({e}); usando un proceso por mensaje")
+            return self.fallback
+
+    def _next_batch(self):
+        """Espera un mensaje y agrupa los que lleguen en BATCH_WINDOW segundos."""
+        try:
+            first = self.queue.get(timeout=1.0)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + BATCH_WINDOW
+        while first is not None and len(batch) < BATCH_MAX_MESSAGES:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 \
+                    else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item is None:
+                break
+        return batch
+
+    def _write(self, batch):
+        if self.transport is None or (self.transport is self.fallback
+                                      and self.mode != 'spawn'
+                                      and time.monotonic() >= self._retry_at):
+            self.transport = self._connect()
+        try:
+            self.transport.write(batch)
+        except FileNotFoundError:
+            self._report("Hydra CLI not found")
+            return
+        except (OSError, ValueError) as e:
+            if self.transport is self.fallback:
+                self._report(f"Error enviando a Hydra: {e}")
+                return
+            self._report(f"Conexión con Hydra perdida ({e}); usando un proceso por mensaje")
+            self.transport.close(0)
+            self.transport = self.fallback
+            self._retry_at = time.monotonic() + RECONNECT_SECONDS
+            return self._write(batch)
+        self.sent += len(batch)
+        self.batches += 1
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            stopping = None in batch
+            batch = [m for m in batch if m is not None]
+            if batch:
+                self._write(batch)
+            self.fallback.reap()
+            if stopping:
+                return
@@ -0,0 +1,335 @@
+"""Formato columnar compacto para las sesiones de hydra_observer.
+
+Convierte los logs de una sesión (NDJSON de hydra_log o el JSON antiguo)
+en un directorio con un array NumPy (.npy) por columna y tipo de evento.
+Los arrays se abren con memory-map, así que las consultas sobre meses de
+sesiones solo leen del disco las columnas y rangos de tiempo que usan.
+
+Estructura:
+    logs/columnar/session_{id}/
+        meta.json            Versión, filas por tabla y rango de tiempo
+        strings.json         Diccionario de textos (ventanas, teclas, ...)
+        system.time.npy      float64, segundos Unix (ordenado)
+        system.cpu.npy       float32
+        system.mem.npy       float32
+        system.window.npy    int32, índice en strings.json (-1 = None)
+        key.*.npy, click.*.npy, other.*.npy
+
+Los eventos 'system', 'key' y 'click' tienen columnas propias; el resto
+('audio', 'hydra', 'log_dropped', ...) va a la tabla 'other' con el tipo
+y el info serializado como texto.
+"""
+
+import heapq
+import json
+import os
+import re
+import shutil
+from array import array
+
+import numpy as np
+
+from hydra_log import iter_log_entries, session_files
+
+COLUMNAR_DIRNAME = 'columnar'
+FORMAT_VERSION = 1
+
+# {tabla: {columna: dtype}}; todas las tablas tienen además 'time' (float64)
+SCHEMA = {
+    'system': {'cpu': 'f4', 'mem': 'f4', 'window': 'i4'},
+    'key': {'key': 'i4'},
+    'click': {'x': 'i4', 'y': 'i4', 'button': 'i4'},
+    'other': {'event': 'i4', 'info': 'i4'},
+}
+# Columnas que guardan índices en strings.json
+STRING_COLUMNS = {'window', 'key', 'button', 'event', 'info'}
+TYPECODES = {'f8': 'd', 'f4': 'f', 'i4': 'i'}
+
+SESSION_FILE_RE = re.compile(r'^session_(.+?)(?:_(\d{3}))?\.(json|ndjson(?:\.gz|\.zst)?)$')
+
+
+def table_for(event_type):
+    """Tabla donde se guarda un tipo de evento."""
+    return event_type if event_type in SCHEMA else 'other'
+
+
+class ColumnBuilder:
+    """Acumula eventos en arrays tipados (compactos) antes de volcarlos a NumPy."""
+
+    def __init__(self):
+        self.strings = []
+        self._codes = {}
+        self._columns = {
+            table: {col: array(TYPECODES[dtype]) for col, dtype in {'time': 'f8', **cols}.items()}
+            for table, cols in SCHEMA.items()
+        }
+
+    def intern(self, value):
+        """Código de un texto en el diccionario (-1 para None)."""
+        if value is None:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def add(self, entry):
+        """Agrega un evento {'time', 'event', 'info'}."""
+        event = entry.get('event')
+        info = entry.get('info')
+        table = table_for(event)
+        cols = self._columns[table]
+        cols['time'].append(float(entry.get('time') or 0.0))
+        if table == 'system':
+            info = info if isinstance(info, dict) else {}
+            cols['cpu'].append(float(info.get('cpu', np.nan)))
+            cols['mem'].append(float(info.get('mem', np.nan)))
+            cols['window'].append(self.intern(info.get('window')))
+        elif table == 'key':
+            cols['key'].append(self.intern(None if info is None else str(info)))
+        elif table == 'click':
+            info = info if isinstance(info, dict) else {}
+            x, y = (info.get('pos') or (0, 0))[:2]
+            cols['x'].append(int(x))
+            cols['y'].append(int(y))
+            cols['button'].append(self.intern(info.get('button')))
+        else:
+            cols['event'].append(self.intern(event))
+            cols['info'].append(self.intern(json.dumps(info, separators=(',', ':'),
+                                                       default=str)))
+
+    def finish(self):
+        """Convierte a arrays NumPy ordenados por tiempo.
+
+        Returns:
+            dict: {tabla: {columna: np.ndarray}}
+        """
+        tables = {}
+        for table, cols in self._columns.items():
+            arrays = {col: np.frombuffer(values, dtype=np.dtype(
+                          SCHEMA[table].get(col, 'f8'))).copy()
+                      for col, values in cols.items()}
+            order = np.argsort(arrays['time'], kind='stable')
+            tables[table] = {col: values[order] for col, values in arrays.items()}
+        return tables
+
+
+class SessionColumns:
+    """Columnas de una sesión, en memoria o abiertas con memory-map desde disco.
+
+    Args:
+        session_id: Identificador de la sesión
+        tables: {tabla: {columna: np.ndarray}} (None si se cargan de `path`)
+        strings: Diccionario de textos
+        path: Directorio columnar de la sesión (para carga perezosa)
+        meta: Contenido de meta.json
+    """
+
+    def __init__(self, session_id, tables=None, strings=None, path=None, meta=None):
+        self.session_id = session_id
+        self.path = path
+        self._tables = tables
+        self._strings = strings
+        if meta is None:
+            meta = {'rows': {t: len(c['time']) for t, c in tables.items()},
+                    'time_range': _time_range(tables)}
+        self.meta = meta
+
+    @classmethod
+    def from_entries(cls, session_id, entries):
+        """Construye las columnas en memoria a partir de eventos."""
+        builder = ColumnBuilder()
+        for entry in entries:
+            builder.add(entry)
+        return cls(session_id, builder.finish(), builder.strings)
+
+    @classmethod
+    def open(cls, path):
+        """Abre una sesión columnar leyendo solo meta.json."""
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        return cls(meta['session_id'], path=path, meta=meta)
+
+    @property
+    def time_range(self):
+        return self.meta.get('time_range')
+
+    def rows(self, table):
+        return self.meta['rows'].get(table, 0)
+
+    @property
+    def strings(self):
+        if self._strings is None:
+            with open(os.path.join(self.path, 'strings.json'), 'r', encoding='utf-8') as f:
+                self._strings = json.load(f)
+        return self._strings
+
+    def column(self, table, col):
+        """Array de una columna (memory-mapped si la sesión está en disco)."""
+        if self._tables is not None:
+            return self._tables[table][col]
+        dtype = 'f8' if col == 'time' else SCHEMA[table][col]
+        if self.rows(table) == 0:
+            return np.empty(0, dtype=dtype)
+        return np.load(os.path.join(self.path, f'{table}.{col}.npy'), mmap_mode='r')
+
+    def time_slice(self, table, since=None, until=None):
+        """Rango [inicio, fin) de filas de `table` dentro de [since, until)."""
+        times = self.column(table, 'time')
+        start = 0 if since is None else int(np.searchsorted(times, since, side='left'))
+        end = len(times) if until is None else int(np.searchsorted(times, until, side='left'))
+        return slice(start, max(start, end))
+
+    def decode(self, codes):
+        """Convierte códigos de strings.json a textos (None para -1)."""
+        strings = self.strings
+        return [strings[c] if c >= 0 else None for c in codes]
+
+    def entry(self, table, cols, i):
+        """Reconstruye el evento original {'time', 'event', 'info'} de la fila i."""
+        text = self.strings
+        t = float(cols['time'][i])
+
+        def s(col):
+            code = int(cols[col][i])
+            return text[code] if code >= 0 else None
+
+        if table == 'system':
+            info = {'window': s('window'), 'cpu': float(cols['cpu'][i]),
+                    'mem': float(cols['mem'][i])}
+            return {'time': t, 'event': 'system', 'info': info}
+        if table == 'key':
+            return {'time': t, 'event': 'key', 'info': s('key')}
+        if table == 'click':
+            info = {'button': s('button'), 'pos': [int(cols['x'][i]), int(cols['y'][i])]}
+            return {'time': t, 'event': 'click', 'info': info}
+        return {'time': t, 'event': s('event'), 'info': json.loads(s('info'))}
+
+    def iter_entries(self, since=None, until=None):
+        """Eventos de todas las tablas en orden de tiempo, leyendo por bloques.
+
+        Yields:
+            dict: Eventos en el formato original
+        """
+        cursors = []
+        for table, schema in SCHEMA.items():
+            rows = self.time_slice(table, since, until)
+            if rows.stop > rows.start:
+                cols = {col: self.column(table, col) for col in ('time', *schema)}
+                cursors.append((table, cols, rows.start, rows.stop))
+        # Mezcla de las tablas (cada una ya ordenada) por tiempo
+        heads = [(float(cols['time'][start]), n, start) for n, (_, cols, start, _) in
+                 enumerate(cursors)]
+        heapq.heapify(heads)
+        while heads:
+            _, n, i = heapq.heappop(heads)
+            table, cols, _, stop = cursors[n]
+            yield self.entry(table, cols, i)
+            if i + 1 < stop:
+                heapq.heappush(heads, (float(cols['time'][i + 1]), n, i + 1))
+
+    def overlaps(self, since=None, until=None):
+        """False si la sesión queda entera fuera de [since, until)."""
+        if not self.time_range:
+            return False
+        start, end = self.time_range
+        return not ((since is not None and end < since) or (until is not None and start >= until))
+
+
+def _time_range(tables):
+    starts = [c['time'][0] for c in tables.values() if len(c['time'])]
+    ends = [c['time'][-1] for c in tables.values() if len(c['time'])]
+    return [float(min(starts)), float(max(ends))] if starts else None
+
+
+def group_sessions(directory):
+    """Agrupa los archivos de log por sesión.
+
+    Returns:
+        dict: {session_id: [paths ordenados por parte]}
+    """
+    sessions = {}
+    for path in session_files(directory):
+        match = SESSION_FILE_RE.match(os.path.basename(path))
+        if match:
+            sessions.setdefault(match.group(1), []).append(path)
+    return sessions
+
+
+def columnar_path(directory, session_id):
+    return os.path.join(directory, COLUMNAR_DIRNAME, f'session_{session_id}')
+
+
+def compact_session(directory, session_id, files=None, delete_source=False):
+    """Convierte los logs de una sesión al formato columnar.
+
+    El directorio se escribe primero con otro nombre y se renombra al
+    final, así que una conversión interrumpida no deja una sesión a medias.
+
+    Args:
+        directory: Directorio de logs
+        session_id: Sesión a convertir
+        files: Archivos de la sesión (por defecto se buscan en `directory`)
+        delete_source: Borrar los archivos NDJSON/JSON tras convertir
+
+    Returns:
+        str: Ruta del directorio columnar
+    """
+    if files is None:
+        files = group_sessions(directory).get(session_id, [])
+    entries = (e for path in files for e in iter_log_entries(path))
+    session = SessionColumns.from_entries(session_id, entries)
+
+    target = columnar_path(directory, session_id)
+    tmp = target + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for table, cols in session._tables.items():
+        if len(cols['time']) == 0:
+            continue
+        for col, values in cols.items():
+            np.save(os.path.join(tmp, f'{table}.{col}.npy'), values)
+    with open(os.path.join(tmp, 'strings.json'), 'w', encoding='utf-8') as f:
+        json.dump(session.strings, f, ensure_ascii=False)
+    meta = dict(session.meta, version=FORMAT_VERSION, session_id=session_id,
+                sources=[os.path.basename(p) for p in files])
+    with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+
+    if delete_source:
+        for path in files:
+            os.remove(path)
+    return target
+
+
+def iter_sessions(directory, since=None, until=None):
+    """Itera las sesiones de un directorio de logs en orden cronológico.
+
+    Las sesiones ya convertidas se abren con memory-map y se descartan por
+    su rango de tiempo sin leer sus columnas. Las que aún no se convirtieron
+    (p. ej. la sesión en curso) se leen del NDJSON a memoria.
+
+    Yields:
+        SessionColumns
+    """
+    columnar_dir = os.path.join(directory, COLUMNAR_DIRNAME)
+    found = {}
+    if os.path.isdir(columnar_dir):
+        for name in os.listdir(columnar_dir):
+            path = os.path.join(columnar_dir, name)
+            if name.startswith('session_') and not name.endswith('.tmp') \
+                    and os.path.isfile(os.path.join(path, 'meta.json')):
+                found[name[len('session_'):]] = path
+    raw = {sid: files for sid, files in group_sessions(directory).items() if sid not in found}
+
+    for session_id in sorted(set(found) | set(raw)):
+        if session_id in found:
+            session = SessionColumns.open(found[session_id])
+        else:
+            entries = (e for path in raw[session_id] for e in iter_log_entries(path))
+            session = SessionColumns.from_entries(session_id, entries)
+        if session.overlaps(since, until):
+            yield session
@@ -0,0 +1,252 @@
+"""Log de sesión en streaming (NDJSON) para hydra_observer.
+
+En lugar de acumular todos los eventos en una lista y escribirla al
+salir, los eventos se encolan en una cola acotada y un thread escritor
+los vuelca a disco por lotes, una línea JSON por evento. Si el proceso
+muere, lo escrito hasta el último flush queda en disco.
+
+Características:
+    - Cola acotada: la memoria no crece con la duración de la sesión
+    - Escritura por lotes con buffer y fsync periódico (no en cada evento)
+    - Rotación de archivos por tamaño y/o tiempo
+    - Compresión opcional con gzip o zstd (si `zstandard` está instalado)
+    - Lectura de logs NDJSON (comprimidos o no) y del formato JSON antiguo
+
+Archivos generados:
+    logs/session_{id}_000.ndjson[.gz|.zst], session_{id}_001..., etc.
+
+Uso:
+    >>> writer = SessionLogWriter("logs", "20250101_120000", compress="gzip")
+    >>> writer.start()
+    >>> writer.write({"time": 0.0, "event": "key", "info": "a"})
+    >>> writer.close()
+"""
+
+import glob
+import gzip
+import io
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+QUEUE_MAX_EVENTS = 10000
+BATCH_MAX_EVENTS = 512
+FLUSH_INTERVAL = 1.0  # Segundos entre flush del buffer al sistema operativo
+FSYNC_INTERVAL = 5.0  # Segundos entre fsync (durabilidad ante cortes de luz)
+ROTATE_BYTES = 64 * 1024 * 1024
+COMPRESS_EXTENSIONS = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+
+class SessionLogWriter:
+    """Escritor de eventos en NDJSON con un thread dedicado.
+
+    Args:
+        directory: Directorio de logs
+        session_id: Identificador de la sesión (parte del nombre de archivo)
+        compress: None, 'gzip' o 'zstd'
+        rotate_bytes: Rotar al superar estos bytes sin comprimir (None = nunca)
+        rotate_seconds: Rotar cada tantos segundos (None = nunca)
+        max_queue: Capacidad de la cola; con la cola llena los eventos se descartan
+        fsync_interval: Segundos entre fsync
+    """
+
+    def __init__(self, directory, session_id, compress=None, rotate_bytes=ROTATE_BYTES,
+                 rotate_seconds=None, max_queue=QUEUE_MAX_EVENTS, fsync_interval=FSYNC_INTERVAL):
+        if compress not in COMPRESS_EXTENSIONS:
+            raise ValueError(f"Compresión no soportada: {compress}")
+        if compress == 'zstd' and not ZSTD_AVAILABLE:
+            raise ValueError("Compresión zstd requiere: pip install zstandard")
+        self.directory = directory
+        self.session_id = session_id
+        self.compress = compress
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.fsync_interval = fsync_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.written = 0
+        self.part = -1
+        self.path = None
+        self._raw = None
+        self._stream = None
+        self._part_bytes = 0
+        self._part_started = 0.0
+        self._thread = None
+        self._closing = threading.Event()
+        os.makedirs(directory, exist_ok=True)
+
+    def start(self):
+        """Abre el primer archivo e inicia el thread escritor."""
+        self._open_next()
+        self._thread = threading.Thread(target=self._run, name='hydra-log-writer', daemon=True)
+        self._thread.start()
+        return self
+
+    def write(self, entry):
+        """Encola un evento sin bloquear.
+
+        Returns:
+            bool: False si la cola estaba llena y el evento se descartó
+        """
+        try:
+            self.queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout=10.0):
+        """Vacía la cola, hace fsync y cierra el archivo actual.
+
+        Si el thread escritor sigue ocupado tras `timeout`, no se toca el
+        archivo desde aquí (cerrarlo mientras escribe corrompería el stream
+        comprimido): el propio thread lo cierra al terminar.
+        """
+        self._closing.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return
+        self._close_part()
+
+    def _open_next(self):
+        self._close_part()
+        self.part += 1
+        name = f"session_{self.session_id}_{self.part:03d}.ndjson"
+        self.path = os.path.join(self.directory, name + COMPRESS_EXTENSIONS[self.compress])
+        self._raw = open(self.path, 'ab', buffering=1 << 16)
+        if self.compress == 'gzip':
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode='ab')
+        elif self.compress == 'zstd':
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+        self._part_bytes = 0
+        self._part_started = time.time()
+
+    def _flush(self, fsync=False):
+        if self._stream is None:
+            return
+        if self.compress == 'gzip':
+            self._stream.flush(zlib.Z_SYNC_FLUSH)
+        elif self.compress == 'zstd':
+            self._stream.flush(zstandard.FLUSH_BLOCK)
+        self._raw.flush()
+        if fsync:
+            os.fsync(self._raw.fileno())
+
+    def _close_part(self):
+        if self._stream is None:
+            return
+        self._flush(fsync=True)
+        if self._stream is not self._raw:
+            # Escribe el final del stream comprimido; no cierra el archivo
+            self._stream.close()
+        self._raw.close()
+        self._stream = None
+        self._raw = None
+
+    def _should_rotate(self):
+        if self.rotate_bytes and self._part_bytes >= self.rotate_bytes:
+            return True
+        if self.rotate_seconds and time.time() - self._part_started >= self.rotate_seconds:
+            return True
+        return False
+
+    def _drain_batch(self):
+        """Espera hasta FLUSH_INTERVAL por un evento y toma los que haya en cola."""
+        batch = []
+        try:
+            batch.append(self.queue.get(timeout=FLUSH_INTERVAL))
+        except queue.Empty:
+            return batch
+        while len(batch) < BATCH_MAX_EVENTS:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        last_flush = last_fsync = time.monotonic()
+        reported_drops = 0
+        while not (self._closing.is_set() and self.queue.empty()):
+            batch = self._drain_batch()
+            if self.dropped > reported_drops:
+                # Dejar constancia en el propio log de los eventos perdidos
+                batch.append({"time": time.time(), "event": "log_dropped",
+                              "info": {"count": self.dropped - reported_drops}})
+                reported_drops = self.dropped
+            if batch:
+                data = ''.join(json.dumps(e, separators=(',', ':'), default=str) + '\n'
+                               for e in batch).encode()
+                self._stream.write(data)
+                self._part_bytes += len(data)
+                self.written += len(batch)
+            now = time.monotonic()
+            if now - last_flush >= FLUSH_INTERVAL:
+                fsync = now - last_fsync >= self.fsync_interval
+                self._flush(fsync=fsync)
+                last_flush = now
+                if fsync:
+                    last_fsync = now
+            if self._should_rotate():
+                self._open_next()
+        self._close_part()
+
+
+def open_log(path):
+    """Abre un archivo de log en modo texto, descomprimiendo según la extensión."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if path.endswith('.zst'):
+        if not ZSTD_AVAILABLE:
+            raise ValueError("Leer logs .zst requiere: pip install zstandard")
+        raw = open(path, 'rb')
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_log_entries(path):
+    """Itera los eventos de un archivo de log sin cargarlo entero.
+
+    Soporta NDJSON (plano, .gz o .zst) y el formato antiguo de un único
+    array JSON (session_*.json). Un final truncado por un cierre abrupto
+    se ignora en silencio.
+
+    Yields:
+        dict: Eventos con claves 'time', 'event' e 'info'
+    """
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+        return
+    with open_log(path) as f:
+        try:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    return  # Última línea incompleta
+        except (EOFError, zlib.error):
+            return  # Archivo comprimido sin cerrar correctamente
+
+
+def session_files(directory, session_id=None):
+    """Lista los archivos de log de una sesión (o de todas) en orden."""
+    pattern = f"session_{session_id}*" if session_id else "session_*"
+    return sorted(p for p in glob.glob(os.path.join(directory, pattern))
+                  if p.endswith(('.json', '.ndjson', '.ndjson.gz', '.ndjson.zst')))
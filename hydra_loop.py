@@ -0,0 +1,208 @@
+"""Núcleo asyncio de hydra_observer.
+
+Un único event loop coordina todo el observer:
+    - Los listeners de pynput (threads propios) entregan los eventos al loop
+      con call_soon_threadsafe; nunca esperan a disco ni a otros threads
+    - El muestreo del sistema y la consulta de la ventana activa son tareas
+      periódicas del loop, con horario fijo (sin deriva acumulada)
+    - El trabajo bloqueante (consultar ventanas) va a un thread con
+      asyncio.to_thread; el audio y el log ya escriben en sus propios threads
+    - Métricas: profundidad de la cola, eventos descartados, lag del loop y
+      duración de cada tarea periódica
+
+Ejemplo:
+    >>> loop = ObserverLoop(sink=log_writer.write)
+    >>> loop.every(2.0, sample_system, name='system')
+    >>> asyncio.run(loop.run())          # Hasta loop.stop() o Ctrl+C
+    >>> loop.submit('key', 'a')           # Desde cualquier thread
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+
+EVENT_QUEUE_MAX = 10000
+LAG_CHECK_INTERVAL = 0.1  # Segundos entre mediciones del lag del loop
+
+
+class TaskStats:
+    """Contadores de una tarea periódica."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.runs = 0
+        self.errors = 0
+        self.overruns = 0  # Ticks que empezaron tarde porque el anterior no terminó a tiempo
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+
+    def as_dict(self):
+        return {'interval': self.interval, 'runs': self.runs, 'errors': self.errors,
+                'overruns': self.overruns, 'last_ms': round(self.last_ms, 2),
+                'max_ms': round(self.max_ms, 2)}
+
+
+class ObserverLoop:
+    """Cola de eventos y tareas periódicas sobre un event loop de asyncio.
+
+    Args:
+        sink: Función que recibe cada evento {'time', 'event', 'info'} (no
+            debe bloquear; p. ej. SessionLogWriter.write)
+        max_queue: Capacidad de la cola de eventos
+        on_error: Callback(nombre_tarea, excepción) para errores de tareas
+    """
+
+    def __init__(self, sink, max_queue=EVENT_QUEUE_MAX, on_error=None):
+        self.sink = sink
+        self.max_queue = max_queue
+        self.on_error = on_error
+        self.tasks = {}  # {nombre: (intervalo, función, TaskStats)}
+        self.queue = None
+        self.events = 0
+        self.dropped = 0
+        self.queue_peak = 0
+        self.lag = 0.0
+        self.lag_max = 0.0
+        self._handed_off = 0  # Entregas con call_soon_threadsafe (desde otros threads)
+        self._received = 0  # Entregas ya procesadas en el loop
+        self._handoff_lock = threading.Lock()
+        self._loop = None
+        self._loop_thread = None
+        self._stopping = None
+
+    def every(self, interval, func, name=None):
+        """Registra una tarea periódica (función normal o corrutina).
+
+        Las funciones normales se ejecutan en el loop, así que deben ser
+        rápidas; para trabajo bloqueante usar una corrutina con to_thread.
+        """
+        name = name or func.__name__
+        self.tasks[name] = (interval, func, TaskStats(interval))
+        return self
+
+    def submit(self, event_type, info):
+        """Registra un evento desde cualquier thread sin bloquear.
+
+        Returns:
+            bool: False si el evento se descartó por la cola llena. Desde
+            otros threads el descarte ocurre después, en el loop, y solo
+            queda contado en metrics()['dropped']
+        """
+        entry = {"time": time.time(), "event": event_type, "info": info}
+        loop = self._loop
+        if loop is None:
+            self.sink(entry)  # Loop aún no iniciado o ya detenido
+            return True
+        if threading.get_ident() == self._loop_thread:
+            return self._enqueue(entry, handoff=False)
+        try:
+            loop.call_soon_threadsafe(self._enqueue, entry)
+        except RuntimeError:  # El loop se cerró entre la comprobación y la llamada
+            self.sink(entry)
+            return True
+        with self._handoff_lock:
+            self._handed_off += 1
+        return True
+
+    def _enqueue(self, entry, handoff=True):
+        if handoff:
+            self._received += 1
+        try:
+            self.queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.queue_peak = max(self.queue_peak, self.queue.qsize())
+        return True
+
+    def metrics(self):
+        """Estado actual del loop.
+
+        Returns:
+            dict: queue_depth, queue_peak, handoff_pending, events, dropped,
+            lag_ms, lag_max_ms y estadísticas por tarea
+        """
+        return {
+            'queue_depth': self.queue.qsize() if self.queue is not None else 0,
+            'queue_peak': self.queue_peak,
+            'handoff_pending': max(0, self._handed_off - self._received),
+            'events': self.events,
+            'dropped': self.dropped,
+            'lag_ms': round(self.lag * 1000, 2),
+            'lag_max_ms': round(self.lag_max * 1000, 2),
+            'tasks': {name: stats.as_dict() for name, (_, _, stats) in self.tasks.items()},
+        }
+
+    def stop(self):
+        """Pide que run() termine (seguro desde cualquier thread)."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+    async def run(self):
+        """Ejecuta el consumidor, las tareas periódicas y el monitor de lag.
+
+        Termina con stop() o al cancelarse; los eventos en cola se entregan
+        al sink antes de salir.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self.queue = asyncio.Queue(self.max_queue)
+        self._stopping = asyncio.Event()
+        workers = [asyncio.create_task(self._consume(), name='events'),
+                   asyncio.create_task(self._watch_lag(), name='lag')]
+        workers += [asyncio.create_task(self._periodic(name), name=name) for name in self.tasks]
+        try:
+            await self._stopping.wait()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._loop = None
+            self._drain()
+
+    async def _consume(self):
+        while True:
+            entry = await self.queue.get()
+            self.sink(entry)
+            self.events += 1
+
+    def _drain(self):
+        while not self.queue.empty():
+            self.sink(self.queue.get_nowait())
+            self.events += 1
+
+    async def _watch_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + LAG_CHECK_INTERVAL
+            await asyncio.sleep(LAG_CHECK_INTERVAL)
+            self.lag = max(0.0, loop.time() - expected)
+            self.lag_max = max(self.lag_max, self.lag)
+
+    async def _periodic(self, name):
+        interval, func, stats = self.tasks[name]
+        loop = asyncio.get_running_loop()
+        next_run = loop.time()
+        while True:
+            started = loop.time()
+            try:
+                result = func()
+                if inspect.isawaitable(result):
+                    await result
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                stats.errors += 1
+                if self.on_error:
+                    self.on_error(name, e)
+            elapsed = (loop.time() - started) * 1000
+            stats.runs += 1
+            stats.last_ms = elapsed
+            stats.max_ms = max(stats.max_ms, elapsed)
+            next_run += interval
+            if next_run < loop.time():
+                # Se saltan los ticks perdidos en lugar de ejecutarlos en ráfaga
+                stats.overruns += 1
+                next_run = loop.time()
+            await asyncio.sleep(next_run - loop.time())
@@ -9,32 +9,46 @@ Características:
     - Registro de eventos de teclado y mouse (respetando privacidad)
     - Detección de ventana activa
     - Contextos inteligentes que activan acciones (grabación de audio, HUD)
-    - Logs JSON estructurados por sesión
+    - Log de sesión en streaming (NDJSON) escrito por un thread dedicado
+    - Núcleo asyncio (hydra_loop.py): entrada, muestreo y audio en paralelo,
+      con métricas de profundidad de cola y lag del loop
 
 Uso:
     python3 hydra_observer.py
 
 Variables de entorno:
     HYDRA_CLI: Path al CLI de Hydra para enviar comandos (opcional)
-
-El programa se ejecuta hasta recibir Ctrl+C. Todos los eventos se guardan
-en logs/session_{timestamp}.json
+    HYDRA_CHANNEL: 'auto', 'socket', 'pipe' o 'spawn' (ver hydra_channel.py)
+    HYDRA_SOCKET: Socket Unix de Hydra para el modo socket (opcional)
+    HYDRA_PIPE_ARGS: Argumentos con los que HYDRA_CLI lee mensajes por
+        stdin; obligatorios con HYDRA_CHANNEL=pipe
+    HYDRA_RULES: Archivo de reglas de contexto (default: hydra_rules.json)
+    HYDRA_LOG_COMPRESS: 'gzip' o 'zstd' para comprimir el log (opcional)
+    HYDRA_LOG_ROTATE_MB: Tamaño en MB a partir del cual rotar el log (default: 64)
+    HYDRA_AUDIO_PREROLL: Segundos de audio anteriores al trigger (default: 5)
+    HYDRA_AUDIO_POSTROLL: Segundos de audio posteriores al trigger (default: 5)
+    HYDRA_AUDIO_FORMAT: 'wav' o 'flac' (default: wav)
+    HYDRA_AUDIO_COOLDOWN: Segundos mínimos entre capturas de audio (default: 30)
+
+El programa se ejecuta hasta recibir Ctrl+C. Los eventos se escriben a
+medida que ocurren en logs/session_{timestamp}_NNN.ndjson (ver hydra_log.py)
+y al salir se guarda una copia columnar en logs/columnar/ para consultarla
+con hydra_query.py.
 """
 
-import json
+import asyncio
 import os
-import time
 import datetime
-import threading
-import subprocess
+import shlex
 import psutil
 from pynput import keyboard, mouse
-import numpy as np
-import sounddevice as sd
-try:
-    import pygetwindow as gw
-except (ImportError, ModuleNotFoundError):
-    gw = None
+from hydra_audio import AudioRecorder
+from hydra_channel import HydraChannel
+from hydra_log import SessionLogWriter
+from hydra_loop import ObserverLoop
+from hydra_rules import RuleEngine
+from hydra_columnar import compact_session
+from window_tracker import WINDOW_POLL_INTERVAL, tracker as window_tracker
 
 try:
     from colorama import init as colorama_init, Fore, Style
@@ -47,13 +61,20 @@ LOG_DIR = os.path.join(os.path.dirname(__file__), "logs")
 os.makedirs(LOG_DIR, exist_ok=True)
 
 session_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-log_file = os.path.join(LOG_DIR, f"session_{session_id}.json")
-logs = []
-log_lock = threading.Lock()
+log_writer = SessionLogWriter(
+    LOG_DIR,
+    session_id,
+    compress=os.environ.get("HYDRA_LOG_COMPRESS") or None,
+    rotate_bytes=int(float(os.environ.get("HYDRA_LOG_ROTATE_MB", 64)) * 1024 * 1024),
+)
 
 HYDRA_CLI = os.environ.get("HYDRA_CLI", "hydra")
 USER_CONSENT = False  # Se establecerá en tiempo de ejecución después de la confirmación del usuario
 SLEEP_DURATION = 2  # Segundos entre comprobaciones del sistema
+METRICS_INTERVAL = 30  # Segundos entre registros de métricas del event loop
+RULES_FILE = os.environ.get(
+    "HYDRA_RULES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "hydra_rules.json")
+)
 
 
 def color(text, c):
@@ -71,20 +92,27 @@ def color(text, c):
     return f"{c}{text}{Style.RESET_ALL}"
 
 
+def task_error(name, error):
+    """Callback de observer_loop cuando una tarea periódica falla."""
+    print(color(f"[Hydra] Error en la tarea '{name}': {error}", Fore.RED))
+
+
+observer_loop = ObserverLoop(sink=log_writer.write, on_error=task_error)
+
+
 def log_event(event_type, info):
     """Registra un evento en el log de la sesión de forma thread-safe.
 
+    Desde los threads de pynput (u otros), el evento se entrega al event
+    loop con call_soon_threadsafe y vuelve de inmediato; el loop lo pasa a
+    log_writer, cuyo thread lo escribe a disco. Si alguna cola está llena
+    el evento se descarta y queda contado en las métricas.
+
     Args:
         event_type: Tipo de evento ('key', 'click', 'system', 'audio', 'hydra')
         info: Información adicional del evento (dict, str, o cualquier JSON serializable)
     """
-    entry = {
-        "time": time.time(),
-        "event": event_type,
-        "info": info,
-    }
-    with log_lock:
-        logs.append(entry)
+    observer_loop.submit(event_type, info)
 
 
 def display_metrics(cpu, mem):
@@ -100,25 +128,39 @@ def display_metrics(cpu, mem):
     print(color(f"CPU [{cpu:5.1f}%] {cpu_bar:<20} MEM [{mem:5.1f}%] {mem_bar:<20}", Fore.BLUE))
 
 
-def record_audio(duration=5, samplerate=44100):
-    """Graba un clip de audio y lo guarda en el directorio de logs.
+def audio_saved(path, seconds):
+    """Callback de audio_recorder al terminar de escribir un clip."""
+    print(color(f"[Hydra] Audio saved to {path} ({seconds:.1f}s)", Fore.YELLOW))
+    log_event("audio", {"file": path, "seconds": round(seconds, 2)})
 
-    Útil para capturar loops musicales cuando se detecta contexto de música.
 
-    Args:
-        duration: Duración de la grabación en segundos (default: 5)
-        samplerate: Frecuencia de muestreo en Hz (default: 44100)
+audio_recorder = AudioRecorder(
+    LOG_DIR,
+    pre_roll=float(os.environ.get("HYDRA_AUDIO_PREROLL", 5)),
+    post_roll=float(os.environ.get("HYDRA_AUDIO_POSTROLL", 5)),
+    fmt=os.environ.get("HYDRA_AUDIO_FORMAT", "wav"),
+    cooldown=float(os.environ.get("HYDRA_AUDIO_COOLDOWN", 30)),
+    on_saved=audio_saved,
+    on_error=lambda text: print(color(f"[Hydra] {text}", Fore.RED)),
+)
 
-    Note:
-        Guarda el archivo como numpy array (.npy) para facilitar procesamiento
+
+def record_audio():
+    """Guarda un clip de audio en el directorio de logs sin bloquear.
+
+    Útil para capturar loops musicales cuando se detecta contexto de música.
+    El clip incluye los segundos anteriores al trigger (pre-roll, tomados
+    del buffer circular) y los siguientes (post-roll); el thread escritor
+    de audio_recorder lo guarda como WAV o FLAC.
+
+    Returns:
+        str or None: Ruta del clip, o None si se ignoró por el cooldown o
+        no hay micrófono
     """
-    print(color("[Hydra] Capturing audio loop...", Fore.MAGENTA))
-    audio = sd.rec(int(samplerate * duration), samplerate=samplerate, channels=2)
-    sd.wait()
-    path = os.path.join(LOG_DIR, f"audio_{int(time.time())}.npy")
-    np.save(path, audio)
-    print(color(f"[Hydra] Audio saved to {path}", Fore.YELLOW))
-    log_event("audio", {"file": path})
+    path = audio_recorder.trigger()
+    if path:
+        print(color("[Hydra] Capturing audio loop...", Fore.MAGENTA))
+    return path
 
 
 def active_window_title():
@@ -128,18 +170,12 @@ def active_window_title():
         str or None: Título de la ventana activa, o None si no se puede obtener
 
     Note:
-        Requiere pygetwindow instalado. Retorna None si no está disponible
-        o si ocurre un error al consultar ventanas del sistema.
+        Lee el valor en caché de window_tracker, que la tarea poll_window
+        actualiza cada WINDOW_POLL_INTERVAL segundos; no consulta al sistema de ventanas,
+        así que es seguro llamarla desde los listeners de teclado y ratón.
+        Requiere pygetwindow instalado; sin él siempre retorna None.
     """
-    if gw is None:
-        return None
-    try:
-        win = gw.getActiveWindow()
-        if win:
-            return win.title
-    except (AttributeError, OSError):
-        pass
-    return None
+    return window_tracker.title()
 
 
 def on_key_press(key):
@@ -160,52 +196,110 @@ def on_click(x, y, button, pressed):
         log_event("click", {"button": str(button), "pos": [x, y]})
 
 
-shutdown_flag = False
+def sample_system():
+    """Tarea periódica: registra CPU, memoria y ventana y evalúa las reglas.
+
+    Se ejecuta en el event loop cada SLEEP_DURATION segundos. Todo lo que
+    hace es rápido: psutil sin intervalo, el título desde la caché y las
+    acciones de las reglas se encolan en su propio pool.
+    """
+    window = active_window_title()
+    cpu = psutil.cpu_percent(interval=None)
+    mem = psutil.virtual_memory().percent
+    log_event("system", {"window": window, "cpu": cpu, "mem": mem})
+    display_metrics(cpu, mem)
+    rule_engine.evaluate(window)
+
+
+async def poll_window():
+    """Tarea periódica: consulta la ventana activa en un thread (puede tardar)."""
+    await asyncio.to_thread(window_tracker.refresh)
+
+
+def log_loop_metrics():
+    """Tarea periódica: guarda en el log la profundidad de la cola y el lag del loop."""
+    log_event("loop_metrics", observer_loop.metrics())
 
 
-def monitor_system():
+async def monitor_system():
     """Monitorea el sistema continuamente y detecta contextos relevantes.
 
-    Ejecuta un loop que:
-    - Revisa uso de CPU y memoria cada SLEEP_DURATION segundos
-    - Detecta la ventana activa
-    - Identifica contextos especiales (ZIP, music) en títulos de ventanas
-    - Activa acciones automáticas según el contexto detectado
+    Programa en el event loop:
+    - poll_window cada WINDOW_POLL_INTERVAL segundos
+    - sample_system cada SLEEP_DURATION segundos (CPU, memoria, reglas de
+      hydra_rules.json contra el título de la ventana)
+    - log_loop_metrics cada METRICS_INTERVAL segundos
 
-    El monitoreo continúa hasta que shutdown_flag se establece a True
-    o se recibe KeyboardInterrupt.
+    Los eventos de teclado y ratón llegan al mismo loop desde los threads
+    de pynput. El monitoreo continúa hasta observer_loop.stop() o Ctrl+C.
     """
-    while not shutdown_flag:
-        window = active_window_title()
-        cpu = psutil.cpu_percent(interval=None)
-        mem = psutil.virtual_memory().percent
-        log_event("system", {"window": window, "cpu": cpu, "mem": mem})
-        display_metrics(cpu, mem)
-        if window and "zip" in window.lower():
-            print(color("[Hydra] Detected ZIP context - launching HUD...", Fore.CYAN))
-            send_to_hydra("zip_hud")
-        elif window and "music" in window.lower():
-            print(color("[Hydra] Detected music context - listening for loops...", Fore.MAGENTA))
-            send_to_hydra("music_mode")
-            record_audio(5)
-        time.sleep(SLEEP_DURATION)
+    observer_loop.every(WINDOW_POLL_INTERVAL, poll_window, name="window")
+    observer_loop.every(SLEEP_DURATION, sample_system, name="system")
+    observer_loop.every(METRICS_INTERVAL, log_loop_metrics, name="metrics")
+    await observer_loop.run()
 
 
 def send_to_hydra(message):
-    """Envía un mensaje al CLI de Hydra si está configurado.
+    """Envía un mensaje a Hydra por el canal persistente.
 
     Args:
         message: Comando o mensaje a enviar a Hydra CLI
 
     Note:
-        El path del CLI se configura con la variable de entorno HYDRA_CLI.
-        Si el CLI no se encuentra, se imprime un error pero no se interrumpe la ejecución.
+        No bloquea: el mensaje se encola en hydra_channel y un thread lo
+        envía (ver hydra_channel.py para los transportes disponibles). Si
+        la cola está llena el mensaje se descarta y se registra como tal.
     """
-    try:
-        subprocess.Popen([HYDRA_CLI, message])
+    if hydra_channel.send(message):
         log_event("hydra", message)
+    else:
+        log_event("hydra_dropped", message)
+
+
+def hydra_error(text):
+    """Callback de hydra_channel para errores de envío."""
+    print(color(text, Fore.RED))
+
+
+hydra_channel = HydraChannel(
+    HYDRA_CLI,
+    mode=os.environ.get("HYDRA_CHANNEL", "auto"),
+    socket_path=os.environ.get("HYDRA_SOCKET"),
+    pipe_args=shlex.split(os.environ.get("HYDRA_PIPE_ARGS", "")),
+    on_error=hydra_error,
+)
+
+
+def print_action(value):
+    """Acción 'print' de las reglas: texto o {"text": ..., "color": "CYAN"}.
+
+    Un color desconocido en hydra_rules.json se muestra en cian en lugar de
+    hacer fallar la acción.
+    """
+    if isinstance(value, dict):
+        fore = getattr(Fore, str(value.get("color", "CYAN")).upper(), Fore.CYAN)
+        print(color(value.get("text", ""), fore))
+    else:
+        print(color(str(value), Fore.CYAN))
+
+
+RULE_ACTIONS = {
+    "print": print_action,
+    "hydra": send_to_hydra,
+    "audio": lambda _: record_audio(),
+}
+
+
+def load_rules(path=RULES_FILE):
+    """Carga el motor de reglas; sin archivo de reglas no se detectan contextos."""
+    try:
+        return RuleEngine.from_file(path, RULE_ACTIONS)
     except FileNotFoundError:
-        print(color("Hydra CLI not found", Fore.RED))
+        print(color(f"Rules file not found: {path}", Fore.RED))
+        return RuleEngine([], RULE_ACTIONS)
+
+
+rule_engine = load_rules()
 
 
 if __name__ == "__main__":
@@ -221,18 +315,31 @@ if __name__ == "__main__":
         USER_CONSENT = False
         print(color("⚠️  Monitoreo deshabilitado. Solo se registrarán métricas del sistema.", Fore.YELLOW))
 
+    log_writer.start()
+    audio_recorder.start()
+    hydra_channel.start()
     key_listener = keyboard.Listener(on_press=on_key_press)
     mouse_listener = mouse.Listener(on_click=on_click)
     key_listener.start()
     mouse_listener.start()
 
     try:
-        monitor_system()
+        asyncio.run(monitor_system())
     except KeyboardInterrupt:
         pass
     finally:
         key_listener.stop()
         mouse_listener.stop()
-        with open(log_file, "w") as f:
-            json.dump(logs, f, indent=2)
-        print(color(f"Logs saved to {log_file}", Fore.YELLOW))
+        metrics = observer_loop.metrics()
+        print(color(f"Event loop: {metrics['events']} eventos, {metrics['dropped']} descartados, "
+                    f"lag máx {metrics['lag_max_ms']} ms", Fore.YELLOW))
+        rule_engine.shutdown(wait=False)
+        hydra_channel.close()
+        audio_recorder.stop()
+        log_writer.close()
+        print(color(f"Logs saved to {LOG_DIR}/session_{session_id}_*.ndjson", Fore.YELLOW))
+        try:
+            # Copia columnar para consultas rápidas con hydra_query.py
+            print(color(f"Columnar session: {compact_session(LOG_DIR, session_id)}", Fore.YELLOW))
+        except (OSError, ValueError) as e:
+            print(color(f"No se pudo compactar la sesión: {e}", Fore.RED))
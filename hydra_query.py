@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""Consultas rápidas sobre las sesiones de hydra_observer.
+
+Trabaja sobre el formato columnar de hydra_columnar.py: cada consulta
+abre solo las columnas que necesita y, gracias a que el tiempo está
+ordenado, recorta cada sesión con búsqueda binaria. Las sesiones fuera
+del rango pedido se descartan leyendo solo su meta.json.
+
+Comandos:
+    compact   Convierte las sesiones NDJSON/JSON al formato columnar
+    events    Lista eventos filtrando por tipo, rango de tiempo y ventana
+    stats     CPU/memoria (muestras, media, mín, máx) y conteo de eventos
+    windows   Tiempo aproximado en cada ventana activa
+
+Fechas (--since/--until):
+    '2025-01-31', '2025-01-31T18:00', un timestamp Unix, o relativo
+    al momento actual: '90m', '12h', '7d'
+
+Uso:
+    python3 hydra_query.py compact
+    python3 hydra_query.py stats --since 30d --by day
+    python3 hydra_query.py windows --since 2025-01-01 --top 10
+    python3 hydra_query.py events --type system --window code --limit 20
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from hydra_columnar import SCHEMA, compact_session, group_sessions, columnar_path, iter_sessions
+
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+ACTIVE_SESSION_SECONDS = 60  # Sesiones modificadas hace menos se consideran en curso
+WINDOW_GAP_SECONDS = 10.0  # Huecos mayores entre muestras no cuentan como tiempo en la ventana
+RELATIVE_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400}
+
+
+def parse_time(value):
+    """Convierte una fecha de la línea de comandos a timestamp Unix.
+
+    Raises:
+        argparse.ArgumentTypeError: Si el formato no se reconoce
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    if value[-1:] in RELATIVE_UNITS and value[:-1].replace('.', '', 1).isdigit():
+        return time.time() - float(value[:-1]) * RELATIVE_UNITS[value[-1]]
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Fecha no reconocida: {value}")
+
+
+class RunningStats:
+    """Muestras, suma, mínimo y máximo acumulados por bloques de arrays."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def update(self, values):
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.total += float(values.sum(dtype=np.float64))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def as_dict(self):
+        if not self.count:
+            return {'samples': 0, 'mean': None, 'min': None, 'max': None}
+        return {'samples': self.count, 'mean': round(self.total / self.count, 2),
+                'min': round(self.min, 2), 'max': round(self.max, 2)}
+
+
+def local_days(times):
+    """Etiqueta 'YYYY-MM-DD' (hora local) de cada timestamp, vectorizado.
+
+    Usa el desfase horario del primer timestamp; suficiente para sesiones
+    que no cruzan un cambio de horario.
+    """
+    if len(times) == 0:
+        return np.empty(0, dtype='U10')
+    offset = datetime.datetime.fromtimestamp(float(times[0])).astimezone().utcoffset()
+    seconds = (np.asarray(times) + offset.total_seconds()).astype('int64')
+    return np.datetime_as_string(seconds.astype('datetime64[s]'), unit='D')
+
+
+def compute_stats(directory, since=None, until=None, by=None):
+    """Agrega CPU, memoria y conteo de eventos sin cargar las sesiones enteras.
+
+    Args:
+        directory: Directorio de logs
+        since, until: Rango de tiempo (timestamps Unix, None = sin límite)
+        by: None, 'session' o 'day' para agrupar
+
+    Returns:
+        dict: {grupo: {'cpu': {...}, 'mem': {...}, 'events': {tipo: n}}}
+    """
+    groups = {}
+
+    def group(name):
+        if name not in groups:
+            groups[name] = {'cpu': RunningStats(), 'mem': RunningStats(), 'events': Counter()}
+        return groups[name]
+
+    for session in iter_sessions(directory, since, until):
+        rows = session.time_slice('system', since, until)
+        times = session.column('system', 'time')[rows]
+        cpu = session.column('system', 'cpu')[rows]
+        mem = session.column('system', 'mem')[rows]
+        if by == 'day':
+            labels = local_days(times)
+            for day in np.unique(labels):
+                mask = labels == day
+                group(str(day))['cpu'].update(cpu[mask])
+                group(str(day))['mem'].update(mem[mask])
+        else:
+            name = session.session_id if by == 'session' else 'total'
+            group(name)['cpu'].update(cpu)
+            group(name)['mem'].update(mem)
+
+        for table in SCHEMA:
+            rows = session.time_slice(table, since, until)
+            if rows.stop <= rows.start:
+                continue
+            # En 'other' el tipo de evento es una columna; en el resto es la tabla
+            codes = np.asarray(session.column('other', 'event')[rows]) if table == 'other' else None
+            if by == 'day':
+                labels = local_days(session.column(table, 'time')[rows])
+                for day in np.unique(labels):
+                    mask = labels == day
+                    _count_events(group(str(day))['events'], session, table,
+                                  int(mask.sum()), None if codes is None else codes[mask])
+            else:
+                name = session.session_id if by == 'session' else 'total'
+                _count_events(group(name)['events'], session, table,
+                              rows.stop - rows.start, codes)
+
+    return {name: {'cpu': g['cpu'].as_dict(), 'mem': g['mem'].as_dict(),
+                   'events': dict(g['events'])}
+            for name, g in sorted(groups.items())}
+
+
+def _count_events(counter, session, table, n, codes=None):
+    if codes is None:
+        counter[table] += n
+        return
+    uniques, counts = np.unique(codes, return_counts=True)
+    for name, count in zip(session.decode(uniques.tolist()), counts.tolist()):
+        counter[name] += count
+
+
+def compute_window_time(directory, since=None, until=None):
+    """Tiempo aproximado (segundos) y muestras en cada ventana activa.
+
+    Cada muestra 'system' cuenta el tiempo hasta la siguiente, con un
+    máximo de WINDOW_GAP_SECONDS para no contar pausas del observer.
+
+    Returns:
+        list: [(título, segundos, muestras)] de mayor a menor tiempo
+    """
+    seconds = Counter()
+    samples = Counter()
+    for session in iter_sessions(directory, since, until):
+        rows = session.time_slice('system', since, until)
+        times = np.asarray(session.column('system', 'time')[rows])
+        codes = np.asarray(session.column('system', 'window')[rows])
+        if len(times) == 0:
+            continue
+        durations = np.minimum(np.diff(times, append=times[-1]), WINDOW_GAP_SECONDS)
+        # Códigos -1 (sin ventana) se desplazan a 0 para usar bincount
+        totals = np.bincount(codes + 1, weights=durations)
+        counts = np.bincount(codes + 1)
+        for code in np.nonzero(counts)[0]:
+            title = session.strings[code - 1] if code > 0 else None
+            seconds[title] += float(totals[code])
+            samples[title] += int(counts[code])
+    return sorted(((t, s, samples[t]) for t, s in seconds.items()), key=lambda r: -r[1])
+
+
+def iter_events(directory, event_type=None, since=None, until=None, window=None):
+    """Eventos en el formato original {'time', 'event', 'info'}, en orden por sesión.
+
+    Args:
+        event_type: Tipo de evento ('system', 'key', 'click', 'audio', ...)
+        window: Subcadena del título de ventana (solo eventos 'system')
+    """
+    if event_type is None:
+        tables = list(SCHEMA)
+    elif event_type in SCHEMA and event_type != 'other':
+        tables = [event_type]
+    else:
+        tables = ['other']
+    if window is not None:
+        tables = ['system']
+    window = window.lower() if window else None
+
+    for session in iter_sessions(directory, since, until):
+        merged = []
+        for table in tables:
+            rows = session.time_slice(table, since, until)
+            if rows.stop <= rows.start:
+                continue
+            cols = {col: session.column(table, col)[rows] for col in ('time', *SCHEMA[table])}
+            mask = np.ones(len(cols['time']), dtype=bool)
+            if window is not None:
+                matching = [i for i, s in enumerate(session.strings) if window in s.lower()]
+                mask &= np.isin(cols['window'], matching)
+            if table == 'other' and event_type not in (None, 'other'):
+                mask &= cols['event'] == _string_code(session, event_type)
+            for i in np.nonzero(mask)[0]:
+                merged.append(session.entry(table, cols, i))
+        merged.sort(key=lambda e: e['time'])
+        yield from merged
+
+
+def _string_code(session, value):
+    try:
+        return session.strings.index(value)
+    except ValueError:
+        return -2  # No coincide con ningún código
+
+
+def cmd_compact(args):
+    now = time.time()
+    converted = 0
+    for session_id, files in sorted(group_sessions(args.logs).items()):
+        if os.path.isdir(columnar_path(args.logs, session_id)) and not args.force:
+            continue
+        if not args.force and now - max(os.path.getmtime(p) for p in files) < ACTIVE_SESSION_SECONDS:
+            print(f"  {session_id}: en curso, se omite (usa --force)")
+            continue
+        path = compact_session(args.logs, session_id, files, delete_source=args.delete_source)
+        print(f"  {session_id}: {len(files)} archivo(s) -> {path}")
+        converted += 1
+    print(f"{converted} sesión(es) convertida(s)")
+
+
+def cmd_events(args):
+    for n, entry in enumerate(iter_events(args.logs, args.type, args.since, args.until,
+                                          args.window)):
+        if args.limit and n >= args.limit:
+            break
+        if args.json:
+            print(json.dumps(entry, ensure_ascii=False))
+        else:
+            stamp = datetime.datetime.fromtimestamp(entry['time']).isoformat(timespec='seconds')
+            print(f"{stamp}  {entry['event']:<8} {json.dumps(entry['info'], ensure_ascii=False)}")
+
+
+def cmd_stats(args):
+    stats = compute_stats(args.logs, args.since, args.until, args.by)
+    if args.json:
+        print(json.dumps(stats, indent=2))
+        return
+    for name, s in stats.items():
+        cpu, mem = s['cpu'], s['mem']
+        print(f"{name}")
+        for label, st in (('CPU', cpu), ('MEM', mem)):
+            if st['samples']:
+                print(f"  {label}  media {st['mean']:5.1f}%  mín {st['min']:5.1f}%  "
+                      f"máx {st['max']:5.1f}%  ({st['samples']} muestras)")
+        events = ', '.join(f"{k}={v}" for k, v in sorted(s['events'].items()))
+        print(f"  eventos: {events or '-'}")
+
+
+def cmd_windows(args):
+    rows = compute_window_time(args.logs, args.since, args.until)[:args.top]
+    if args.json:
+        print(json.dumps([{'window': t, 'seconds': round(s, 1), 'samples': n}
+                          for t, s, n in rows], indent=2, ensure_ascii=False))
+        return
+    for title, seconds, n in rows:
+        print(f"{seconds / 60:8.1f} min  {n:7d}  {title or '(sin ventana)'}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Consultas sobre sesiones de Hydra Observer")
+    parser.add_argument('--logs', default=LOG_DIR, help="Directorio de logs (default: logs/)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('compact', help="Convertir sesiones al formato columnar")
+    p.add_argument('--force', action='store_true',
+                   help="Reconvertir sesiones ya convertidas o en curso")
+    p.add_argument('--delete-source', action='store_true',
+                   help="Borrar los NDJSON/JSON tras convertir")
+    p.set_defaults(func=cmd_compact)
+
+    def add_range(p):
+        p.add_argument('--since', type=parse_time, help="Desde (fecha, timestamp o 7d/12h)")
+        p.add_argument('--until', type=parse_time, help="Hasta (exclusivo)")
+        p.add_argument('--json', action='store_true', help="Salida en JSON")
+
+    p = sub.add_parser('events', help="Listar eventos")
+    add_range(p)
+    p.add_argument('--type', help="Tipo de evento (system, key, click, audio, hydra...)")
+    p.add_argument('--window', help="Solo eventos system con esta subcadena en la ventana")
+    p.add_argument('--limit', type=int, default=100, help="Máximo de eventos (0 = todos)")
+    p.set_defaults(func=cmd_events)
+
+    p = sub.add_parser('stats', help="Estadísticas de CPU, memoria y eventos")
+    add_range(p)
+    p.add_argument('--by', choices=('session', 'day'), help="Agrupar por sesión o por día")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser('windows', help="Tiempo por ventana activa")
+    add_range(p)
+    p.add_argument('--top', type=int, default=20, help="Número de ventanas a mostrar")
+    p.set_defaults(func=cmd_windows)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not os.path.isdir(args.logs):
+        print(f"No existe el directorio de logs: {args.logs}", file=sys.stderr)
+        return 1
+    args.func(args)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
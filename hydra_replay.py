@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""Reproducción offline de sesiones de hydra_observer.
+
+Pasa una sesión grabada (logs NDJSON/JSON o columnar, más los clips de
+audio que capturó) por el mismo código que corre en vivo: el motor de
+reglas de hydra_rules.py con cada muestra de ventana y el análisis de
+bandas de spectrum.py con cada bloque de audio. Sin teclado, micrófono
+ni Hydra: las acciones de las reglas solo se cuentan.
+
+Sirve para dos cosas:
+    - Regresiones: las reglas disparadas de una sesión conocida se
+      comparan con un reporte guardado (--expect)
+    - Coste: eventos/s, ms en reglas y en DSP y factor respecto al tiempo
+      real, para medir cambios en reglas o en el análisis de audio
+
+Uso:
+    python3 hydra_replay.py --session 20250101_120000
+    python3 hydra_replay.py --session 20250101_120000 --json > baseline.json
+    python3 hydra_replay.py --session 20250101_120000 --expect baseline.json
+    python3 hydra_replay.py --session 20250101_120000 --speed 10  # 10x tiempo real
+    python3 hydra_replay.py --file logs/session_x_000.ndjson --audio logs/audio_x.npy
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import wave
+from collections import Counter
+from itertools import chain
+
+import numpy as np
+
+from hydra_columnar import SessionColumns, columnar_path, group_sessions
+from hydra_log import iter_log_entries
+from hydra_rules import RuleEngine
+from spectrum import band_amps
+
+try:
+    import soundfile
+    FLAC_AVAILABLE = True
+except (ImportError, OSError):
+    FLAC_AVAILABLE = False
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOG_DIR = os.path.join(BASE_DIR, "logs")
+RULES_FILE = os.path.join(BASE_DIR, "hydra_rules.json")
+FS = 44100
+BLOCKSIZE = 2205  # 50 ms, como el bloque de ondads.py
+N_BANDS = 7
+
+
+def load_audio(path):
+    """Lee un clip de audio (.npy, .wav o .flac) como float32 en [-1, 1].
+
+    Returns:
+        tuple: (array shape (n_samples, n_channels), samplerate o None si
+        el archivo no lo indica)
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.npy':
+        data, fs = np.load(path), None
+    elif ext == '.wav':
+        with wave.open(path, 'rb') as f:
+            if f.getsampwidth() != 2:
+                raise ValueError(f"{path}: solo se admite WAV de 16 bits")
+            raw = np.frombuffer(f.readframes(f.getnframes()), dtype='<i2')
+            data = raw.reshape(-1, f.getnchannels()) / 32768.0
+            fs = f.getframerate()
+    elif ext == '.flac':
+        if not FLAC_AVAILABLE:
+            raise ValueError(f"{path}: FLAC requiere soundfile (pip install soundfile)")
+        data, fs = soundfile.read(path, dtype='float32', always_2d=True)
+    else:
+        raise ValueError(f"{path}: formato de audio no soportado")
+    data = np.asarray(data, dtype=np.float32)
+    return (data[:, None] if data.ndim == 1 else data), fs
+
+
+def iter_session(directory, session_id):
+    """Eventos de una sesión: del NDJSON/JSON si existe, si no del formato columnar.
+
+    La sesión se busca al llamar, pero los eventos se leen a medida que se
+    consumen: las partes del log ya están en orden de tiempo y el formato
+    columnar mezcla sus tablas por bloques, así que no hace falta cargarla
+    entera ni reordenarla.
+
+    Raises:
+        FileNotFoundError: Si la sesión no existe en `directory`
+    """
+    files = group_sessions(directory).get(session_id)
+    if files:
+        return chain.from_iterable(iter_log_entries(path) for path in files)
+    path = columnar_path(directory, session_id)
+    if os.path.isfile(os.path.join(path, 'meta.json')):
+        return SessionColumns.open(path).iter_entries()
+    raise FileNotFoundError(f"No se encontró la sesión {session_id} en {directory}")
+
+
+class SessionReplay:
+    """Reproduce eventos grabados por las reglas y el DSP de audio.
+
+    Args:
+        rules: Lista de reglas (formato de hydra_rules.json)
+        fs: Frecuencia de muestreo de los clips sin cabecera (.npy)
+        blocksize: Muestras por bloque de análisis
+        n_bands: Bandas de frecuencia
+        speed: Velocidad respecto al tiempo real (0 = lo más rápido posible)
+        audio_dir: Directorio donde buscar los clips de los eventos 'audio'
+            cuya ruta grabada ya no existe
+
+    Example:
+        >>> replay = SessionReplay.from_file('hydra_rules.json')
+        >>> report = replay.run(iter_session('logs', '20250101_120000'))
+        >>> report['rules_fired']
+        {'music_mode': 3, 'zip_hud': 1}
+    """
+
+    def __init__(self, rules, fs=FS, blocksize=BLOCKSIZE, n_bands=N_BANDS, speed=0.0,
+                 audio_dir=None):
+        names = {name for spec in rules for action in spec.get('actions', [])
+                 for name in action}
+        self.actions = Counter()
+        # Las acciones solo se cuentan; max_workers=0 las ejecuta en el mismo
+        # thread para que el resultado no dependa del scheduling
+        self.engine = RuleEngine(rules, {name: self._recorder(name) for name in names},
+                                 max_workers=0)
+        self.fs = fs
+        self.blocksize = blocksize
+        self.n_bands = n_bands
+        self.speed = speed
+        self.audio_dir = audio_dir
+
+    @classmethod
+    def from_file(cls, path=RULES_FILE, **kwargs):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), **kwargs)
+
+    def _recorder(self, name):
+        def record(_value):
+            self.actions[name] += 1
+        return record
+
+    def _resolve_audio(self, info):
+        path = info.get('file') if isinstance(info, dict) else None
+        if not path:
+            return None
+        if os.path.isfile(path):
+            return path
+        if self.audio_dir:
+            local = os.path.join(self.audio_dir, os.path.basename(path))
+            if os.path.isfile(local):
+                return local
+        return None
+
+    def analyze_audio(self, path):
+        """Pasa un clip por band_amps() bloque a bloque.
+
+        Returns:
+            tuple: (bloques analizados, segundos de audio)
+
+        Raises:
+            ValueError: Si el formato del clip no está soportado
+        """
+        data, fs = load_audio(path)
+        fs = fs or self.fs
+        blocks = len(data) // self.blocksize
+        for i in range(blocks):
+            band_amps(data[i * self.blocksize:(i + 1) * self.blocksize], fs, self.n_bands)
+        return blocks, len(data) / fs
+
+    def run(self, entries, audio_files=()):
+        """Reproduce los eventos en orden y mide el coste de cada etapa.
+
+        Args:
+            entries: Eventos {'time', 'event', 'info'} ordenados por tiempo
+                (cualquier iterable; se consume una sola vez)
+            audio_files: Clips adicionales a analizar además de los
+                referenciados por eventos 'audio'. Los clips que no se
+                pueden leer se cuentan en 'invalid_clips' y se saltan
+
+        Returns:
+            dict: Conteo de eventos y reglas disparadas, tiempos y throughput
+        """
+        events = Counter()
+        fired = Counter()
+        rules_time = dsp_time = 0.0
+        blocks = 0
+        audio_seconds = 0.0
+        missing_audio = invalid_audio = 0
+        first = last = None
+
+        def analyze(path):
+            nonlocal dsp_time, blocks, audio_seconds, invalid_audio
+            t0 = time.perf_counter()
+            try:
+                n, seconds = self.analyze_audio(path)
+            except (ValueError, OSError, wave.Error):
+                # Clip ilegible (p. ej. WAV que no es de 16 bits): se cuenta y se sigue
+                invalid_audio += 1
+                return
+            dsp_time += time.perf_counter() - t0
+            blocks += n
+            audio_seconds += seconds
+
+        start = time.perf_counter()
+        for entry in entries:
+            t = entry.get('time') or 0.0
+            first = t if first is None else first
+            last = t
+            if self.speed > 0:
+                delay = (t - first) / self.speed - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            event = entry.get('event')
+            events[str(event)] += 1
+            info = entry.get('info')
+            if event == 'system':
+                window = info.get('window') if isinstance(info, dict) else None
+                t0 = time.perf_counter()
+                fired.update(self.engine.evaluate(window, now=t))
+                rules_time += time.perf_counter() - t0
+            elif event == 'audio':
+                path = self._resolve_audio(info)
+                if path is None:
+                    missing_audio += 1
+                    continue
+                analyze(path)
+        for path in audio_files:
+            analyze(path)
+        elapsed = time.perf_counter() - start
+
+        total = sum(events.values())
+        session_seconds = (last - first) if total else 0.0
+        return {
+            'events': total,
+            'by_type': dict(sorted(events.items())),
+            'rules_fired': dict(sorted(fired.items())),
+            'actions': dict(sorted(self.actions.items())),
+            'session_s': round(session_seconds, 3),
+            'elapsed_s': round(elapsed, 4),
+            'events_per_s': round(total / elapsed, 1) if elapsed > 0 else None,
+            'realtime_factor': round(session_seconds / elapsed, 1) if elapsed > 0 else None,
+            'rules_ms': round(rules_time * 1000, 3),
+            'dsp': {'blocks': blocks, 'audio_s': round(audio_seconds, 3),
+                    'ms': round(dsp_time * 1000, 3),
+                    'ms_per_block': round(dsp_time * 1000 / blocks, 4) if blocks else None,
+                    'missing_clips': missing_audio, 'invalid_clips': invalid_audio},
+        }
+
+
+def compare_reports(report, expected):
+    """Diferencias en eventos y reglas disparadas respecto a un reporte guardado.
+
+    Returns:
+        list: Descripción de cada diferencia (vacía si coinciden)
+    """
+    diffs = []
+    for key in ('by_type', 'rules_fired'):
+        got, want = report.get(key, {}), expected.get(key, {})
+        for name in sorted(set(got) | set(want)):
+            if got.get(name, 0) != want.get(name, 0):
+                diffs.append(f"{key}.{name}: esperado {want.get(name, 0)}, obtenido {got.get(name, 0)}")
+    return diffs
+
+
+def print_report(report):
+    print(f"Eventos: {report['events']}  "
+          f"({', '.join(f'{k}={v}' for k, v in report['by_type'].items()) or '-'})")
+    fired = ', '.join(f"{k}={v}" for k, v in report['rules_fired'].items())
+    print(f"Reglas disparadas: {fired or '-'}")
+    print(f"Tiempo: {report['elapsed_s']:.3f} s para {report['session_s']:.1f} s de sesión"
+          f"  -> {report['events_per_s'] or 0:,.0f} eventos/s, "
+          f"{report['realtime_factor'] or 0:,.0f}x tiempo real")
+    print(f"Reglas: {report['rules_ms']:.2f} ms")
+    dsp = report['dsp']
+    if dsp['blocks'] or dsp['missing_clips'] or dsp['invalid_clips']:
+        print(f"DSP: {dsp['blocks']} bloques ({dsp['audio_s']:.1f} s de audio) en "
+              f"{dsp['ms']:.2f} ms ({dsp['ms_per_block'] or 0:.3f} ms/bloque); "
+              f"clips no encontrados: {dsp['missing_clips']}, "
+              f"ilegibles: {dsp['invalid_clips']}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Reproducción offline de sesiones de Hydra")
+    parser.add_argument('--logs', default=LOG_DIR, help="Directorio de logs (default: logs/)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--session', help="Id de la sesión a reproducir")
+    source.add_argument('--file', nargs='+', help="Archivos de log a reproducir (en orden)")
+    parser.add_argument('--audio', nargs='*', default=[], help="Clips de audio adicionales")
+    parser.add_argument('--rules', default=RULES_FILE, help="Archivo de reglas")
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="Velocidad respecto al tiempo real (0 = sin esperas)")
+    parser.add_argument('--expect', help="Reporte JSON guardado con el que comparar")
+    parser.add_argument('--json', action='store_true', help="Salida en JSON")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.session:
+        try:
+            entries = iter_session(args.logs, args.session)
+        except FileNotFoundError as e:
+            print(e, file=sys.stderr)
+            return 1
+    else:
+        entries = chain.from_iterable(iter_log_entries(path) for path in args.file)
+
+    replay = SessionReplay.from_file(args.rules, speed=args.speed, audio_dir=args.logs)
+    try:
+        # Los logs se leen mientras se reproducen: un archivo inexistente o un
+        # JSON antiguo corrupto aparece recién aquí
+        report = replay.run(entries, args.audio)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    if args.expect:
+        with open(args.expect, 'r', encoding='utf-8') as f:
+            diffs = compare_reports(report, json.load(f))
+        for line in diffs:
+            print(f"DIFERENCIA {line}", file=sys.stderr)
+        return 1 if diffs else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
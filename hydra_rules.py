@@ -0,0 +1,243 @@
+"""Motor de reglas para la detección de contextos de hydra_observer.
+
+Las reglas se declaran en un archivo JSON (por defecto hydra_rules.json)
+en lugar de una cadena de if/elif en el código. Cada tick, el título de
+la ventana activa se compara contra todas las reglas de una pasada:
+
+    - Palabras clave ("match"): autómata Aho-Corasick, una sola pasada por
+      el título sin importar cuántas palabras haya
+    - Expresiones regulares ("regex"): se combinan en una única regex que
+      descarta de golpe los títulos que no coinciden con ninguna
+    - Los resultados se guardan por título: mientras la ventana no cambia,
+      evaluar cientos de reglas es una búsqueda en un dict
+
+Las acciones de las reglas que se disparan se ejecutan en un pool de
+workers acotado, así que una acción lenta no retrasa el siguiente tick.
+
+Formato del archivo (los comentarios // son solo ilustrativos, JSON no los admite):
+    [
+      {
+        "name": "zip_hud",
+        "match": ["zip", "winrar"],       // palabras, sin distinguir mayúsculas
+        "regex": "\\\\.(7z|rar)\\\\b",       // opcional, alternativa a "match"
+        "trigger": "edge",                 // "edge": al empezar a coincidir
+                                           // "level": cada tick mientras coincida
+        "cooldown": 10,                    // segundos mínimos entre disparos
+        "actions": [{"print": "..."}, {"hydra": "zip_hud"}]
+      }
+    ]
+
+Las acciones disponibles ("print", "hydra", "audio", ...) las registra
+quien crea el motor; cada acción recibe su valor como argumento.
+"""
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+RULE_WORKERS = 4
+RULE_MAX_PENDING = 32  # Acciones en cola o ejecutándose; el resto se descarta
+MATCH_CACHE_SIZE = 1024
+TRIGGERS = ('edge', 'level')
+
+
+class KeywordMatcher:
+    """Autómata Aho-Corasick: encuentra todas las palabras clave de un texto.
+
+    Args:
+        keywords: {palabra: set(ids)} ids asociados a cada palabra
+
+    Example:
+        >>> KeywordMatcher({'zip': {0}, 'music': {1}}).match('Song - Music Player')
+        {1}
+    """
+
+    def __init__(self, keywords):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [set()]
+        for word, ids in keywords.items():
+            state = 0
+            for ch in word.casefold():
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = self._goto[state][ch] = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(set())
+                state = nxt
+            self._out[state] |= set(ids)
+
+        # Enlaces de fallo en BFS; cada estado hereda las salidas de su fallo
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for ch, nxt in self._goto[state].items():
+                pending.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] |= self._out[self._fail[nxt]]
+
+    def match(self, text):
+        """ids de todas las palabras que aparecen en `text`."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        found = set()
+        for ch in text.casefold():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+
+class Rule:
+    """Regla ya validada (ver formato en la documentación del módulo)."""
+
+    def __init__(self, spec, index):
+        self.index = index
+        self.name = spec.get('name') or f'rule_{index}'
+        self.keywords = [k for k in spec.get('match', []) if k]
+        self.regex = spec.get('regex')
+        self.trigger = spec.get('trigger', 'edge')
+        self.cooldown = float(spec.get('cooldown', 0))
+        if not self.keywords and not self.regex:
+            raise ValueError(f"Regla '{self.name}': requiere 'match' o 'regex'")
+        if self.trigger not in TRIGGERS:
+            raise ValueError(f"Regla '{self.name}': trigger inválido '{self.trigger}'")
+        if any(not isinstance(a, dict) or len(a) != 1 for a in spec.get('actions', [])):
+            raise ValueError(f"Regla '{self.name}': cada acción es un objeto {{nombre: valor}}")
+        self.actions = [next(iter(a.items())) for a in spec.get('actions', [])]
+
+
+class RuleEngine:
+    """Evalúa reglas contra el título de la ventana y despacha sus acciones.
+
+    Args:
+        rules: Lista de reglas (dicts con el formato del archivo)
+        actions: {nombre: función(valor)} acciones disponibles
+        max_workers: Threads del pool de acciones (0 = ejecutar las acciones en
+            el mismo thread que evaluate(), útil para reproducir sesiones)
+        max_pending: Máximo de reglas con acciones en cola o en ejecución
+
+    Example:
+        >>> engine = RuleEngine.from_file('hydra_rules.json', {'hydra': send_to_hydra})
+        >>> engine.evaluate('Song - Music Player')
+        ['music_mode']
+    """
+
+    def __init__(self, rules, actions, max_workers=RULE_WORKERS, max_pending=RULE_MAX_PENDING):
+        self.rules = [Rule(spec, i) for i, spec in enumerate(rules)]
+        self.actions = actions
+        for rule in self.rules:
+            for name, _ in rule.actions:
+                if name not in actions:
+                    raise ValueError(f"Regla '{rule.name}': acción desconocida '{name}'")
+
+        keywords = {}
+        for rule in self.rules:
+            for word in rule.keywords:
+                keywords.setdefault(word.casefold(), set()).add(rule.index)
+        self._keywords = KeywordMatcher(keywords)
+        self._regex_rules = [(r.index, re.compile(r.regex, re.IGNORECASE))
+                             for r in self.rules if r.regex]
+        self._combined = (re.compile('|'.join(f'(?:{r.regex})' for r in self.rules if r.regex),
+                                     re.IGNORECASE) if self._regex_rules else None)
+        self._cache = OrderedDict()
+
+        self._active = frozenset()
+        self._last_fired = {}
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = (ThreadPoolExecutor(max_workers, thread_name_prefix='hydra-rule')
+                          if max_workers else None)
+        self.dropped = 0
+        self.errors = 0
+
+    @classmethod
+    def from_file(cls, path, actions, **kwargs):
+        """Carga las reglas de un archivo JSON."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), actions, **kwargs)
+
+    def matches(self, title):
+        """Índices de las reglas que coinciden con el título (con caché por título)."""
+        if not title:
+            return frozenset()
+        result = self._cache.get(title)
+        if result is not None:
+            self._cache.move_to_end(title)
+            return result
+        found = self._keywords.match(title)
+        if self._combined is not None and self._combined.search(title):
+            found |= {i for i, pattern in self._regex_rules if pattern.search(title)}
+        result = frozenset(found)
+        self._cache[title] = result
+        if len(self._cache) > MATCH_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return result
+
+    def evaluate(self, title, now=None):
+        """Evalúa un tick: decide qué reglas se disparan y encola sus acciones.
+
+        Args:
+            title: Título de la ventana activa (o None)
+            now: Tiempo actual (time.monotonic() por defecto)
+
+        Returns:
+            list: Nombres de las reglas disparadas en este tick
+        """
+        now = time.monotonic() if now is None else now
+        matched = self.matches(title)
+        fired = []
+        for index in sorted(matched):
+            rule = self.rules[index]
+            if rule.trigger == 'edge' and index in self._active:
+                continue
+            if now - self._last_fired.get(index, float('-inf')) < rule.cooldown:
+                continue
+            if self.dispatch(rule):
+                self._last_fired[index] = now
+                fired.append(rule.name)
+        self._active = matched
+        return fired
+
+    def dispatch(self, rule):
+        """Encola las acciones de una regla; False si no hay sitio o ya está en curso."""
+        with self._lock:
+            if rule.index in self._in_flight:
+                return False
+            if not self._slots.acquire(blocking=False):
+                self.dropped += 1
+                return False
+            self._in_flight.add(rule.index)
+        if self._executor is None:
+            self._run(rule)
+        else:
+            self._executor.submit(self._run, rule)
+        return True
+
+    def _run(self, rule):
+        try:
+            for name, value in rule.actions:
+                self.actions[name](value)
+        except Exception as e:
+            self.errors += 1
+            print(f"[Hydra] Error en la regla '{rule.name}': {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(rule.index)
+            self._slots.release()
+
+    def shutdown(self, wait=True):
+        """Detiene el pool de acciones."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
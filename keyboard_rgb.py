@@ -1,97 +1,727 @@
 """Control de iluminación RGB del teclado con OpenRGB.
 
-Se conecta a un servidor OpenRGB (local o remoto) y cambia los colores
-de un teclado en un ciclo de arcoíris. Puede mostrarse una pequeña
-representación del color actual en la terminal.
+Se conecta a uno o varios servidores OpenRGB (locales o remotos) y
+anima las luces de sus teclados, tiras LED, ratones, etc. Cada cuadro
+se calcula de una vez para todos los LEDs como un array NumPy
+(n_leds, 3) y se envía en una sola llamada a set_colors(), así que
+cada tecla puede tener su propio color. Puede mostrarse una pequeña
+representación del cuadro actual en la terminal.
+
+Efectos:
+    rainbow: Todo el teclado recorre el arcoíris (efecto original)
+    wave:    Onda de arcoíris que avanza de izquierda a derecha
+    ripple:  Anillos de color que salen del centro del teclado
+    audio:   Barras de espectro en vivo: cada columna de teclas es una
+             banda de frecuencia (mismo análisis que ondads y el dashboard)
+
+Los cuadros se programan por horario (FrameScheduler, en animation.py):
+cada cuadro tiene su instante fijo y solo se duerme lo que falta hasta
+él, así que el tiempo de cálculo y envío no se acumula y la tasa de
+cuadros se mantiene estable. Si un cuadro llega tarde se salta en lugar de
+enviarlo atrasado.
+
+Con varios dispositivos cada uno tiene su propio thread de envío, así
+que todos reciben el cuadro en paralelo y uno lento no frena al resto.
+Cada dispositivo recibe el cuadro adelantado según su latencia para que
+los efectos queden en fase entre servidores.
+
+En el modo audio cada bloque del micrófono genera un cuadro al
+instante (sin esperar al siguiente tick) y un thread lo envía. Si
+OpenRGB aún está ocupado con el envío anterior, el cuadro pendiente se
+reemplaza por el más nuevo: nunca se forma una cola ni se acumula lag.
 
 Requisitos:
     - Python 3
-    - pip install openrgb-python
+    - pip install openrgb-python numpy
+    - pip install sounddevice  # Solo para el efecto audio
     - Un servidor OpenRGB ejecutándose con la opción --server
 
 Uso:
     python keyboard_rgb.py --show --host 127.0.0.1
+    python keyboard_rgb.py --effect wave --fps 60
+    python keyboard_rgb.py --effect audio
+    python keyboard_rgb.py --server pc:6742 --server 192.168.1.20 --types keyboard,ledstrip
 
 El programa se ejecuta hasta recibir Ctrl+C, momento en el cual
-apaga las luces del teclado.
+apaga las luces de todos los dispositivos.
 """
 
 import argparse
-import colorsys
+import threading
 import time
 
+import numpy as np
 from openrgb import OpenRGBClient
 from openrgb.utils import RGBColor
 
+from animation import FrameScheduler
+from spectrum import band_amps
+
+try:
+    import sounddevice as sd
+    AUDIO_AVAILABLE = True
+except (ImportError, OSError):
+    sd = None
+    AUDIO_AVAILABLE = False
+
+DEFAULT_PORT = 6742
+DEFAULT_FPS = 30
+MAX_FPS = 60
+
+# Modo audio
+FS = 44100
+AUDIO_BLOCKSIZE = 512  # ~11.6 ms por bloque: deja margen para el presupuesto de latencia
+LATENCY_BUDGET_MS = 30.0  # Del primer sample del bloque al envío del cuadro
+MAX_AUDIO_BANDS = 24
+MIN_GAIN = 0.5  # Ganancia adaptativa por banda, como en ondads.py
+MAX_GAIN = 10.0
+ADAPT_SPEED = 0.1
+GAIN_TARGET = 0.7
+
+
+def hsv_to_rgb(h, s=1.0, v=1.0):
+    """Versión vectorizada de colorsys.hsv_to_rgb.
+
+    Args:
+        h: Array de tonos en [0, 1) (valores fuera se envuelven)
+        s: Saturación (escalar o array del mismo tamaño)
+        v: Brillo (escalar o array del mismo tamaño)
+
+    Returns:
+        np.ndarray: Colores uint8 de shape (n, 3)
+    """
+    h = np.asarray(h, dtype=np.float64) % 1.0
+    s = np.broadcast_to(np.asarray(s, dtype=np.float64), h.shape)
+    v = np.broadcast_to(np.asarray(v, dtype=np.float64), h.shape)
+    i = np.floor(h * 6.0)
+    f = h * 6.0 - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    sector = i.astype(np.int64) % 6
+    r = np.choose(sector, [v, q, p, p, t, v])
+    g = np.choose(sector, [t, v, v, q, p, p])
+    b = np.choose(sector, [p, p, t, v, v, q])
+    return (np.stack([r, g, b], axis=-1) * 255).astype(np.uint8)
+
+
+def led_positions(device):
+    """Posición (x, y) normalizada a [0, 1] de cada LED del dispositivo.
+
+    Las zonas con matriz (la mayoría de los teclados) usan la posición de
+    cada tecla en la matriz; el resto de LEDs se reparten en una línea
+    horizontal. y = 0 es la fila superior.
+
+    Returns:
+        np.ndarray: Shape (n_leds, 2), en el orden de device.leds
+    """
+    n = len(device.leds)
+    pos = np.full((n, 2), np.nan)
+    for zone in getattr(device, 'zones', []):
+        matrix = getattr(zone, 'matrix_map', None)
+        if not matrix or not zone.leds:
+            continue
+        rows, cols = len(matrix), len(matrix[0])
+        for row, line in enumerate(matrix):
+            for col, index in enumerate(line):
+                if index is None or not 0 <= index < len(zone.leds):
+                    continue
+                led = zone.leds[index].id
+                pos[led] = (col / max(cols - 1, 1), row / max(rows - 1, 1))
+    missing = np.isnan(pos[:, 0])
+    if missing.any():
+        count = int(missing.sum())
+        pos[missing, 0] = np.arange(count) / max(count - 1, 1)
+        pos[missing, 1] = 0.5
+    return pos
+
+
+def rainbow_effect(speed=0.1):
+    """Todo el dispositivo del mismo color, recorriendo el arcoíris.
+
+    Args:
+        speed: Vueltas completas al arcoíris por segundo
+    """
+    def render(t, pos):
+        return np.repeat(hsv_to_rgb([t * speed]), len(pos), axis=0)
+    return render
+
+
+def wave_effect(speed=0.25, scale=1.0):
+    """Onda de arcoíris horizontal.
+
+    Args:
+        speed: Ciclos por segundo
+        scale: Arcoíris completos a lo ancho del teclado
+    """
+    def render(t, pos):
+        return hsv_to_rgb(pos[:, 0] * scale - t * speed)
+    return render
+
+
+def ripple_effect(center=(0.5, 0.5), speed=0.5, wavelength=0.35):
+    """Anillos de color que se alejan de `center`.
+
+    Args:
+        center: Origen (x, y) de los anillos, normalizado
+        speed: Anillos por segundo
+        wavelength: Distancia entre anillos (en ancho de teclado)
+    """
+    def render(t, pos):
+        dist = np.hypot(pos[:, 0] - center[0], pos[:, 1] - center[1])
+        phase = dist / wavelength - t * speed
+        brightness = 0.5 + 0.5 * np.cos(2 * np.pi * phase)
+        return hsv_to_rgb(phase * 0.25, 1.0, brightness)
+    return render
+
+
+EFFECTS = {
+    'rainbow': rainbow_effect,
+    'wave': wave_effect,
+    'ripple': ripple_effect,
+}
+
+
+def frame_to_colors(frame):
+    """Convierte un cuadro (n, 3) uint8 a la lista de RGBColor de OpenRGB."""
+    return [RGBColor(r, g, b) for r, g, b in frame.tolist()]
+
+
+def show_frame(frame, width=32):
+    """Muestra una muestra del cuadro en la terminal (una línea de bloques)."""
+    step = max(1, len(frame) // width)
+    cells = ''.join(f"\033[38;2;{r};{g};{b}m█" for r, g, b in frame[::step][:width].tolist())
+    print(f"\r{cells}\033[0m", end='', flush=True)
+
+
+def run_effect(device, effect, fps=DEFAULT_FPS, frames=None, duration=None, show=False,
+               scheduler=None):
+    """Calcula y envía cuadros del efecto al dispositivo al ritmo indicado.
+
+    Cada cuadro se envía con una sola llamada set_colors(fast=True): con
+    fast=False openrgb-python vuelve a pedir el estado del dispositivo al
+    servidor después de cada envío.
+
+    Args:
+        device: Dispositivo OpenRGB
+        effect: Función (t, posiciones) -> cuadro (n_leds, 3) uint8
+        fps: Cuadros por segundo
+        frames: Número de cuadros (None = hasta Ctrl+C)
+        duration: Segundos de animación (None = hasta Ctrl+C)
+        show: Si True, muestra el cuadro en la terminal
+        scheduler: FrameScheduler a usar (por defecto uno nuevo con `fps`)
+
+    Returns:
+        FrameScheduler: Con las estadísticas de la animación
+    """
+    pos = led_positions(device)
+    scheduler = scheduler or FrameScheduler(fps)
+    for _, t in scheduler.ticks(frames, duration):
+        frame = effect(t, pos)
+        device.set_colors(frame_to_colors(frame), fast=True)
+        if show:
+            show_frame(frame)
+    return scheduler
+
+
+def column_bands(pos, n_bands=None):
+    """Banda de frecuencia de cada LED según su columna (graves a la izquierda).
+
+    Args:
+        pos: Posiciones de led_positions()
+        n_bands: Número de bandas (por defecto una por columna distinta,
+            hasta MAX_AUDIO_BANDS)
+
+    Returns:
+        tuple: (array int con la banda de cada LED, número de bandas)
+    """
+    if n_bands is None:
+        n_bands = min(len(np.unique(pos[:, 0])), MAX_AUDIO_BANDS) or 1
+    bands = np.minimum((pos[:, 0] * n_bands).astype(int), n_bands - 1)
+    return bands, n_bands
+
+
+def spectrum_bars(pos, bands, levels):
+    """Cuadro de barras de espectro: cada columna se llena desde abajo según su nivel.
+
+    Args:
+        pos: Posiciones de led_positions()
+        bands: Banda de cada LED (column_bands())
+        levels: Nivel de cada banda en [0, 1]
+
+    Returns:
+        np.ndarray: Cuadro (n_leds, 3) uint8
+    """
+    n_bands = len(levels)
+    height = 1.0 - pos[:, 1]  # 0 = fila inferior, 1 = superior
+    level = np.asarray(levels)[bands]
+    lit = (level > 0) & (height <= level + 1e-9)
+    return hsv_to_rgb(bands / n_bands, 1.0, lit.astype(np.float64))
+
+
+class FrameSender:
+    """Envía cuadros a un dispositivo desde un thread, descartando los atrasados.
+
+    Solo se guarda el cuadro más reciente: si llega uno nuevo mientras
+    OpenRGB procesa el anterior, el pendiente se reemplaza (y cuenta como
+    saltado) en lugar de encolarse.
+
+    Args:
+        device: Dispositivo OpenRGB
+        show: Si True, muestra cada cuadro enviado en la terminal
+        lock: Lock compartido por los dispositivos de una misma conexión
+            (el socket de OpenRGBClient no admite envíos simultáneos)
+        budget_ms: Latencia máxima tolerada desde el origen del cuadro
+    """
+
+    def __init__(self, device, show=False, lock=None, budget_ms=LATENCY_BUDGET_MS):
+        self.device = device
+        self.show = show
+        self.lock = lock or threading.Lock()
+        self.budget_ms = budget_ms
+        self.sent = 0
+        self.skipped = 0
+        self.errors = 0
+        self.send_ms = 0.0  # Media móvil de lo que tarda set_colors()
+        self.latencies = []  # ms desde el origen del cuadro hasta el envío
+        self._pending = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='rgb-sender', daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, frame, captured):
+        """Deja un cuadro listo para enviar (no bloquea).
+
+        Args:
+            frame: Cuadro (n_leds, 3) uint8
+            captured: time.monotonic() del origen del cuadro (primer sample
+                del bloque de audio u horario del cuadro)
+        """
+        with self._cond:
+            if self._pending is not None:
+                self.skipped += 1
+            self._pending = (frame, captured)
+            self._cond.notify()
+
+    def close(self, timeout=2.0):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                frame, captured = self._pending
+                self._pending = None
+            colors = frame_to_colors(frame)
+            started = time.monotonic()
+            try:
+                with self.lock:
+                    self.device.set_colors(colors, fast=True)
+            except Exception as e:
+                self.errors += 1
+                print(f"\nError enviando a OpenRGB: {e}")
+                continue
+            done = time.monotonic()
+            elapsed = (done - started) * 1000
+            self.send_ms = elapsed if not self.sent else 0.9 * self.send_ms + 0.1 * elapsed
+            self.sent += 1
+            self.latencies.append((done - captured) * 1000)
+            if len(self.latencies) > 1000:
+                del self.latencies[:500]
+            if self.show:
+                show_frame(frame)
+
+    def stats(self):
+        """Cuadros enviados y saltados, y latencia origen -> LED (ms)."""
+        recent = np.array(self.latencies) if self.latencies else np.zeros(1)
+        return {'sent': self.sent, 'skipped': self.skipped, 'errors': self.errors,
+                'send_ms': round(self.send_ms, 2),
+                'latency_ms': round(float(np.median(recent)), 2),
+                'latency_max_ms': round(float(recent.max()), 2),
+                'over_budget': int((recent > self.budget_ms).sum())}
+
+
+class DeviceTarget:
+    """Un dispositivo de la salida: su layout, su sender y su latencia.
+
+    Args:
+        device: Dispositivo OpenRGB
+        server: Servidor al que pertenece ("host:puerto")
+        lock: Lock de la conexión con el servidor
+        offset_ms: Latencia fija adicional del dispositivo (p. ej. una tira
+            que tarda más en mostrar los colores que el teclado)
+        show: Mostrar sus cuadros en la terminal
+        budget_ms: Presupuesto de latencia del dispositivo
+    """
+
+    def __init__(self, device, server='localhost', lock=None, offset_ms=0.0, show=False,
+                 budget_ms=LATENCY_BUDGET_MS):
+        self.device = device
+        self.server = server
+        self.name = f"{server}/{getattr(device, 'name', 'device')}"
+        self.pos = led_positions(device)
+        self.offset_ms = offset_ms
+        self.sender = FrameSender(device, show=show, lock=lock, budget_ms=budget_ms)
+
+    @property
+    def latency(self):
+        """Segundos entre enviar un cuadro y que se vea (medido + fijo)."""
+        return (self.sender.send_ms + self.offset_ms) / 1000.0
+
+
+class RGBFanout:
+    """Envía cada cuadro a varios dispositivos de varios servidores OpenRGB en paralelo.
+
+    Cada dispositivo tiene su FrameSender (un thread persistente), así que
+    un servidor lento no retrasa a los demás y, si no alcanza el ritmo,
+    solo pierde sus propios cuadros. Los dispositivos de un mismo servidor
+    comparten la conexión y se envían de a uno.
+
+    Para que los efectos queden en fase, cada dispositivo recibe el
+    cuadro calculado para el instante en que lo va a mostrar: t más su
+    latencia (media de lo que tarda el envío más offset_ms).
+
+    Args:
+        targets: Lista de DeviceTarget
+
+    Example:
+        >>> fanout = RGBFanout.connect(['pc:6742', 'nas:6742'], types=('keyboard', 'ledstrip'))
+        >>> fanout.start().run(wave_effect(), fps=30)
+    """
+
+    def __init__(self, targets):
+        self.targets = targets
+        self.clients = []
+
+    @classmethod
+    def connect(cls, servers, types=('keyboard',), offsets=None, show=False,
+                budget_ms=LATENCY_BUDGET_MS):
+        """Abre una conexión persistente por servidor y reúne sus dispositivos.
+
+        Args:
+            servers: Lista de "host" o "host:puerto"
+            types: Tipos de dispositivo ('keyboard', 'ledstrip', 'mouse'...)
+                o None para todos
+            offsets: {servidor o nombre de dispositivo: ms} latencia fija extra
+            show: Mostrar en la terminal los cuadros del primer dispositivo
+            budget_ms: Presupuesto de latencia por dispositivo
+
+        Returns:
+            RGBFanout: Sin dispositivos si ningún servidor respondió
+        """
+        offsets = offsets or {}
+        fanout = cls([])
+        for spec in servers:
+            host, _, port = spec.partition(':')
+            port = int(port or DEFAULT_PORT)
+            server = f"{host}:{port}"
+            try:
+                client = OpenRGBClient(address=host, port=port, name='rainvow')
+            except (OSError, TimeoutError) as e:
+                print(f"No se pudo conectar a OpenRGB en {server}: {e}")
+                continue
+            fanout.clients.append(client)
+            lock = threading.Lock()
+            for device in client.devices:
+                if types is not None and device.device_type.name.lower() not in types:
+                    continue
+                offset = offsets.get(device.name, offsets.get(server, offsets.get(host, 0.0)))
+                fanout.targets.append(DeviceTarget(
+                    device, server, lock, offset_ms=offset,
+                    show=show and not fanout.targets, budget_ms=budget_ms))
+        return fanout
+
+    def start(self):
+        for target in self.targets:
+            target.sender.start()
+        return self
+
+    def push(self, effect, t, origin=None):
+        """Calcula el cuadro de cada dispositivo (adelantado según su latencia) y lo envía.
+
+        Args:
+            effect: Función (t, posiciones) -> cuadro
+            t: Segundos del efecto
+            origin: time.monotonic() del horario del cuadro
+        """
+        origin = time.monotonic() if origin is None else origin
+        for target in self.targets:
+            target.sender.submit(effect(t + target.latency, target.pos), origin)
+
+    def run(self, effect, fps=DEFAULT_FPS, frames=None, duration=None, scheduler=None):
+        """Anima todos los dispositivos al ritmo de un FrameScheduler.
+
+        Returns:
+            FrameScheduler: Con las estadísticas de la animación
+        """
+        scheduler = scheduler or FrameScheduler(fps)
+        start = time.monotonic()
+        for _, t in scheduler.ticks(frames, duration):
+            self.push(effect, t, start + t)
+        return scheduler
+
+    def stats(self):
+        """Estadísticas de envío por dispositivo."""
+        return {target.name: target.sender.stats() for target in self.targets}
+
+    def close(self, lights_off_devices=True):
+        """Detiene los senders, apaga los LEDs y cierra las conexiones."""
+        for target in self.targets:
+            target.sender.close()
+        if lights_off_devices:
+            for target in self.targets:
+                lights_off(target.device)
+        for client in self.clients:
+            try:
+                client.disconnect()
+            except OSError:
+                pass
+
+
+class AudioReactive:
+    """Convierte cada bloque de audio en un cuadro de barras de espectro.
+
+    Usa spectrum.band_amps() (el mismo análisis que ondads y el
+    dashboard) con la ganancia adaptativa por banda de ondads, y entrega
+    el cuadro de cada dispositivo a su FrameSender en el mismo callback
+    del bloque. Los dispositivos con distinto número de columnas
+    analizan el bloque con su propio número de bandas.
+
+    Args:
+        targets: Lista de DeviceTarget (p. ej. RGBFanout.targets)
+        n_bands: Bandas (por defecto una por columna de teclas de cada dispositivo)
+        fs: Frecuencia de muestreo en Hz
+        blocksize: Muestras por bloque
+
+    Example:
+        >>> reactive = AudioReactive(fanout.start().targets).start()
+    """
+
+    def __init__(self, targets, n_bands=None, fs=FS, blocksize=AUDIO_BLOCKSIZE):
+        self.targets = targets
+        self.layouts = [column_bands(target.pos, n_bands) for target in targets]
+        self.n_bands = max((n for _, n in self.layouts), default=0)
+        self.fs = fs
+        self.blocksize = blocksize
+        self.gains = {n: np.ones(n) for _, n in self.layouts}
+        self._stream = None
+
+    def levels(self, block, n_bands):
+        """Niveles [0, 1] por banda con ganancia adaptativa (como ondads)."""
+        amps = band_amps(block, self.fs, n_bands)
+        gains = self.gains[n_bands]
+        scaled = amps * gains
+        self.gains[n_bands] = np.where(
+            scaled > 0.95, np.maximum(gains * (1 - ADAPT_SPEED), MIN_GAIN),
+            np.where(scaled < GAIN_TARGET, np.minimum(gains * (1 + ADAPT_SPEED), MAX_GAIN), gains))
+        peak = scaled.max()
+        return scaled / peak if peak > 0 else scaled
+
+    def process(self, block, captured=None):
+        """Analiza un bloque y envía el cuadro de cada dispositivo.
+
+        Args:
+            block: Audio (n_samples, n_channels)
+            captured: time.monotonic() del primer sample (por defecto, ahora
+                menos la duración del bloque)
+
+        Returns:
+            dict: {n_bands: niveles por banda en [0, 1]}
+        """
+        if captured is None:
+            captured = time.monotonic() - len(block) / self.fs
+        levels = {n: self.levels(block, n) for n in self.gains}
+        for target, (bands, n) in zip(self.targets, self.layouts):
+            target.sender.submit(spectrum_bars(target.pos, bands, levels[n]), captured)
+        return levels
+
+    def _callback(self, indata, frames, time_info, status):
+        """Callback del stream de sounddevice (thread de audio)."""
+        self.process(indata, time.monotonic() - frames / self.fs)
+
+    def start(self):
+        """Abre el micrófono; cada bloque llega a process() desde el thread de audio."""
+        if not AUDIO_AVAILABLE:
+            raise RuntimeError("El efecto audio requiere sounddevice (pip install sounddevice)")
+        self._stream = sd.InputStream(samplerate=self.fs, channels=1, blocksize=self.blocksize,
+                                      dtype='float32', latency='low', callback=self._callback)
+        self._stream.start()
+        return self
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
 
 def rainbow_cycle(device, steps=360, delay=0.05, show=False):
     """Recorre los colores del arcoíris en el dispositivo RGB.
 
-    Convierte valores HSV a RGB para crear una transición suave de colores
-    a través del espectro del arcoíris completo.
-
     Args:
         device: Dispositivo OpenRGB a controlar
         steps: Número de pasos en el ciclo de colores (default: 360 para 1 grado por paso)
-        delay: Pausa en segundos entre cambios de color (default: 0.05)
+        delay: Tiempo en segundos entre cambios de color (default: 0.05)
         show: Si True, muestra el color actual en la terminal (default: False)
 
+    Note:
+        Equivale a run_effect() con rainbow_effect(); delay ahora es el
+        periodo entre cuadros y no una pausa añadida tras cada envío.
+
     Example:
         >>> client = OpenRGBClient()
         >>> keyboard = client.devices[0]
         >>> rainbow_cycle(keyboard, steps=180, delay=0.1, show=True)
     """
-    for i in range(steps):
-        hue = i / float(steps)
-        r, g, b = [int(255 * x) for x in colorsys.hsv_to_rgb(hue, 1, 1)]
-        device.set_color(RGBColor(r, g, b))
-        if show:
-            print(f"\r\033[38;2;{r};{g};{b}m█\033[0m", end='', flush=True)
-        time.sleep(delay)
+    run_effect(device, rainbow_effect(speed=1.0 / (steps * delay)), fps=1.0 / delay,
+               frames=steps, show=show)
+
+
+def lights_off(device):
+    """Apaga todos los LEDs del dispositivo."""
+    try:
+        device.set_color(RGBColor(0, 0, 0))
+    except Exception as e:
+        print(f"\nError al apagar {getattr(device, 'name', 'el dispositivo')}: {e}")
+
+
+def print_stats(fanout):
+    """Resumen por dispositivo: cuadros, saltados y latencias."""
+    for name, st in fanout.stats().items():
+        print(f"  {name}: {st['sent']} cuadros, {st['skipped']} saltados, envío "
+              f"{st['send_ms']} ms, latencia mediana {st['latency_ms']} ms "
+              f"(máx {st['latency_max_ms']}, {st['over_budget']} sobre presupuesto)")
+
+
+def run_audio(fanout):
+    """Efecto audio en todos los dispositivos hasta Ctrl+C."""
+    try:
+        reactive = AudioReactive(fanout.targets).start()
+    except (RuntimeError, OSError) as e:
+        print(f"No se pudo abrir el micrófono: {e}")
+        return
+    print(f"Hasta {reactive.n_bands} bandas, bloques de "
+          f"{reactive.blocksize / reactive.fs * 1000:.1f} ms")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    reactive.stop()
+
+
+def parse_offsets(values):
+    """Convierte ["nombre=ms", ...] en {nombre: ms}."""
+    offsets = {}
+    for value in values:
+        name, sep, ms = value.rpartition('=')
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Offset inválido: {value} (usa nombre=ms)")
+        offsets[name] = float(ms)
+    return offsets
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(
-        description="Control de luces RGB del teclado via OpenRGB"
+        description="Control de luces RGB via OpenRGB (uno o varios servidores)"
     )
     parser.add_argument(
         "--host",
         default="localhost",
-        help="Direcci\u00f3n del servidor OpenRGB",
+        help="Dirección del servidor OpenRGB",
     )
     parser.add_argument(
         "--port",
         type=int,
-        default=6742,
+        default=DEFAULT_PORT,
         help="Puerto del servidor OpenRGB",
     )
+    parser.add_argument(
+        "--server",
+        action="append",
+        default=[],
+        metavar="HOST[:PUERTO]",
+        help="Servidor OpenRGB adicional (repetible; reemplaza --host/--port)",
+    )
+    parser.add_argument(
+        "--types",
+        default="keyboard",
+        help="Tipos de dispositivo separados por comas (keyboard,ledstrip,mouse...) o 'all'",
+    )
+    parser.add_argument(
+        "--offset",
+        action="append",
+        default=[],
+        metavar="NOMBRE=MS",
+        help="Latencia fija extra de un servidor o dispositivo (repetible)",
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=LATENCY_BUDGET_MS,
+        help=f"Presupuesto de latencia por dispositivo en ms (default: {LATENCY_BUDGET_MS:.0f})",
+    )
     parser.add_argument(
         "--show",
         action="store_true",
         help="Mostrar el color aplicado en la terminal",
     )
+    parser.add_argument(
+        "--effect",
+        choices=sorted(EFFECTS) + ["audio"],
+        default="rainbow",
+        help="Efecto a mostrar (default: rainbow)",
+    )
+    parser.add_argument(
+        "--fps",
+        type=float,
+        default=DEFAULT_FPS,
+        help=f"Cuadros por segundo (default: {DEFAULT_FPS}, máximo {MAX_FPS})",
+    )
     args = parser.parse_args()
 
-    client = OpenRGBClient(host=args.host, port=args.port)
-    keyboards = [d for d in client.devices if d.device_type.name == "KEYBOARD"]
-    if not keyboards:
-        print("No hay teclados compatibles en OpenRGB.")
+    servers = args.server or [f"{args.host}:{args.port}"]
+    types = None if args.types == "all" else tuple(t.strip().lower() for t in args.types.split(","))
+    try:
+        offsets = parse_offsets(args.offset)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    fanout = RGBFanout.connect(servers, types, offsets, show=args.show, budget_ms=args.budget)
+    if not fanout.targets:
+        print("No hay dispositivos compatibles en OpenRGB.")
+        fanout.close(lights_off_devices=False)
         return
 
-    keyboard = keyboards[0]
-    print(
-        f"Controlando {keyboard.name} a trav\u00e9s de OpenRGB en {args.host}:{args.port}"
-    )
+    for target in fanout.targets:
+        print(f"Controlando {target.name}")
+    fanout.start()
 
+    scheduler = FrameScheduler(min(args.fps, MAX_FPS))
     try:
-        while True:
-            rainbow_cycle(keyboard, show=args.show)
+        if args.effect == "audio":
+            run_audio(fanout)
+        else:
+            fanout.run(EFFECTS[args.effect](), scheduler=scheduler)
     except KeyboardInterrupt:
-        try:
-            keyboard.set_color(RGBColor(0, 0, 0))
-        except Exception as e:
-            print(f"\nError al apagar el teclado: {e}")
-        print("\nTerminando")
+        pass
+    fanout.close()
+    print("\nTerminando")
+    if args.effect != "audio":
+        stats = scheduler.stats()
+        print(f"  {stats['frames']} cuadros programados, {stats['skipped']} saltados")
+    print_stats(fanout)
 
 
 if __name__ == "__main__":
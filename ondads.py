@@ -10,6 +10,9 @@ Componentes principales:
     - audio_source(): Fuente de audio configurable con fallback
     - run_visualizer(): Loop principal de visualización
 
+El dibujo usa TerminalScreen de animation.py: cada bloque de audio
+reescribe solo la línea de barras, sin borrar la pantalla.
+
 Uso:
     python3 ondads.py
 
@@ -17,9 +20,14 @@ El programa se ejecuta hasta recibir Ctrl+C.
 """
 
 import numpy as np
-import sounddevice as sd
 from rich.console import Console
-from rich.style import Style
+
+from animation import RAINBOW_ANSI, FrameScheduler, TerminalScreen
+from capabilities import OptionalModule
+from spectrum import band_amps
+
+# Se importa al abrir el micrófono: sin PortAudio se usa ruido de prueba
+sd = OptionalModule('sounddevice')
 
 console = Console()
 
@@ -36,8 +44,8 @@ RAINBOW_BASE = [
 
 N_BANDS = len(RAINBOW_BASE)
 
-# Cache de estilos pre-calculados para mejor rendimiento
-RAINBOW_STYLES = [Style(color=c) for c in RAINBOW_BASE]
+# Secuencias ANSI pre-calculadas de cada color (los mismos de RAINBOW_BASE)
+RAINBOW_STYLES = RAINBOW_ANSI
 BAR_HEIGHT = 12
 
 FS = 44100
@@ -71,31 +79,28 @@ def get_band_amps(audio_block: np.ndarray, fs: int, n_bands: int) -> np.ndarray:
         >>> amps = get_band_amps(audio, 44100, 7)
         >>> len(amps)
         7
+
+    Note:
+        El cálculo vive en spectrum.py, compartido con el dashboard y las
+        herramientas de hydra.
     """
-    fft = np.fft.rfft(audio_block[:, 0] * np.hanning(len(audio_block)))
-    mag = np.abs(fft)
-    freqs = np.fft.rfftfreq(len(audio_block), 1 / fs)
-    max_freq = fs // 2
-    band_edges = np.linspace(0, max_freq, n_bands + 1)
-    amps = []
-    for i in range(n_bands):
-        idx = np.where((freqs >= band_edges[i]) & (freqs < band_edges[i + 1]))[0]
-        if len(idx) > 0:
-            amps.append(mag[idx].max())
-        else:
-            amps.append(0)
-    return np.log1p(amps)
+    return band_amps(audio_block, fs, n_bands)
 
 
 shift = 0
 
 
-def audio_source():
+def audio_source(on_status=None):
     """Generador que produce bloques de audio del micrófono o ruido de prueba.
 
     Intenta capturar audio del micrófono del sistema. Si falla (por falta de
     hardware, permisos, o errores), automáticamente usa ruido aleatorio como
-    fuente alternativa para permitir pruebas sin hardware de audio.
+    fuente alternativa para permitir pruebas sin hardware de audio. El ruido
+    se entrega al mismo ritmo que el micrófono (un bloque cada DURATION s).
+
+    Args:
+        on_status: Función (mensaje, estilo) para los avisos (default:
+            imprimirlos con la consola de rich)
 
     Yields:
         np.ndarray: Bloques de audio con shape (BLOCKSIZE, 1)
@@ -109,17 +114,20 @@ def audio_source():
         ...     # Procesar block de audio
         ...     break  # Terminar después del primer bloque
     """
+    if on_status is None:
+        def on_status(message, style):
+            console.print(message, style=style)
     try:
         with sd.InputStream(channels=1, samplerate=FS, blocksize=BLOCKSIZE) as stream:
-            console.print("Presiona Ctrl+C para detener", style="bold white")
+            on_status("Presiona Ctrl+C para detener", "bold white")
             while True:
                 yield stream.read(BLOCKSIZE)[0]
     except Exception as exc:
-        console.print(
+        on_status(
             f"No se pudo iniciar la entrada de audio ({exc}). Se usará ruido de prueba.",
-            style="bold yellow",
+            "bold yellow",
         )
-        while True:
+        for _ in FrameScheduler(1 / DURATION).ticks():
             yield np.random.uniform(-1, 1, size=(BLOCKSIZE, 1))
 
 
@@ -137,29 +145,43 @@ def run_visualizer():
     Note:
         Ejecuta indefinidamente hasta recibir KeyboardInterrupt (Ctrl+C)
     """
+    status = []
+
+    def on_status(message, _style):
+        status[:] = [message]
+
+    with TerminalScreen() as screen:
+        for audio_block in audio_source(on_status):
+            screen.draw(status + ["", render_bars(audio_block)])
+
+
+def render_bars(audio_block):
+    """Analiza un bloque, ajusta las ganancias y devuelve la línea de barras.
+
+    Returns:
+        str: Barras de cada banda con sus códigos de color ANSI
+    """
     global shift
-    for audio_block in audio_source():
-        amps = get_band_amps(audio_block, FS, N_BANDS)
-        for i in range(N_BANDS):
-            target = 0.7
-            if amps[i] * gains[i] > 0.95:
-                gains[i] = max(gains[i] * (1 - ADAPT_SPEED), MIN_GAIN)
-            elif amps[i] * gains[i] < target:
-                gains[i] = min(gains[i] * (1 + ADAPT_SPEED), MAX_GAIN)
-        amps = amps * gains
-        if amps.max() > 0:
-            amps = amps / amps.max()
-        # Usar lista para concatenación eficiente
-        barra_parts = []
-        for i, amp in enumerate(amps):
-            barras = int(amp * BAR_HEIGHT)
-            color_idx = (i + shift) % N_BANDS
-            # Usar estilo pre-calculado para mejor rendimiento
-            style = RAINBOW_STYLES[color_idx]
-            barra_parts.append(f"[{style}]" + "█" * barras + " " * (BAR_HEIGHT - barras) + "[/]")
-        barra_str = "".join(barra_parts)
-        shift = (shift + 1) % N_BANDS
-        console.print(barra_str, end="\r", highlight=False, soft_wrap=True)
+    amps = get_band_amps(audio_block, FS, N_BANDS)
+    for i in range(N_BANDS):
+        target = 0.7
+        if amps[i] * gains[i] > 0.95:
+            gains[i] = max(gains[i] * (1 - ADAPT_SPEED), MIN_GAIN)
+        elif amps[i] * gains[i] < target:
+            gains[i] = min(gains[i] * (1 + ADAPT_SPEED), MAX_GAIN)
+    amps = amps * gains
+    if amps.max() > 0:
+        amps = amps / amps.max()
+    # Usar lista para concatenación eficiente
+    barra_parts = []
+    for i, amp in enumerate(amps):
+        barras = int(amp * BAR_HEIGHT)
+        color_idx = (i + shift) % N_BANDS
+        # Usar estilo pre-calculado para mejor rendimiento
+        style = RAINBOW_STYLES[color_idx]
+        barra_parts.append(style + "█" * barras + " " * (BAR_HEIGHT - barras))
+    shift = (shift + 1) % N_BANDS
+    return "".join(barra_parts)
 
 
 if __name__ == "__main__":
@@ -9,10 +9,10 @@ Uso:
 El programa se ejecuta hasta recibir Ctrl+C.
 """
 
-import os
-import time
 from colorama import init, Fore, Style
 
+from animation import TerminalScreen, run_animation
+
 init()
 
 QUARK_COLORS = [Fore.RED, Fore.YELLOW, Fore.GREEN, Fore.CYAN]
@@ -25,36 +25,57 @@ ASCII_LINES = [
     " {q2} {aq} {q3}"
 ]
 
+FPS = 30
+ROTATE_EVERY = 0.7  # Segundos entre rotaciones de color
 
-def show_pentaquark(colors):
-    """Muestra una representación visual de un pentaquark con colores animados.
 
-    Renderiza un pentaquark (partícula subatómica con 4 quarks y 1 antiquark)
-    usando caracteres ASCII coloreados.
+def pentaquark_lines(colors):
+    """Líneas del cuadro del pentaquark con los quarks en los colores dados.
 
     Args:
         colors: Lista de 4 colores de colorama para los quarks
 
+    Returns:
+        list: Líneas con códigos ANSI
+
     Note:
         El antiquark siempre se muestra en color magenta para diferenciarlo
     """
-    os.system('clear')
     q0, q1, q2, q3 = [c + 'Q' + Style.RESET_ALL for c in colors]
-    print("Pentaquark:\n")
-    print(ASCII_LINES[0].format(q0=q0, q1=q1))
-    print(ASCII_LINES[1].format(q2=q2, aq=ANTIQ, q3=q3))
-    print("\nCuatro quarks y un antiquark en una partícula.")
-    print("Presiona Ctrl+C para salir.")
+    return [
+        "Pentaquark:",
+        "",
+        ASCII_LINES[0].format(q0=q0, q1=q1),
+        ASCII_LINES[1].format(q2=q2, aq=ANTIQ, q3=q3),
+        "",
+        "Cuatro quarks y un antiquark en una partícula.",
+        "Presiona Ctrl+C para salir.",
+    ]
+
+
+def show_pentaquark(colors, screen):
+    """Muestra una representación visual de un pentaquark con colores animados.
+
+    Renderiza un pentaquark (partícula subatómica con 4 quarks y 1 antiquark)
+    usando caracteres ASCII coloreados. Solo se reescriben las líneas que
+    cambiaron respecto al cuadro anterior.
+
+    Args:
+        colors: Lista de 4 colores de colorama para los quarks
+        screen: TerminalScreen donde dibujar
+    """
+    screen.draw(pentaquark_lines(colors))
+
+
+def render_frame(_index, t):
+    """Cuadro en el instante t: los colores rotan cada ROTATE_EVERY segundos."""
+    i = int(t / ROTATE_EVERY) % len(QUARK_COLORS)
+    return pentaquark_lines(QUARK_COLORS[i:] + QUARK_COLORS[:i])
 
 
 if __name__ == '__main__':
-    i = 0
     try:
-        while True:
-            color_order = QUARK_COLORS[i:] + QUARK_COLORS[:i]
-            show_pentaquark(color_order)
-            time.sleep(0.7)
-            i = (i + 1) % len(QUARK_COLORS)
+        with TerminalScreen() as screen:
+            run_animation(screen, render_frame, fps=FPS)
     except KeyboardInterrupt:
-        os.system('clear')
         print('Hasta luego!')
@@ -1,24 +1,65 @@
 """Utilidad para capturar capturas de pantalla con logging colorido.
 
-Herramienta simple para tomar screenshots del escritorio completo con
-un sistema de tags para organización y mensajes coloridos en terminal.
+Toma screenshots del escritorio completo con un sistema de tags para
+organización y mensajes coloridos en terminal. Además de una captura
+suelta, un mismo proceso puede tomar ráfagas (burst) o timelapses sin
+volver a abrir la conexión con la pantalla.
+
+Backends de captura (el primero disponible con --backend auto):
+    mss:       XShm en X11 / APIs nativas en macOS y Windows; unos pocos ms
+               por captura y la conexión se mantiene abierta
+    pyautogui: Alternativa más lenta (cientos de ms por captura en X11)
+
+Las capturas se obtienen como arrays NumPy en memoria y un pool de
+threads las codifica a PNG/JPEG en segundo plano, así que el ritmo de
+captura no depende de lo que tarde la compresión. Si el pool no da
+abasto, las capturas que no caben se descartan (y se cuentan) en lugar
+de retrasar las siguientes.
+
+Los timelapses se guardan por defecto en un único archivo .tlx (ver
+timelapse_store.py): las capturas iguales a la anterior se descartan y
+del resto solo se guardan los bloques que cambiaron.
 
 Requisitos:
-    pip install pyautogui colorama
+    pip install mss pillow colorama  # o pyautogui como alternativa
 
 Uso:
     python3 screenshot.py --tag prueba
+    python3 screenshot.py --tag demo --burst 20 --interval 0.1
+    python3 screenshot.py --tag dia --timelapse --interval 30 --duration 8h
+    python3 screenshot.py --tag dia --timelapse --store files  # Un PNG por captura
 
 Las capturas se guardan en el directorio screenshots/
 """
 
 import os
+import threading
 import time
-import pyautogui
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 from colorama import Fore, Style
+from PIL import Image
+
+from timelapse_store import TimelapseWriter
+
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
+try:
+    import pyautogui
+    PYAUTOGUI_AVAILABLE = True
+except (ImportError, KeyError, OSError):  # KeyError: sin $DISPLAY en X11
+    PYAUTOGUI_AVAILABLE = False
 
 LOG_DIR = os.path.join(os.path.dirname(__file__), 'screenshots')
-os.makedirs(LOG_DIR, exist_ok=True)
+WRITER_WORKERS = 2
+WRITER_MAX_PENDING = 16  # Capturas esperando a codificarse; el resto se descarta
+IMAGE_FORMATS = {'png': 'PNG', 'jpg': 'JPEG'}
+PNG_COMPRESS_LEVEL = 3  # 1-9: los niveles altos apenas reducen y tardan mucho más
 
 
 def color(text, hue):
@@ -34,6 +75,264 @@ def color(text, hue):
     return f"{hue}{text}{Style.RESET_ALL}"
 
 
+class MssBackend:
+    """Captura con mss manteniendo la conexión con la pantalla abierta.
+
+    Args:
+        monitor: Índice del monitor de mss (0 = todos, 1 = principal)
+
+    Note:
+        En X11 la instancia de mss no se puede compartir entre threads: se
+        debe usar desde el thread que la creó.
+    """
+
+    name = 'mss'
+
+    def __init__(self, monitor=1):
+        self._sct = mss.mss()
+        self.monitor = self._sct.monitors[monitor]
+
+    def grab(self):
+        """Captura la pantalla como array RGB (alto, ancho, 3) uint8."""
+        shot = self._sct.grab(self.monitor)
+        bgra = np.frombuffer(shot.bgra, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        return bgra[:, :, 2::-1]
+
+    def close(self):
+        self._sct.close()
+
+
+class PyAutoGUIBackend:
+    """Captura con pyautogui (alternativa cuando mss no está instalado)."""
+
+    name = 'pyautogui'
+
+    def __init__(self, monitor=1):
+        self.monitor = monitor
+
+    def grab(self):
+        return np.asarray(pyautogui.screenshot().convert('RGB'))
+
+    def close(self):
+        pass
+
+
+BACKENDS = {'mss': MssBackend, 'pyautogui': PyAutoGUIBackend}
+
+
+def open_backend(name='auto', monitor=1):
+    """Crea el backend de captura pedido (o el primero disponible con 'auto').
+
+    Raises:
+        RuntimeError: Si el backend no está disponible
+    """
+    available = {'mss': MSS_AVAILABLE, 'pyautogui': PYAUTOGUI_AVAILABLE}
+    if name == 'auto':
+        name = next((n for n in ('mss', 'pyautogui') if available[n]), None)
+        if name is None:
+            raise RuntimeError("No hay backend de captura: pip install mss (o pyautogui)")
+    elif name not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {name}")
+    elif not available[name]:
+        raise RuntimeError(f"El backend {name} no está disponible")
+    return BACKENDS[name](monitor)
+
+
+class FrameWriter:
+    """Codifica y guarda capturas en un pool de threads.
+
+    Args:
+        workers: Threads de codificación
+        max_pending: Capturas en cola o codificándose como máximo
+        compress_level: Nivel de compresión PNG (1-9)
+
+    Example:
+        >>> writer = FrameWriter()
+        >>> writer.submit(frame, 'screenshots/snap.png')
+        True
+        >>> writer.close()
+    """
+
+    def __init__(self, workers=WRITER_WORKERS, max_pending=WRITER_MAX_PENDING,
+                 compress_level=PNG_COMPRESS_LEVEL):
+        self.compress_level = compress_level
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix='screenshot-writer')
+
+    def submit(self, frame, path, block=False):
+        """Encola una captura para guardarla en `path` (el formato sale de la extensión).
+
+        Args:
+            frame: Array RGB (alto, ancho, 3) uint8
+            path: Archivo de destino (.png o .jpg)
+            block: Esperar a que haya sitio en lugar de descartar
+
+        Returns:
+            concurrent.futures.Future o None si la captura se descartó
+        """
+        if not self._slots.acquire(blocking=block):
+            with self._lock:
+                self.dropped += 1
+            return None
+        return self._executor.submit(self._write, frame, path)
+
+    def _write(self, frame, path):
+        try:
+            fmt = IMAGE_FORMATS[os.path.splitext(path)[1].lstrip('.').lower()]
+            options = {'compress_level': self.compress_level} if fmt == 'PNG' else {'quality': 90}
+            tmp = path + '.part'
+            Image.fromarray(frame).save(tmp, format=fmt, **options)
+            os.replace(tmp, path)
+            with self._lock:
+                self.written += 1
+            return path
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            self._slots.release()
+
+    def close(self, wait=True):
+        """Espera a que se guarden las capturas pendientes."""
+        self._executor.shutdown(wait=wait)
+
+
+class ScreenCapture:
+    """Sesión de captura: un backend abierto más el pool de escritura.
+
+    Args:
+        backend: Nombre del backend ('auto', 'mss', 'pyautogui') o un objeto
+            con grab() y close()
+        directory: Directorio de salida
+        fmt: 'png' o 'jpg'
+        workers: Threads de codificación
+        monitor: Monitor a capturar (ver MssBackend)
+
+    Example:
+        >>> with ScreenCapture() as capture:
+        ...     capture.burst('demo', count=10, interval=0.1)
+    """
+
+    def __init__(self, backend='auto', directory=LOG_DIR, fmt='png', workers=WRITER_WORKERS,
+                 monitor=1, max_pending=WRITER_MAX_PENDING):
+        if fmt not in IMAGE_FORMATS:
+            raise ValueError(f"Formato no soportado: {fmt}")
+        self.backend = open_backend(backend, monitor) if isinstance(backend, str) else backend
+        self.directory = directory
+        self.fmt = fmt
+        self.writer = FrameWriter(workers, max_pending)
+        self.captured = 0
+        self.grab_ms = 0.0  # Media móvil de lo que tarda una captura
+        os.makedirs(directory, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def grab(self):
+        """Captura la pantalla en memoria (array RGB)."""
+        started = time.perf_counter()
+        frame = self.backend.grab()
+        elapsed = (time.perf_counter() - started) * 1000
+        self.grab_ms = elapsed if not self.captured else 0.9 * self.grab_ms + 0.1 * elapsed
+        self.captured += 1
+        return frame
+
+    def path_for(self, tag, stamp, index=None):
+        suffix = '' if index is None else f"_{index:05d}"
+        return os.path.join(self.directory, f"snap_{tag}_{stamp}{suffix}.{self.fmt}")
+
+    def snapshot(self, tag='default', block=True):
+        """Captura y encola una imagen suelta.
+
+        Returns:
+            concurrent.futures.Future con la ruta (None si se descartó)
+        """
+        return self.writer.submit(self.grab(), self.path_for(tag, int(time.time())), block=block)
+
+    def burst(self, tag, count, interval=0.0):
+        """Toma `count` capturas seguidas, cada `interval` segundos (0 = lo antes posible).
+
+        A diferencia del timelapse, no descarta capturas: si los threads de
+        codificación van atrasados, la ráfaga espera a que haya sitio.
+
+        Returns:
+            list: Futures de las `count` capturas
+        """
+        return self.timelapse(tag, interval, count=count, block=True)
+
+    def timelapse(self, tag, interval, count=None, duration=None, on_frame=None, store=None,
+                  block=False):
+        """Captura cada `interval` segundos con horario fijo.
+
+        El horario de la captura k es inicio + k * interval: lo que tarda
+        capturar no se acumula. Si una captura llega tarde se saltan los
+        horarios perdidos en lugar de capturar en ráfaga.
+
+        Args:
+            tag: Etiqueta de los archivos
+            interval: Segundos entre capturas
+            count: Número de capturas (None = sin límite)
+            duration: Segundos de timelapse (None = sin límite)
+            on_frame: Callback(índice, resultado) tras encolar cada captura
+            store: TimelapseWriter ya iniciado donde guardar las capturas en
+                lugar de un archivo de imagen por captura
+            block: Esperar a los threads de codificación en lugar de
+                descartar capturas cuando hay WRITER_MAX_PENDING en cola
+
+        Returns:
+            list: Futures de las capturas encoladas (True por captura
+            aceptada si se usa `store`)
+        """
+        stamp = int(time.time())
+        start = time.monotonic()
+        futures = []
+        slot = taken = 0
+        while count is None or taken < count:
+            deadline = start + slot * interval
+            if duration is not None and deadline - start >= duration:
+                break
+            now = time.monotonic()
+            if deadline > now:
+                time.sleep(deadline - now)
+            elif interval > 0 and now - deadline >= interval:
+                slot += int((now - deadline) / interval)
+                continue
+            if store is not None:
+                future = store.submit(self.grab(), time.time()) or None
+            else:
+                future = self.writer.submit(self.grab(), self.path_for(tag, stamp, taken),
+                                            block=block)
+            if future is not None:
+                futures.append(future)
+            if on_frame:
+                on_frame(taken, future)
+            taken += 1
+            slot += 1
+        return futures
+
+    def stats(self):
+        return {'backend': getattr(self.backend, 'name', type(self.backend).__name__),
+                'captured': self.captured, 'grab_ms': round(self.grab_ms, 1),
+                'written': self.writer.written, 'dropped': self.writer.dropped,
+                'errors': self.writer.errors}
+
+    def close(self):
+        """Espera a que se guarden las capturas y libera el backend."""
+        self.writer.close()
+        self.backend.close()
+
+
+_capture = None
+
+
 def take_screenshot(tag="default"):
     """Captura una captura de pantalla y la guarda con un tag descriptivo.
 
@@ -42,20 +341,95 @@ def take_screenshot(tag="default"):
 
     Note:
         Las capturas se guardan en el directorio screenshots/ con formato:
-        snap_{tag}_{timestamp}.png
+        snap_{tag}_{timestamp}.png. El backend se abre en la primera
+        llamada y se reutiliza en las siguientes.
 
     Example:
         >>> take_screenshot("test_interface")
         [Hydra] Screenshot saved: screenshots/snap_test_interface_1234567890.png
     """
-    filename = os.path.join(LOG_DIR, f"snap_{tag}_{int(time.time())}.png")
-    pyautogui.screenshot(filename)
+    global _capture
+    if _capture is None:
+        _capture = ScreenCapture()
+    filename = _capture.snapshot(tag).result()
     print(color(f"[Hydra] Screenshot saved: {filename}", Fore.BLUE))
+    return filename
 
 
-if __name__ == "__main__":
+def parse_duration(value):
+    """'90', '30s', '15m', '8h' -> segundos."""
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+def main(argv=None):
     import argparse
     parser = argparse.ArgumentParser(description="Capture a screenshot with colorful logging")
     parser.add_argument('--tag', default='default', help='Tag for the output filename')
-    args = parser.parse_args()
-    take_screenshot(args.tag)
+    parser.add_argument('--burst', type=int, metavar='N', help='Take N screenshots in a row')
+    parser.add_argument('--timelapse', action='store_true',
+                        help='Capture every --interval seconds until Ctrl+C, --count or --duration')
+    parser.add_argument('--interval', type=float, default=None,
+                        help='Seconds between captures (burst default: 0, timelapse: 10)')
+    parser.add_argument('--count', type=int, help='Stop the timelapse after N captures')
+    parser.add_argument('--duration', type=parse_duration, help='Stop the timelapse after 90s/15m/8h')
+    parser.add_argument('--backend', choices=('auto', *BACKENDS), default='auto')
+    parser.add_argument('--format', choices=sorted(IMAGE_FORMATS), default='png')
+    parser.add_argument('--store', choices=('tlx', 'files'), default='tlx',
+                        help='Timelapse storage: deduplicated .tlx container or one image per frame')
+    parser.add_argument('--workers', type=int, default=WRITER_WORKERS, help='Encoding threads')
+    args = parser.parse_args(argv)
+
+    if not args.burst and not args.timelapse:
+        take_screenshot(args.tag)
+        return 0
+
+    try:
+        capture = ScreenCapture(args.backend, fmt=args.format, workers=args.workers)
+    except RuntimeError as e:
+        print(color(f"[Hydra] {e}", Fore.RED))
+        return 1
+
+    def progress(index, future):
+        if future is None:
+            print(color(f"[Hydra] Capture {index} dropped (writer busy)", Fore.YELLOW))
+
+    store = None
+    if args.timelapse and args.store == 'tlx':
+        path = os.path.join(capture.directory, f"timelapse_{args.tag}_{int(time.time())}.tlx")
+        store = TimelapseWriter(path).start()
+
+    started = time.monotonic()
+    try:
+        if args.burst:
+            capture.burst(args.tag, args.burst, args.interval or 0.0)
+        else:
+            interval = args.interval if args.interval is not None else 10.0
+            print(color(f"[Hydra] Timelapse every {interval}s (Ctrl+C to stop)", Fore.BLUE))
+            capture.timelapse(args.tag, interval, args.count, args.duration, on_frame=progress,
+                              store=store)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        capture.close()
+        if store is not None:
+            store.close()
+    if store is not None:
+        st = store.stats()
+        print(color(f"[Hydra] Timelapse saved: {store.path} ({st['stored']} of {st['received']} "
+                    f"frames stored, {st['unchanged']} unchanged, {st['keyframes']} keyframes, "
+                    f"{st['bytes'] / 1e6:.1f} MB, {st['ratio'] or 0}x smaller than raw)",
+                    Fore.BLUE))
+        return 0
+    stats = capture.stats()
+    print(color(f"[Hydra] {stats['written']} screenshots saved in {capture.directory} "
+                f"({stats['captured']} captured in {time.monotonic() - started:.1f}s with "
+                f"{stats['backend']}, {stats['grab_ms']} ms/grab, {stats['dropped']} dropped)",
+                Fore.BLUE))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
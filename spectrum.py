@@ -0,0 +1,66 @@
+"""Análisis de bandas de frecuencia compartido por los módulos de audio.
+
+ondads.py, dashboard.py y las herramientas de hydra usan el mismo cálculo:
+FFT con ventana de Hann sobre el primer canal, espectro dividido en
+bandas equiespaciadas entre 0 y fs/2 y amplitud máxima de cada banda.
+
+La ventana y los límites de cada banda solo dependen del tamaño del
+bloque, la frecuencia de muestreo y el número de bandas, así que se
+calculan una vez y se reutilizan en cada bloque.
+
+Ejemplo:
+    >>> import numpy as np
+    >>> audio = np.random.randn(2205, 1)
+    >>> len(band_amps(audio, 44100, 7))
+    7
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+
+@lru_cache(maxsize=32)
+def _band_layout(n_samples, fs, n_bands):
+    """Ventana de Hann y rangos [inicio, fin) de bins de la FFT por banda."""
+    window = np.hanning(n_samples)
+    freqs = np.fft.rfftfreq(n_samples, 1 / fs)
+    edges = np.linspace(0, fs // 2, n_bands + 1)
+    # freqs está ordenado: cada banda es un rango contiguo de bins
+    starts = np.searchsorted(freqs, edges[:-1], side='left')
+    ends = np.searchsorted(freqs, edges[1:], side='left')
+    return window, tuple(zip(starts.tolist(), ends.tolist()))
+
+
+def band_amps(audio_block, fs, n_bands):
+    """Amplitud logarítmica (log1p del máximo) de cada banda de frecuencia.
+
+    Args:
+        audio_block: Array de audio, shape (n_samples,) o (n_samples, n_channels)
+        fs: Frecuencia de muestreo en Hz
+        n_bands: Número de bandas
+
+    Returns:
+        np.ndarray: Amplitudes por banda (0 en bandas sin bins)
+    """
+    data = audio_block if audio_block.ndim == 1 else audio_block[:, 0]
+    window, bands = _band_layout(len(data), fs, n_bands)
+    mag = np.abs(np.fft.rfft(data * window))
+    amps = np.zeros(n_bands)
+    for i, (start, end) in enumerate(bands):
+        if end > start:
+            amps[i] = mag[start:end].max()
+    return np.log1p(amps)
+
+
+def normalized_band_amps(audio_block, fs, n_bands):
+    """Amplitudes por banda normalizadas a [0, 1] respecto a la banda más fuerte.
+
+    Returns:
+        list: Floats, útiles para enviar como JSON
+    """
+    amps = band_amps(audio_block, fs, n_bands)
+    peak = amps.max()
+    if peak <= 0:
+        peak = 1
+    return (amps / peak).tolist()
@@ -6,9 +6,12 @@ buscar canciones en el catálogo de Spotify.
 
 Características:
     - Sistema de autenticación OAuth 2.0 con Spotify
-    - Gestión automática de tokens con renovación
+    - Tokens guardados en el servidor con renovación anticipada en background
     - Visualización de canción actual en reproducción
     - Búsqueda de canciones con caché para optimización
+    - Enriquecimiento por lotes de tracks con audio features (/tracks/batch)
+    - Sugerencias por prefijo desde un índice local de tracks ya vistos (/suggest)
+    - Proxy de carátulas con miniaturas cacheadas y paleta de colores (/art)
     - API REST para integración con frontends
 
 Variables de entorno requeridas:
@@ -16,6 +19,8 @@ Variables de entorno requeridas:
     SPOTIPY_CLIENT_SECRET: Client Secret de Spotify Developer Dashboard
     SPOTIPY_REDIRECT_URI: URI de callback (default: http://localhost:8888/callback)
     FLASK_SECRET: Secreto para sesiones Flask (default: 'change-me')
+    SPOTIFY_API_URL: Prefijo de la Web API (default: https://api.spotify.com/v1/),
+        útil para apuntar a un servidor mock en pruebas de carga
 
 Uso:
     python3 app.py
@@ -24,13 +29,27 @@ El servidor escucha en http://0.0.0.0:8888
 """
 
 import os
+import re
 import time
 import threading
 import warnings
-from flask import Flask, redirect, request, session, url_for, jsonify, render_template
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, redirect, request, session, url_for, jsonify, render_template
+import requests
 import spotipy
+from spotipy.cache_handler import MemoryCacheHandler
 from spotipy.oauth2 import SpotifyOAuth
 
+try:
+    from .art_cache import ART_FORMATS, ArtCache, image_id_from_url
+    from .search_index import TrackIndex
+    from .token_manager import TokenManager
+except ImportError:  # Ejecutado como script desde spotify_live/
+    from art_cache import ART_FORMATS, ArtCache, image_id_from_url
+    from search_index import TrackIndex
+    from token_manager import TokenManager
+
 app = Flask(__name__)
 flask_secret = os.environ.get('FLASK_SECRET', 'change-me')
 app.secret_key = flask_secret
@@ -51,44 +70,143 @@ CACHE_EXPIRY_SECONDS = 300  # 5 minutos
 CACHE_MAX_SIZE = 100  # Máximo de entradas en caché
 cache_lock = threading.Lock()  # Lock para acceso thread-safe
 
+# Caché por ID para /tracks/batch. Los metadatos de un track casi no cambian,
+# así que se guardan más tiempo. OrderedDict mantiene el orden de inserción
+# para descartar la entrada más antigua en O(1).
+# Estructura: {track_id: {'value': {...}, 'timestamp': time.time()}}
+TRACK_CACHE = OrderedDict()
+FEATURES_CACHE = OrderedDict()
+ITEM_CACHE_EXPIRY_SECONDS = 3600  # 1 hora
+ITEM_CACHE_MAX_SIZE = 5000
+item_cache_lock = threading.Lock()
+
+# Límites de los endpoints multi-ID de Spotify
+MAX_BATCH_IDS = 500
+TRACKS_CHUNK_SIZE = 50
+FEATURES_CHUNK_SIZE = 100
+TRACK_ID_RE = re.compile(r'^[0-9A-Za-z]{22}$')
+batch_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='spotify-batch')
+
+# Índice local de todos los tracks vistos, para sugerencias sin red
+track_index = TrackIndex()
+SUGGEST_LIMIT = 5
+SUGGEST_MIN_LOCAL = 3  # Con menos resultados locales se consulta a Spotify
+SUGGEST_FIELDS = ('id', 'name', 'artists', 'image', 'art', 'preview')
+
+# Caché de carátulas en disco; se crea en el primer uso de /art
+_art_cache = None
+_art_cache_lock = threading.Lock()
+
 CLIENT_ID = os.environ.get('SPOTIPY_CLIENT_ID')
 CLIENT_SECRET = os.environ.get('SPOTIPY_CLIENT_SECRET')
 REDIRECT_URI = os.environ.get('SPOTIPY_REDIRECT_URI', 'http://localhost:8888/callback')
 SCOPE = 'user-read-currently-playing'
+SPOTIFY_API_URL = os.environ.get('SPOTIFY_API_URL', 'https://api.spotify.com/v1/')
 
+# Los tokens de cada usuario viven en token_manager; el caché de spotipy
+# queda en memoria para no escribir tokens en un archivo .cache compartido.
 sp_oauth = SpotifyOAuth(client_id=CLIENT_ID,
                         client_secret=CLIENT_SECRET,
                         redirect_uri=REDIRECT_URI,
-                        scope=SCOPE)
+                        scope=SCOPE,
+                        cache_handler=MemoryCacheHandler())
+token_manager = TokenManager(sp_oauth)
 
 
 def get_token():
-    """Obtiene un token de acceso válido de Spotify desde la sesión.
+    """Obtiene un token de acceso válido de Spotify para la sesión actual.
 
-    Verifica si existe un token en la sesión, comprueba su validez,
-    y lo renueva automáticamente si está expirado usando el refresh token.
+    La cookie de sesión solo guarda un ID ('sid'); el token_info vive en
+    token_manager, que lo renueva en background antes de que expire. Solo
+    si el token ya expiró se renueva en el momento (una vez por sesión,
+    aunque lleguen peticiones paralelas).
 
     Returns:
         str or None: Token de acceso válido, o None si no hay sesión activa
 
     Note:
-        Esta función centraliza la lógica de gestión de tokens OAuth,
-        facilitando el mantenimiento y reduciendo código duplicado.
+        Las cookies antiguas que aún traen 'token_info' se migran al
+        almacén del servidor en la primera petición.
     """
-    token_info = session.get('token_info')
-    if token_info and not sp_oauth.is_token_expired(token_info):
-        return token_info['access_token']
-    if token_info and sp_oauth.is_token_expired(token_info):
-        try:
-            # Renovación automática del token usando refresh_token
-            token_info = sp_oauth.refresh_access_token(token_info['refresh_token'])
-            session['token_info'] = token_info
-            return token_info['access_token']
-        except Exception:
-            # Si falla la renovación, limpiar sesión
-            session.pop('token_info', None)
-            return None
-    return None
+    if 'token_info' in session:
+        session['sid'] = token_manager.new_session(session.pop('token_info'))
+    token = token_manager.get_access_token(session.get('sid'))
+    if token is None:
+        session.pop('sid', None)
+    return token
+
+
+def spotify_client(token):
+    """Crea un cliente de spotipy autenticado con el token dado.
+
+    Args:
+        token: Token de acceso OAuth del usuario
+
+    Returns:
+        spotipy.Spotify: Cliente apuntando a SPOTIFY_API_URL
+    """
+    sp = spotipy.Spotify(auth=token)
+    sp.prefix = SPOTIFY_API_URL
+    return sp
+
+
+def get_art_cache():
+    """Devuelve el caché de carátulas, creándolo (y su directorio) en el primer uso."""
+    global _art_cache
+    with _art_cache_lock:
+        if _art_cache is None:
+            _art_cache = ArtCache()
+        return _art_cache
+
+
+def art_path(image_url):
+    """Ruta del proxy /art para una URL del CDN de Spotify (None si no aplica)."""
+    image_id = image_id_from_url(image_url)
+    return f'/art/{image_id}' if image_id else None
+
+
+def format_current_item(item):
+    """Extrae los campos que expone /current de un track de la API de Spotify.
+
+    Usa acceso defensivo porque la respuesta de reproducción actual puede
+    traer campos incompletos (episodios, pistas locales, etc.).
+    """
+    artists = [a.get('name', 'Unknown') for a in item.get('artists', [])]
+    album = item.get('album', {})
+    images = album.get('images', [])
+    image = images[0].get('url') if images else None
+    return {
+        'id': item.get('id'),
+        'name': item.get('name', 'Unknown'),
+        'artists': ', '.join(artists) if artists else 'Unknown Artist',
+        'album': album.get('name', 'Unknown Album'),
+        'image': image,
+        'art': art_path(image),
+        'preview': item.get('preview_url')
+    }
+
+
+def current_palette(track):
+    """Paleta de la carátula si ya está cacheada; si no, la prepara en background.
+
+    Así /current nunca espera la descarga de la imagen: la paleta aparece
+    en la siguiente consulta.
+    """
+    image_id = image_id_from_url(track.get('image'))
+    if image_id is None:
+        return None
+    cache = get_art_cache()
+    palette = cache.cached_palette(image_id)
+    if palette is None:
+        batch_executor.submit(cache.palette, image_id)
+    return palette
+
+
+def art_format(accept_header, requested=None):
+    """Elige el formato de la miniatura: ?format= explícito o WebP si el cliente lo acepta."""
+    if requested:
+        return requested
+    return 'webp' if 'image/webp' in (accept_header or '') else 'jpeg'
 
 
 @app.route('/')
@@ -120,11 +238,14 @@ def callback():
 
     Spotify redirige aquí después de que el usuario autoriza la app.
     Intercambia el código de autorización por tokens de acceso
-    y los guarda en la sesión del usuario.
+    y los guarda en el almacén del servidor, dejando en la cookie solo
+    el ID de sesión.
     """
     code = request.args.get('code')
-    token_info = sp_oauth.get_access_token(code)
-    session['token_info'] = token_info
+    token_info = sp_oauth.get_access_token(code, check_cache=False)
+    if session.get('sid'):
+        token_manager.drop(session['sid'])
+    session['sid'] = token_manager.new_session(token_info)
     return redirect(url_for('index'))
 
 
@@ -148,24 +269,15 @@ def current():
         return jsonify({'error': 'not_authenticated'}), 401
 
     try:
-        sp = spotipy.Spotify(auth=token)
+        sp = spotify_client(token)
         # Consulta optimizada: solo obtiene campos necesarios
         track = sp.current_user_playing_track()
 
         if track and track.get('item'):
-            item = track['item']
-            # Validación defensiva de datos
-            artists = [a.get('name', 'Unknown') for a in item.get('artists', [])]
-            album = item.get('album', {})
-            images = album.get('images', [])
-
-            return jsonify({
-                'name': item.get('name', 'Unknown'),
-                'artists': ', '.join(artists) if artists else 'Unknown Artist',
-                'album': album.get('name', 'Unknown Album'),
-                'image': images[0].get('url') if images else None,
-                'preview': item.get('preview_url')
-            })
+            current_track = format_current_item(track['item'])
+            index_tracks([current_track])
+            current_track['palette'] = current_palette(current_track)
+            return jsonify(current_track)
         else:
             return jsonify({'error': 'no_track'})
     except spotipy.exceptions.SpotifyException as e:
@@ -188,6 +300,103 @@ def _clean_expired_cache_unsafe():
                     if now - v['timestamp'] < CACHE_EXPIRY_SECONDS}
 
 
+def cache_lookup(query_lower):
+    """Busca resultados vigentes en el caché de búsquedas (thread-safe).
+
+    Args:
+        query_lower: Query de búsqueda normalizado a minúsculas
+
+    Returns:
+        list or None: Resultados cacheados, o None si no hay entrada vigente
+    """
+    with cache_lock:
+        if query_lower in SEARCH_CACHE:
+            cached = SEARCH_CACHE[query_lower]
+            # Verificar si el caché no ha expirado
+            if time.time() - cached['timestamp'] < CACHE_EXPIRY_SECONDS:
+                return cached['results']
+    return None
+
+
+def cache_store(query_lower, tracks):
+    """Guarda resultados de búsqueda en el caché (thread-safe).
+
+    El límite de CACHE_MAX_SIZE se aplica aquí, bajo el mismo lock que la
+    inserción, para que los stores concurrentes no lo sobrepasen: si el
+    caché está lleno se limpian las entradas expiradas y, de ser
+    necesario, se descarta la más antigua.
+    """
+    with cache_lock:
+        if query_lower not in SEARCH_CACHE and len(SEARCH_CACHE) >= CACHE_MAX_SIZE:
+            _clean_expired_cache_unsafe()
+            if len(SEARCH_CACHE) >= CACHE_MAX_SIZE:
+                oldest_key = min(SEARCH_CACHE.keys(),
+                                 key=lambda k: SEARCH_CACHE[k]['timestamp'])
+                del SEARCH_CACHE[oldest_key]
+        SEARCH_CACHE[query_lower] = {
+            'results': tracks,
+            'timestamp': time.time()
+        }
+
+
+def format_search_item(item):
+    """Extrae los campos que expone /search de un track de la API de Spotify."""
+    image = item['album']['images'][0]['url'] if item['album']['images'] else None
+    return {
+        'id': item.get('id'),
+        'name': item['name'],
+        'artists': ', '.join(a['name'] for a in item['artists']),
+        'image': image,
+        'art': art_path(image),
+        'preview': item['preview_url']
+    }
+
+
+def index_tracks(tracks):
+    """Agrega tracks formateados al índice local de sugerencias."""
+    track_index.add_many({field: t.get(field) for field in SUGGEST_FIELDS}
+                         for t in tracks if t.get('name'))
+
+
+def search_tracks(token, query):
+    """Busca tracks usando primero el caché y luego la API de Spotify.
+
+    Args:
+        token: Token de acceso OAuth del usuario
+        query: Término de búsqueda (no vacío)
+
+    Returns:
+        tuple: (lista de tracks formateados, True si vino del caché)
+    """
+    # Verificar caché primero (thread-safe)
+    query_lower = query.lower()
+    cached = cache_lookup(query_lower)
+    if cached is not None:
+        return cached, True
+
+    # Si no hay caché válido, consultar Spotify API
+    sp = spotify_client(token)
+    results = sp.search(q=query, type='track', limit=5)
+    tracks = [format_search_item(item) for item in results['tracks']['items']]
+
+    # Guardar en caché (thread-safe) e indexar para sugerencias
+    cache_store(query_lower, tracks)
+    index_tracks(tracks)
+    return tracks, False
+
+
+def merge_suggestions(local, remote, limit=SUGGEST_LIMIT):
+    """Combina sugerencias locales y de Spotify sin duplicados, locales primero."""
+    merged = list(local)
+    seen = {t.get('id') or (t['name'], t['artists']) for t in merged}
+    for track in remote:
+        key = track.get('id') or (track['name'], track['artists'])
+        if key not in seen:
+            seen.add(key)
+            merged.append({field: track.get(field) for field in SUGGEST_FIELDS})
+    return merged[:limit]
+
+
 @app.route('/search')
 def search():
     """API endpoint para búsqueda de canciones en Spotify.
@@ -217,44 +426,324 @@ def search():
     if not query:
         return jsonify({'results': []})
 
-    # Verificar caché primero (thread-safe)
-    query_lower = query.lower()
-    with cache_lock:
-        if query_lower in SEARCH_CACHE:
-            cached = SEARCH_CACHE[query_lower]
-            # Verificar si el caché no ha expirado
-            if time.time() - cached['timestamp'] < CACHE_EXPIRY_SECONDS:
-                return jsonify({'results': cached['results'], 'cached': True})
+    tracks, cached = search_tracks(token, query)
+    return jsonify({'results': tracks, 'cached': cached})
 
-        # Limpiar caché si ha crecido demasiado
-        if len(SEARCH_CACHE) >= CACHE_MAX_SIZE:
-            _clean_expired_cache_unsafe()
-            # Si aún está lleno después de limpiar, remover la entrada más antigua
-            if len(SEARCH_CACHE) >= CACHE_MAX_SIZE:
-                oldest_key = min(SEARCH_CACHE.keys(),
-                                 key=lambda k: SEARCH_CACHE[k]['timestamp'])
-                del SEARCH_CACHE[oldest_key]
 
-    # Si no hay caché válido, consultar Spotify API
-    sp = spotipy.Spotify(auth=token)
-    results = sp.search(q=query, type='track', limit=5)
-    tracks = []
-    for item in results['tracks']['items']:
-        tracks.append({
-            'name': item['name'],
-            'artists': ', '.join(a['name'] for a in item['artists']),
-            'image': item['album']['images'][0]['url'] if item['album']['images'] else None,
-            'preview': item['preview_url']
-        })
-
-    # Guardar en caché (thread-safe)
-    with cache_lock:
-        SEARCH_CACHE[query_lower] = {
-            'results': tracks,
-            'timestamp': time.time()
-        }
+def parse_track_ids(raw_ids):
+    """Normaliza la lista de IDs recibida por /tracks/batch.
+
+    Acepta IDs simples o URIs/URLs de Spotify, elimina duplicados
+    conservando el orden y valida el formato base62 de 22 caracteres.
 
-    return jsonify({'results': tracks, 'cached': False})
+    Args:
+        raw_ids: Iterable de strings con IDs, URIs o URLs de tracks
+
+    Returns:
+        list: IDs únicos en el orden original
+
+    Raises:
+        ValueError: Si hay IDs inválidos o se supera MAX_BATCH_IDS
+    """
+    ids = []
+    seen = set()
+    for raw in raw_ids:
+        track_id = str(raw).strip().split('?')[0].rsplit(':', 1)[-1].rsplit('/', 1)[-1]
+        if not track_id:
+            continue
+        if not TRACK_ID_RE.match(track_id):
+            raise ValueError(f'ID de track inválido: {raw}')
+        if track_id not in seen:
+            seen.add(track_id)
+            ids.append(track_id)
+    if len(ids) > MAX_BATCH_IDS:
+        raise ValueError(f'Máximo {MAX_BATCH_IDS} IDs por petición (recibidos {len(ids)})')
+    return ids
+
+
+def chunked(items, size):
+    """Divide una lista en trozos de como máximo `size` elementos."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def item_cache_get_many(cache, ids):
+    """Obtiene del caché por ID las entradas vigentes (thread-safe).
+
+    Returns:
+        dict: {track_id: valor} solo para los IDs encontrados y no expirados
+    """
+    now = time.time()
+    found = {}
+    with item_cache_lock:
+        for track_id in ids:
+            entry = cache.get(track_id)
+            if entry and now - entry['timestamp'] < ITEM_CACHE_EXPIRY_SECONDS:
+                found[track_id] = entry['value']
+    return found
+
+
+def item_cache_put_many(cache, values):
+    """Guarda valores en el caché por ID, descartando los más antiguos si se llena."""
+    now = time.time()
+    with item_cache_lock:
+        for track_id, value in values.items():
+            cache.pop(track_id, None)
+            cache[track_id] = {'value': value, 'timestamp': now}
+        while len(cache) > ITEM_CACHE_MAX_SIZE:
+            cache.popitem(last=False)
+
+
+def format_batch_track(item):
+    """Extrae los campos que expone /tracks/batch de un track completo."""
+    album = item.get('album', {})
+    images = album.get('images', [])
+    image = images[0].get('url') if images else None
+    return {
+        'id': item['id'],
+        'name': item.get('name', 'Unknown'),
+        'artists': ', '.join(a.get('name', 'Unknown') for a in item.get('artists', [])),
+        'album': album.get('name', 'Unknown Album'),
+        'image': image,
+        'art': art_path(image),
+        'preview': item.get('preview_url'),
+        'duration_ms': item.get('duration_ms'),
+        'popularity': item.get('popularity'),
+    }
+
+
+AUDIO_FEATURE_FIELDS = ('danceability', 'energy', 'valence', 'tempo', 'loudness',
+                        'key', 'mode', 'acousticness', 'instrumentalness')
+
+
+def format_audio_features(features):
+    """Reduce un objeto de audio features a los campos útiles para temas visuales."""
+    return {field: features.get(field) for field in AUDIO_FEATURE_FIELDS}
+
+
+def batch_plan(ids):
+    """Resuelve desde caché lo posible y agrupa lo que falta en trozos.
+
+    Returns:
+        tuple: (tracks, features, track_chunks, feature_chunks) donde tracks y
+        features son dicts con lo ya cacheado y los chunks son listas de IDs
+        a pedir a /tracks (50 por llamada) y /audio-features (100 por llamada)
+    """
+    tracks = item_cache_get_many(TRACK_CACHE, ids)
+    features = item_cache_get_many(FEATURES_CACHE, ids)
+    track_chunks = chunked([i for i in ids if i not in tracks], TRACKS_CHUNK_SIZE)
+    feature_chunks = chunked([i for i in ids if i not in features], FEATURES_CHUNK_SIZE)
+    return tracks, features, track_chunks, feature_chunks
+
+
+def store_batch_results(tracks, features, track_items, feature_items):
+    """Formatea las respuestas de Spotify, las cachea y las agrega a los resultados.
+
+    Args:
+        tracks: Dict {id: track formateado} a completar
+        features: Dict {id: features formateadas} a completar
+        track_items: Tracks crudos devueltos por /tracks (None si no existen)
+        feature_items: Objetos crudos de /audio-features (None si no existen)
+    """
+    new_tracks = {t['id']: format_batch_track(t) for t in track_items if t}
+    new_features = {f['id']: format_audio_features(f) for f in feature_items if f}
+    index_tracks(new_tracks.values())
+    item_cache_put_many(TRACK_CACHE, new_tracks)
+    item_cache_put_many(FEATURES_CACHE, new_features)
+    tracks.update(new_tracks)
+    features.update(new_features)
+
+
+def batch_response(ids, tracks, features, cached, features_error=None):
+    """Combina tracks y audio features en la respuesta de /tracks/batch."""
+    results = []
+    for track_id in ids:
+        if track_id in tracks:
+            results.append(dict(tracks[track_id], features=features.get(track_id)))
+    response = {
+        'tracks': results,
+        'not_found': [i for i in ids if i not in tracks],
+        'cached': cached,
+    }
+    if features_error:
+        response['features_error'] = features_error
+    return response
+
+
+def requested_track_ids():
+    """Lee los IDs de ?ids=a,b,c o de un body JSON {"ids": [...]}."""
+    if request.method == 'POST':
+        body = request.get_json(silent=True) or {}
+        raw = body.get('ids', [])
+        return raw if isinstance(raw, list) else str(raw).split(',')
+    return request.args.get('ids', '').split(',')
+
+
+def _fetch_tracks_chunk(token, chunk):
+    return spotify_client(token).tracks(chunk)['tracks']
+
+
+def _fetch_features_chunk(token, chunk):
+    return spotify_client(token).audio_features(chunk)
+
+
+@app.route('/tracks/batch', methods=['GET', 'POST'])
+def tracks_batch():
+    """API endpoint que enriquece hasta MAX_BATCH_IDS tracks en una sola petición.
+
+    Divide los IDs no cacheados en trozos para los endpoints multi-ID de
+    Spotify (/tracks de a 50, /audio-features de a 100), los consulta en
+    paralelo con un pool de threads y devuelve una respuesta combinada.
+    Si /audio-features falla (p. ej. apps sin acceso a ese endpoint), los
+    tracks se devuelven igual con features en null.
+
+    Query Parameters / Body JSON:
+        ids: IDs, URIs o URLs de tracks (separados por comas o lista JSON)
+
+    Returns:
+        JSON con 'tracks' (en el orden pedido), 'not_found' y 'cached'
+
+    Status Codes:
+        200: Lote procesado
+        400: IDs inválidos o demasiados IDs
+        401: No autenticado
+        502: No se pudo conectar con Spotify (conexión o timeout)
+        503: Error de la API de Spotify al obtener tracks
+    """
+    token = get_token()
+    if not token:
+        return jsonify({'error': 'not_authenticated'}), 401
+
+    try:
+        ids = parse_track_ids(requested_track_ids())
+    except ValueError as e:
+        return jsonify({'error': 'invalid_ids', 'message': str(e)}), 400
+
+    tracks, features, track_chunks, feature_chunks = batch_plan(ids)
+    cached = sum(1 for i in ids if i in tracks and i in features)
+
+    track_futures = [batch_executor.submit(_fetch_tracks_chunk, token, c) for c in track_chunks]
+    feature_futures = [batch_executor.submit(_fetch_features_chunk, token, c)
+                       for c in feature_chunks]
+
+    try:
+        track_items = [t for f in track_futures for t in f.result()]
+    except spotipy.exceptions.SpotifyException as e:
+        return jsonify({'error': 'spotify_api_error', 'message': str(e)}), 503
+    except requests.RequestException as e:
+        # Conexión rechazada, timeout...: también JSON, no la página 500 de Flask
+        return jsonify({'error': 'spotify_connection_error', 'message': str(e)}), 502
+
+    feature_items = []
+    features_error = None
+    for future in feature_futures:
+        try:
+            feature_items.extend(future.result() or [])
+        except (spotipy.exceptions.SpotifyException, requests.RequestException) as e:
+            features_error = str(e) or type(e).__name__
+
+    store_batch_results(tracks, features, track_items, feature_items)
+    return jsonify(batch_response(ids, tracks, features, cached, features_error))
+
+
+@app.route('/suggest')
+def suggest():
+    """API endpoint de sugerencias mientras el usuario escribe (typeahead).
+
+    Responde desde el índice local de tracks ya vistos, donde cada palabra
+    del query se compara como prefijo ('bohem rhap' encuentra 'Bohemian
+    Rhapsody'). Solo si hay menos de SUGGEST_MIN_LOCAL resultados locales
+    se consulta a Spotify (con el mismo caché que /search).
+
+    Query Parameters:
+        q: Texto parcial escrito por el usuario
+        remote: '0' para no consultar nunca a Spotify
+
+    Returns:
+        JSON con 'results' y 'source' ('local' o 'spotify')
+
+    Status Codes:
+        200: Sugerencias (puede tener 0 resultados)
+        401: No autenticado
+    """
+    token = get_token()
+    if not token:
+        return jsonify({'error': 'not_authenticated'}), 401
+
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'results': [], 'source': 'local'})
+
+    local = track_index.search(query, SUGGEST_LIMIT)
+    if len(local) >= SUGGEST_MIN_LOCAL or request.args.get('remote') == '0':
+        return jsonify({'results': local, 'source': 'local'})
+
+    try:
+        remote, _ = search_tracks(token, query)
+    except spotipy.exceptions.SpotifyException:
+        # Sin Spotify, lo local sigue siendo una respuesta útil
+        return jsonify({'results': local, 'source': 'local'})
+    return jsonify({'results': merge_suggestions(local, remote), 'source': 'spotify'})
+
+
+@app.route('/art/<image_id>')
+def art(image_id):
+    """Proxy de carátulas del CDN de Spotify con miniaturas cacheadas.
+
+    Descarga cada imagen una sola vez y sirve variantes redimensionadas
+    (WebP si el navegador lo acepta, si no JPEG) desde un LRU en disco,
+    con ETag fuerte y caché de larga duración en el cliente.
+
+    Query Parameters:
+        size: Lado máximo en píxeles (se redondea a 64, 160, 300 o 640)
+        format: 'webp' o 'jpeg' para forzar un formato
+
+    Status Codes:
+        200: Imagen servida
+        304: El cliente ya tiene esta versión (If-None-Match)
+        400: Formato no soportado
+        404: ID de imagen inválido
+        502: No se pudo descargar la imagen original o no es una imagen válida
+    """
+    size = request.args.get('size', 300, type=int)
+    fmt = art_format(request.headers.get('Accept'), request.args.get('format'))
+    if fmt not in ART_FORMATS:
+        return jsonify({'error': 'invalid_format'}), 400
+    try:
+        data, mimetype, etag = get_art_cache().variant(image_id, size, fmt)
+    except ValueError:
+        return jsonify({'error': 'invalid_image_id'}), 404
+    except requests.RequestException as e:
+        return jsonify({'error': 'art_fetch_error', 'message': str(e)}), 502
+    except OSError as e:
+        # El CDN respondió algo que no es una imagen (PIL.UnidentifiedImageError)
+        return jsonify({'error': 'art_decode_error', 'message': str(e)}), 502
+
+    response = Response(data, mimetype=mimetype)
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    response.vary.add('Accept')
+    return response.make_conditional(request)
+
+
+@app.route('/art/<image_id>/palette')
+def art_palette(image_id):
+    """API endpoint con la paleta de colores dominantes de una carátula.
+
+    Returns:
+        JSON con 'palette' (colores '#rrggbb', dominante primero) y 'dominant'
+    """
+    try:
+        palette = get_art_cache().palette(image_id)
+    except ValueError:
+        return jsonify({'error': 'invalid_image_id'}), 404
+    except requests.RequestException as e:
+        return jsonify({'error': 'art_fetch_error', 'message': str(e)}), 502
+    except OSError as e:
+        # El CDN respondió algo que no es una imagen (PIL.UnidentifiedImageError)
+        return jsonify({'error': 'art_decode_error', 'message': str(e)}), 502
+    return jsonify({'palette': palette, 'dominant': palette[0] if palette else None})
 
 
 if __name__ == '__main__':
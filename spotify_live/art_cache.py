@@ -0,0 +1,255 @@
+"""Caché en disco de carátulas redimensionadas para el proxy /art.
+
+Cada imagen del CDN de Spotify se descarga una sola vez; a partir del
+original se generan miniaturas (WebP o JPEG) en los tamaños que piden
+los clientes y una paleta de colores dominantes, útil para sincronizar
+la iluminación RGB sin procesar la imagen en el navegador.
+
+Características:
+    - LRU en disco con límite de bytes (ART_CACHE_MAX_BYTES)
+    - Tamaños redondeados a ART_SIZES para acotar las variantes
+    - ETag fuerte (hash del contenido) por variante
+    - Descargas serializadas por imagen: peticiones simultáneas de la
+      misma carátula no la descargan dos veces
+
+Requisitos:
+    pip install pillow requests
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import requests
+from PIL import Image
+
+ART_SOURCE_URL = os.environ.get('ART_SOURCE_URL', 'https://i.scdn.co/image/')
+ART_CACHE_DIR = os.environ.get('ART_CACHE_DIR',
+                               os.path.join(os.path.dirname(__file__), 'art_cache'))
+ART_CACHE_MAX_BYTES = int(os.environ.get('ART_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+ART_SIZES = (64, 160, 300, 640)
+ART_FORMATS = {'webp': ('WEBP', 'image/webp'), 'jpeg': ('JPEG', 'image/jpeg')}
+PALETTE_COLORS = 5
+PALETTE_MIN_DISTANCE = 24  # Distancia RGB (suma de diferencias) entre colores de la paleta
+FETCH_TIMEOUT = 10
+
+IMAGE_ID_RE = re.compile(r'^[0-9a-f]{16,64}$')
+IMAGE_URL_RE = re.compile(r'^https://i\.scdn\.co/image/([0-9a-f]{16,64})$')
+
+
+def image_id_from_url(url):
+    """Extrae el ID de una URL del CDN de Spotify (None si no es del CDN)."""
+    match = IMAGE_URL_RE.match(url or '')
+    return match.group(1) if match else None
+
+
+def snap_size(size):
+    """Redondea un tamaño pedido al menor de ART_SIZES que lo cubre."""
+    for allowed in ART_SIZES:
+        if size <= allowed:
+            return allowed
+    return ART_SIZES[-1]
+
+
+def compute_palette(image, n_colors=PALETTE_COLORS):
+    """Calcula los colores dominantes de una imagen.
+
+    Reduce la imagen a 64x64 y la cuantiza por median cut; los colores
+    se ordenan por cantidad de píxeles y se descartan los casi idénticos
+    a uno ya elegido (bordes suavizados por el redimensionado).
+
+    Args:
+        image: Imagen PIL
+        n_colors: Número máximo de colores
+
+    Returns:
+        list: Colores en formato '#rrggbb', el dominante primero
+    """
+    small = image.convert('RGB')
+    small.thumbnail((64, 64))
+    quantized = small.quantize(colors=n_colors, method=Image.Quantize.MEDIANCUT)
+    palette = quantized.getpalette()
+    chosen = []
+    for _, idx in sorted(quantized.getcolors(), reverse=True):
+        rgb = palette[idx * 3:idx * 3 + 3]
+        if all(sum(abs(a - b) for a, b in zip(rgb, other)) > PALETTE_MIN_DISTANCE
+               for other in chosen):
+            chosen.append(rgb)
+    return ['#{:02x}{:02x}{:02x}'.format(*rgb) for rgb in chosen]
+
+
+class ArtCache:
+    """Caché LRU en disco de carátulas originales, miniaturas y paletas.
+
+    Args:
+        directory: Directorio donde se guardan los archivos
+        max_bytes: Tamaño máximo total en disco
+        source_url: Prefijo de donde se descargan los originales
+    """
+
+    def __init__(self, directory=ART_CACHE_DIR, max_bytes=ART_CACHE_MAX_BYTES,
+                 source_url=ART_SOURCE_URL):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.source_url = source_url
+        os.makedirs(directory, exist_ok=True)
+        # {nombre_archivo: tamaño_en_bytes}, del menos al más recientemente usado
+        self._files = OrderedDict()
+        self._etags = {}
+        self._total = 0
+        self._lock = threading.Lock()
+        self._fetch_locks = {}
+        self._session = requests.Session()
+        self._load_existing()
+
+    def _load_existing(self):
+        """Recupera el estado LRU del disco ordenando por fecha de modificación."""
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self._total += size
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _touch(self, name):
+        """Marca un archivo como recién usado (en memoria y en disco)."""
+        with self._lock:
+            if name not in self._files:
+                return False
+            self._files.move_to_end(name)
+        try:
+            os.utime(self._path(name))
+        except OSError:
+            return False
+        return True
+
+    def _store(self, name, data):
+        """Escribe un archivo de forma atómica y aplica el límite de bytes."""
+        tmp = self._path(f'.{name}.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, self._path(name))
+        with self._lock:
+            self._total -= self._files.pop(name, 0)
+            self._files[name] = len(data)
+            self._total += len(data)
+            evicted = []
+            while self._total > self.max_bytes and len(self._files) > 1:
+                old, size = self._files.popitem(last=False)
+                self._total -= size
+                self._etags.pop(old, None)
+                evicted.append(old)
+        for old in evicted:
+            try:
+                os.remove(self._path(old))
+            except OSError:
+                pass
+
+    def _read(self, name):
+        if not self._touch(name):
+            return None
+        try:
+            with open(self._path(name), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _fetch_lock(self, image_id):
+        with self._lock:
+            return self._fetch_locks.setdefault(image_id, threading.Lock())
+
+    def original(self, image_id):
+        """Devuelve los bytes del original, descargándolo si no está en disco.
+
+        También calcula y guarda la paleta la primera vez.
+
+        Raises:
+            ValueError: Si el ID no tiene formato de imagen de Spotify
+            requests.RequestException: Si la descarga falla
+            OSError: Si la respuesta no es una imagen válida
+                (PIL.UnidentifiedImageError o imagen truncada)
+        """
+        if not IMAGE_ID_RE.match(image_id):
+            raise ValueError(f'ID de imagen inválido: {image_id}')
+        name = f'{image_id}.orig'
+        data = self._read(name)
+        if data is not None:
+            return data
+        try:
+            with self._fetch_lock(image_id):
+                # Otra petición pudo haberlo descargado mientras esperábamos
+                data = self._read(name)
+                if data is not None:
+                    return data
+                response = self._session.get(self.source_url + image_id, timeout=FETCH_TIMEOUT)
+                response.raise_for_status()
+                data = response.content
+                image = Image.open(io.BytesIO(data))
+                palette = compute_palette(image)
+                self._store(name, data)
+                self._store(f'{image_id}.palette.json', json.dumps(palette).encode())
+        finally:
+            # También si la descarga falla: si no, cada ID fallido deja un lock
+            with self._lock:
+                self._fetch_locks.pop(image_id, None)
+        return data
+
+    def palette(self, image_id):
+        """Paleta de colores dominantes de la imagen (la descarga si hace falta)."""
+        data = self._read(f'{image_id}.palette.json')
+        if data is None:
+            original = self.original(image_id)
+            # Si original() acaba de descargar la imagen, la paleta ya está guardada
+            data = self._read(f'{image_id}.palette.json')
+            if data is not None:
+                return json.loads(data)
+            palette = compute_palette(Image.open(io.BytesIO(original)))
+            self._store(f'{image_id}.palette.json', json.dumps(palette).encode())
+            return palette
+        return json.loads(data)
+
+    def cached_palette(self, image_id):
+        """Paleta si ya está en disco, sin descargar nada (None si no está)."""
+        data = self._read(f'{image_id}.palette.json')
+        return json.loads(data) if data is not None else None
+
+    def variant(self, image_id, size, fmt='webp'):
+        """Devuelve una miniatura, generándola a partir del original si no existe.
+
+        Args:
+            image_id: ID de la imagen en el CDN de Spotify
+            size: Lado máximo en píxeles (se redondea con snap_size)
+            fmt: 'webp' o 'jpeg'
+
+        Returns:
+            tuple: (bytes, mimetype, etag)
+        """
+        size = snap_size(size)
+        pil_format, mimetype = ART_FORMATS[fmt]
+        name = f'{image_id}_{size}.{fmt}'
+        data = self._read(name)
+        if data is None:
+            image = Image.open(io.BytesIO(self.original(image_id))).convert('RGB')
+            image.thumbnail((size, size), Image.LANCZOS)
+            buffer = io.BytesIO()
+            if pil_format == 'JPEG':
+                image.save(buffer, pil_format, quality=85, optimize=True, progressive=True)
+            else:
+                image.save(buffer, pil_format, quality=80, method=4)
+            data = buffer.getvalue()
+            self._store(name, data)
+        with self._lock:
+            etag = self._etags.get(name)
+            if etag is None:
+                etag = self._etags[name] = hashlib.sha1(data).hexdigest()
+        return data, mimetype, etag
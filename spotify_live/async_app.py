@@ -0,0 +1,345 @@
+"""Variante asíncrona (ASGI) de Spotify Live basada en Quart + aiohttp.
+
+Expone las mismas rutas que app.py, pero las llamadas a la API de Spotify
+se hacen con un cliente HTTP asíncrono compartido. Mientras una petición
+espera a Spotify, el event loop atiende otras, así que el servidor no
+necesita un thread bloqueado por cada petición en vuelo.
+
+Características:
+    - Mismas rutas y respuestas JSON que app.py (/, /login, /callback,
+      /current, /search, /suggest, /tracks/batch, /art)
+    - Cliente aiohttp.ClientSession con pool de conexiones keep-alive
+    - Timeouts por llamada a Spotify (respuesta 504 si se exceden)
+    - Límite de llamadas concurrentes a Spotify con un semáforo
+    - Reutiliza OAuth, caché de búsquedas y formateo de app.py
+
+Variables de entorno: las mismas que app.py, más
+    SPOTIFY_UPSTREAM_TIMEOUT: Timeout en segundos por llamada (default: 5)
+    SPOTIFY_UPSTREAM_CONCURRENCY: Máximo de llamadas simultáneas (default: 64)
+
+Uso:
+    pip install quart aiohttp
+    python3 async_app.py
+
+    # o con un servidor ASGI:
+    hypercorn async_app:app --bind 0.0.0.0:8888
+
+El servidor escucha en http://0.0.0.0:8888
+"""
+
+import asyncio
+import os
+
+import aiohttp
+import requests
+from quart import Quart, Response, jsonify, redirect, render_template, request, session, url_for
+
+try:
+    from . import app as sync_app
+except ImportError:  # Ejecutado como script desde spotify_live/
+    import app as sync_app
+
+app = Quart(__name__)
+app.secret_key = sync_app.flask_secret
+
+UPSTREAM_TIMEOUT = float(os.environ.get('SPOTIFY_UPSTREAM_TIMEOUT', 5))
+UPSTREAM_CONCURRENCY = int(os.environ.get('SPOTIFY_UPSTREAM_CONCURRENCY', 64))
+
+# Se crean al arrancar el servidor, dentro de su event loop
+http_client = None
+upstream_semaphore = None
+
+
+class SpotifyAPIError(Exception):
+    """Error devuelto por la API de Spotify (status HTTP >= 400)."""
+
+
+@app.before_serving
+async def startup():
+    """Crea el cliente HTTP compartido y el semáforo de concurrencia."""
+    global http_client, upstream_semaphore
+    http_client = aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=UPSTREAM_TIMEOUT),
+        connector=aiohttp.TCPConnector(limit=UPSTREAM_CONCURRENCY),
+    )
+    upstream_semaphore = asyncio.Semaphore(UPSTREAM_CONCURRENCY)
+
+
+@app.after_serving
+async def shutdown():
+    """Cierra las conexiones del pool al detener el servidor."""
+    if http_client is not None:
+        await http_client.close()
+
+
+async def spotify_get(token, path, params=None):
+    """Hace un GET autenticado a la Web API de Spotify.
+
+    Args:
+        token: Token de acceso OAuth del usuario
+        path: Ruta relativa a SPOTIFY_API_URL (ej. 'search')
+        params: Parámetros de query opcionales
+
+    Returns:
+        dict or None: JSON de la respuesta, o None si Spotify responde 204
+
+    Raises:
+        SpotifyAPIError: Si Spotify responde con un error HTTP
+        asyncio.TimeoutError: Si la llamada excede UPSTREAM_TIMEOUT
+    """
+    url = sync_app.SPOTIFY_API_URL + path
+    headers = {'Authorization': f'Bearer {token}'}
+    async with upstream_semaphore:
+        async with http_client.get(url, params=params, headers=headers) as response:
+            if response.status == 204:
+                return None
+            if response.status >= 400:
+                body = await response.text()
+                raise SpotifyAPIError(f'http status: {response.status}, {body[:200]}')
+            return await response.json()
+
+
+async def get_token():
+    """Versión asíncrona de app.get_token().
+
+    Usa el mismo almacén de tokens del servidor (app.token_manager). El
+    caso normal no bloquea; solo si el token ya expiró, la renovación
+    (spotipy, bloqueante) se ejecuta en un thread.
+    """
+    token_manager = sync_app.token_manager
+    if 'token_info' in session:
+        session['sid'] = token_manager.new_session(session.pop('token_info'))
+    sid = session.get('sid')
+    if sid is None:
+        return None
+    token = token_manager.cached_access_token(sid)
+    if token is None:
+        token = await asyncio.to_thread(token_manager.get_access_token, sid)
+    if token is None:
+        session.pop('sid', None)
+    return token
+
+
+def upstream_error(exc):
+    """Convierte un error de la llamada a Spotify en una respuesta JSON."""
+    if isinstance(exc, asyncio.TimeoutError):
+        return jsonify({'error': 'spotify_timeout', 'message': str(exc)}), 504
+    if isinstance(exc, (SpotifyAPIError, aiohttp.ClientError)):
+        return jsonify({'error': 'spotify_api_error', 'message': str(exc)}), 503
+    return jsonify({'error': 'internal_error', 'message': str(exc)}), 500
+
+
+@app.route('/')
+async def index():
+    """Página principal (misma plantilla que app.py)."""
+    token = await get_token()
+    return await render_template('index.html', logged_in=token is not None)
+
+
+@app.route('/login')
+async def login():
+    """Inicia el flujo de autenticación OAuth con Spotify."""
+    return redirect(sync_app.sp_oauth.get_authorize_url())
+
+
+@app.route('/callback')
+async def callback():
+    """Intercambia el código de autorización por tokens y los guarda en el servidor."""
+    code = request.args.get('code')
+    token_info = await asyncio.to_thread(sync_app.sp_oauth.get_access_token, code,
+                                         check_cache=False)
+    if session.get('sid'):
+        sync_app.token_manager.drop(session['sid'])
+    session['sid'] = sync_app.token_manager.new_session(token_info)
+    return redirect(url_for('index'))
+
+
+@app.route('/current')
+async def current():
+    """API endpoint que retorna información de la canción actual.
+
+    Status Codes:
+        200: Canción encontrada (o {'error': 'no_track'})
+        401: No autenticado
+        503: Error de la API de Spotify
+        504: Spotify no respondió dentro de UPSTREAM_TIMEOUT
+    """
+    token = await get_token()
+    if not token:
+        return jsonify({'error': 'not_authenticated'}), 401
+
+    try:
+        track = await spotify_get(token, 'me/player/currently-playing')
+    except Exception as e:
+        return upstream_error(e)
+
+    if track and track.get('item'):
+        current_track = sync_app.format_current_item(track['item'])
+        sync_app.index_tracks([current_track])
+        current_track['palette'] = sync_app.current_palette(current_track)
+        return jsonify(current_track)
+    return jsonify({'error': 'no_track'})
+
+
+@app.route('/search')
+async def search():
+    """API endpoint para búsqueda de canciones (misma lógica de caché que app.py).
+
+    Query Parameters:
+        q: Término de búsqueda
+    """
+    token = await get_token()
+    if not token:
+        return jsonify({'error': 'not_authenticated'}), 401
+
+    query = request.args.get('q', '')
+    if not query:
+        return jsonify({'results': []})
+
+    try:
+        tracks, cached = await search_tracks(token, query)
+    except Exception as e:
+        return upstream_error(e)
+    return jsonify({'results': tracks, 'cached': cached})
+
+
+async def search_tracks(token, query):
+    """Versión asíncrona de app.search_tracks() (mismo caché e índice)."""
+    query_lower = query.lower()
+    cached = sync_app.cache_lookup(query_lower)
+    if cached is not None:
+        return cached, True
+
+    results = await spotify_get(token, 'search', {'q': query, 'type': 'track', 'limit': 5})
+    tracks = [sync_app.format_search_item(item) for item in results['tracks']['items']]
+    sync_app.cache_store(query_lower, tracks)
+    sync_app.index_tracks(tracks)
+    return tracks, False
+
+
+@app.route('/suggest')
+async def suggest():
+    """Versión asíncrona de app.suggest(): índice local y Spotify como respaldo.
+
+    Query Parameters:
+        q: Texto parcial escrito por el usuario
+        remote: '0' para no consultar nunca a Spotify
+    """
+    token = await get_token()
+    if not token:
+        return jsonify({'error': 'not_authenticated'}), 401
+
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'results': [], 'source': 'local'})
+
+    local = sync_app.track_index.search(query, sync_app.SUGGEST_LIMIT)
+    if len(local) >= sync_app.SUGGEST_MIN_LOCAL or request.args.get('remote') == '0':
+        return jsonify({'results': local, 'source': 'local'})
+
+    try:
+        remote, _ = await search_tracks(token, query)
+    except Exception:
+        return jsonify({'results': local, 'source': 'local'})
+    return jsonify({'results': sync_app.merge_suggestions(local, remote), 'source': 'spotify'})
+
+
+@app.route('/tracks/batch', methods=['GET', 'POST'])
+async def tracks_batch():
+    """Versión asíncrona de app.tracks_batch(): los trozos se piden con gather.
+
+    Query Parameters / Body JSON:
+        ids: IDs, URIs o URLs de tracks (separados por comas o lista JSON)
+    """
+    token = await get_token()
+    if not token:
+        return jsonify({'error': 'not_authenticated'}), 401
+
+    if request.method == 'POST':
+        body = await request.get_json(silent=True) or {}
+        raw = body.get('ids', [])
+        raw_ids = raw if isinstance(raw, list) else str(raw).split(',')
+    else:
+        raw_ids = request.args.get('ids', '').split(',')
+    try:
+        ids = sync_app.parse_track_ids(raw_ids)
+    except ValueError as e:
+        return jsonify({'error': 'invalid_ids', 'message': str(e)}), 400
+
+    tracks, features, track_chunks, feature_chunks = sync_app.batch_plan(ids)
+    cached = sum(1 for i in ids if i in tracks and i in features)
+
+    track_calls = [spotify_get(token, 'tracks', {'ids': ','.join(c)}) for c in track_chunks]
+    feature_calls = [spotify_get(token, 'audio-features', {'ids': ','.join(c)})
+                     for c in feature_chunks]
+    results = await asyncio.gather(*track_calls, *feature_calls, return_exceptions=True)
+    track_results = results[:len(track_calls)]
+    feature_results = results[len(track_calls):]
+
+    for result in track_results:
+        if isinstance(result, Exception):
+            return upstream_error(result)
+    track_items = [t for r in track_results for t in r['tracks']]
+
+    feature_items = []
+    features_error = None
+    for result in feature_results:
+        if isinstance(result, Exception):
+            features_error = str(result) or type(result).__name__
+        elif result:
+            feature_items.extend(result.get('audio_features') or [])
+
+    sync_app.store_batch_results(tracks, features, track_items, feature_items)
+    return jsonify(sync_app.batch_response(ids, tracks, features, cached, features_error))
+
+
+@app.route('/art/<image_id>')
+async def art(image_id):
+    """Versión asíncrona de app.art(): el trabajo con Pillow y disco va en un thread.
+
+    Query Parameters:
+        size: Lado máximo en píxeles (se redondea a 64, 160, 300 o 640)
+        format: 'webp' o 'jpeg' para forzar un formato
+    """
+    size = request.args.get('size', 300, type=int)
+    fmt = sync_app.art_format(request.headers.get('Accept'), request.args.get('format'))
+    if fmt not in sync_app.ART_FORMATS:
+        return jsonify({'error': 'invalid_format'}), 400
+    try:
+        data, mimetype, etag = await asyncio.to_thread(
+            sync_app.get_art_cache().variant, image_id, size, fmt
+        )
+    except ValueError:
+        return jsonify({'error': 'invalid_image_id'}), 404
+    except requests.RequestException as e:
+        return jsonify({'error': 'art_fetch_error', 'message': str(e)}), 502
+    except OSError as e:
+        # El CDN respondió algo que no es una imagen (PIL.UnidentifiedImageError)
+        return jsonify({'error': 'art_decode_error', 'message': str(e)}), 502
+
+    response = Response(data, mimetype=mimetype)
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    response.vary.add('Accept')
+    return await response.make_conditional(request)
+
+
+@app.route('/art/<image_id>/palette')
+async def art_palette(image_id):
+    """Versión asíncrona de app.art_palette()."""
+    try:
+        palette = await asyncio.to_thread(sync_app.get_art_cache().palette, image_id)
+    except ValueError:
+        return jsonify({'error': 'invalid_image_id'}), 404
+    except requests.RequestException as e:
+        return jsonify({'error': 'art_fetch_error', 'message': str(e)}), 502
+    except OSError as e:
+        # El CDN respondió algo que no es una imagen (PIL.UnidentifiedImageError)
+        return jsonify({'error': 'art_decode_error', 'message': str(e)}), 502
+    return jsonify({'palette': palette, 'dominant': palette[0] if palette else None})
+
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=8888)
@@ -0,0 +1,291 @@
+"""Prueba de carga: app.py (Flask síncrono) vs async_app.py (Quart + aiohttp).
+
+Levanta un servidor mock de la Web API de Spotify con latencia fija y
+las dos variantes de Spotify Live apuntando a él (SPOTIFY_API_URL), cada
+una en su propio proceso. Luego genera carga concurrente contra ambas y
+reporta peticiones por segundo y percentiles de latencia, de modo que se
+pueden comparar a igual latencia de Spotify.
+
+El mock también implementa el endpoint de tokens de Spotify Accounts, así
+que la sesión se obtiene con el flujo normal de /callback sin necesidad
+de credenciales reales ni conexión a internet.
+
+Uso:
+    python3 loadtest.py
+    python3 loadtest.py --requests 3000 --concurrency 16,64,256 --latency 0.05
+    python3 loadtest.py --path "/search?q=rainbow"
+    python3 loadtest.py --path "/tracks/batch?ids=<id1>,<id2>,..."
+
+Subcomando interno (lo usa el propio script para lanzar los servidores):
+    python3 loadtest.py serve {mock,sync,async} --port PORT
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+LOADTEST_SECRET = 'rainvow-loadtest-secret'
+
+MOCK_TRACK = {
+    'name': 'Mock Song',
+    'artists': [{'name': 'Mock Artist'}],
+    'album': {'name': 'Mock Album', 'images': [{'url': 'http://example.invalid/cover.jpg'}]},
+    'preview_url': None,
+}
+
+
+class MockSpotifyServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer con backlog amplio para alta concurrencia."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class MockSpotifyHandler(BaseHTTPRequestHandler):
+    """Responde como la Web API de Spotify tras esperar `latency` segundos."""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive para clientes con pool
+    disable_nagle_algorithm = True  # evita el retraso de ~40 ms de Nagle + delayed ACK
+    latency = 0.05
+
+    def do_GET(self):  # noqa: N802 (nombre requerido por BaseHTTPRequestHandler)
+        time.sleep(self.latency)
+        path, _, query = self.path.partition('?')
+        path = path.rstrip('/')
+        ids = parse_qs(query).get('ids', [''])[0].split(',')
+        if path.endswith('/me/player/currently-playing'):
+            payload = {'is_playing': True, 'item': MOCK_TRACK}
+        elif path.endswith('/search'):
+            payload = {'tracks': {'items': [MOCK_TRACK] * 5}}
+        elif path.endswith('/tracks'):
+            payload = {'tracks': [dict(MOCK_TRACK, id=i) for i in ids]}
+        elif path.endswith('/audio-features'):
+            payload = {'audio_features': [{'id': i, 'energy': 0.5, 'tempo': 120.0} for i in ids]}
+        else:
+            payload = {'error': {'status': 404, 'message': 'not found'}}
+        body = json.dumps(payload).encode()
+        self.send_response(404 if 'error' in payload else 200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):  # noqa: N802
+        """Endpoint de tokens: acepta cualquier código o refresh_token."""
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        body = json.dumps({
+            'access_token': 'loadtest-token',
+            'token_type': 'Bearer',
+            'expires_in': 3600,
+            'refresh_token': 'loadtest-refresh',
+            'scope': 'user-read-currently-playing',
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_mock(port, latency):
+    """Sirve el mock de Spotify con un thread por conexión."""
+    MockSpotifyHandler.latency = latency
+    server = MockSpotifyServer(('127.0.0.1', port), MockSpotifyHandler)
+    server.serve_forever()
+
+
+def serve_sync(port):
+    """Sirve app.py con el servidor threaded de werkzeug."""
+    from werkzeug.serving import run_simple
+    import app as sync_module
+    sync_module.sp_oauth.OAUTH_TOKEN_URL = os.environ['LOADTEST_TOKEN_URL']
+    run_simple('127.0.0.1', port, sync_module.app, threaded=True)
+
+
+def serve_async(port):
+    """Sirve async_app.py con hypercorn."""
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+    import async_app
+    async_app.sync_app.sp_oauth.OAUTH_TOKEN_URL = os.environ['LOADTEST_TOKEN_URL']
+
+    config = Config()
+    config.bind = [f'127.0.0.1:{port}']
+    config.accesslog = None
+    asyncio.run(serve(async_app.app, config))
+
+
+def free_port():
+    """Obtiene un puerto TCP libre en localhost."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=15.0):
+    """Espera hasta que haya un servidor escuchando en el puerto."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'El servidor en el puerto {port} no arrancó')
+
+
+def session_cookie(port):
+    """Completa /callback contra el servidor y devuelve su cookie de sesión."""
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.request('GET', '/callback?code=loadtest')
+    response = conn.getresponse()
+    response.read()
+    cookie = SimpleCookie(response.getheader('Set-Cookie', ''))
+    conn.close()
+    if 'session' not in cookie:
+        raise RuntimeError(f'El servidor en el puerto {port} no devolvió cookie de sesión')
+    return cookie['session'].value
+
+
+def percentile(sorted_values, pct):
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+async def run_load(url, cookie, total, concurrency):
+    """Envía `total` GETs con `concurrency` clientes simultáneos.
+
+    Returns:
+        dict: rps, percentiles de latencia (ms) y número de errores
+    """
+    import aiohttp
+
+    latencies = []
+    errors = 0
+    remaining = total
+    headers = {'Cookie': f'session={cookie}'}
+
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency),
+                                     timeout=aiohttp.ClientTimeout(total=30)) as client:
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                try:
+                    async with client.get(url, headers=headers) as response:
+                        await response.read()
+                        if response.status != 200:
+                            errors += 1
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'rps': total / elapsed,
+        'p50': percentile(latencies, 50) * 1000,
+        'p95': percentile(latencies, 95) * 1000,
+        'p99': percentile(latencies, 99) * 1000,
+        'errors': errors,
+    }
+
+
+def spawn(kind, port, extra_env, latency=None):
+    """Lanza este mismo script en modo `serve` en un proceso aparte."""
+    cmd = [sys.executable, os.path.abspath(__file__), 'serve', kind, '--port', str(port)]
+    if latency is not None:
+        cmd += ['--latency', str(latency)]
+    env = dict(os.environ, **extra_env)
+    return subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga de Spotify Live (sync vs async)')
+    sub = parser.add_subparsers(dest='command')
+
+    serve_parser = sub.add_parser('serve', help='Uso interno: lanzar un servidor')
+    serve_parser.add_argument('kind', choices=['mock', 'sync', 'async'])
+    serve_parser.add_argument('--port', type=int, required=True)
+    serve_parser.add_argument('--latency', type=float, default=0.05)
+
+    parser.add_argument('--requests', type=int, default=2000,
+                        help='Peticiones por escenario (default: 2000)')
+    parser.add_argument('--concurrency', default='16,64,256',
+                        help='Niveles de concurrencia separados por comas (default: 16,64,256)')
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help='Latencia simulada de Spotify en segundos (default: 0.05)')
+    parser.add_argument('--path', default='/current',
+                        help='Ruta a medir (default: /current, no usa caché)')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        if args.kind == 'mock':
+            serve_mock(args.port, args.latency)
+        elif args.kind == 'sync':
+            serve_sync(args.port)
+        else:
+            serve_async(args.port)
+        return
+
+    mock_port, sync_port, async_port = free_port(), free_port(), free_port()
+    app_env = {
+        'SPOTIFY_API_URL': f'http://127.0.0.1:{mock_port}/v1/',
+        'LOADTEST_TOKEN_URL': f'http://127.0.0.1:{mock_port}/api/token',
+        'FLASK_SECRET': LOADTEST_SECRET,
+        'SPOTIPY_CLIENT_ID': os.environ.get('SPOTIPY_CLIENT_ID', 'loadtest'),
+        'SPOTIPY_CLIENT_SECRET': os.environ.get('SPOTIPY_CLIENT_SECRET', 'loadtest'),
+        'SPOTIFY_UPSTREAM_CONCURRENCY': os.environ.get('SPOTIFY_UPSTREAM_CONCURRENCY', '256'),
+    }
+    procs = [
+        spawn('mock', mock_port, {}, latency=args.latency),
+        spawn('sync', sync_port, app_env),
+        spawn('async', async_port, app_env),
+    ]
+    try:
+        for port in (mock_port, sync_port, async_port):
+            wait_for_port(port)
+        cookies = {port: session_cookie(port) for port in (sync_port, async_port)}
+        levels = [int(c) for c in args.concurrency.split(',') if c.strip()]
+
+        print(f"Mock Spotify con latencia {args.latency * 1000:.0f} ms, "
+              f"{args.requests} peticiones a {args.path} por escenario\n")
+        print(f"{'servidor':<8} {'conc':>5} {'req/s':>9} {'p50 ms':>8} "
+              f"{'p95 ms':>8} {'p99 ms':>8} {'errores':>8}")
+        for concurrency in levels:
+            for name, port in (('sync', sync_port), ('async', async_port)):
+                url = f'http://127.0.0.1:{port}{args.path}'
+                # Calentamiento: abre conexiones y llena cachés de import
+                cookie = cookies[port]
+                asyncio.run(run_load(url, cookie, min(concurrency, 50), concurrency))
+                r = asyncio.run(run_load(url, cookie, args.requests, concurrency))
+                print(f"{name:<8} {concurrency:>5} {r['rps']:>9.1f} {r['p50']:>8.1f} "
+                      f"{r['p95']:>8.1f} {r['p99']:>8.1f} {r['errors']:>8}")
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""Índice local en memoria para búsquedas por prefijo (typeahead).
+
+Indexa cada track que la aplicación ya recibió de Spotify (/search,
+/current, /tracks/batch) por las palabras de su nombre y artistas. Las
+consultas por prefijo se resuelven con búsqueda binaria sobre una lista
+ordenada de palabras, sin llamadas de red.
+
+Ejemplo:
+    >>> index = TrackIndex()
+    >>> index.add({'id': '1', 'name': 'Bohemian Rhapsody',
+    ...            'artists': 'Queen', 'image': None, 'preview': None})
+    >>> [t['name'] for t in index.search('bohem rha')]
+    ['Bohemian Rhapsody']
+"""
+
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+INDEX_MAX_TRACKS = 20000
+# Con una sola palabra muy corta ('a') casi todo el índice coincide; se
+# corta la recolección de candidatos para mantener la respuesta en µs.
+MAX_SINGLE_TERM_CANDIDATES = 500
+WORD_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    """Pasa a minúsculas y quita acentos para comparar ('Canción' -> 'cancion')."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    """Divide un texto normalizado en palabras."""
+    return WORD_RE.findall(normalize(text))
+
+
+class TrackIndex:
+    """Índice invertido palabra -> tracks con búsqueda por prefijo.
+
+    Args:
+        max_tracks: Máximo de tracks indexados; al superarlo se descartan
+            los que hace más tiempo no se ven
+    """
+
+    def __init__(self, max_tracks=INDEX_MAX_TRACKS):
+        self.max_tracks = max_tracks
+        # {key: {'track': {...}, 'words': (...), 'name_words': (...), 'hits': int}}
+        self._tracks = OrderedDict()
+        self._postings = {}  # {palabra: set(keys)}
+        self._words = []  # Palabras ordenadas para bisect
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._tracks)
+
+    @staticmethod
+    def _key(track):
+        if track.get('id'):
+            return track['id']
+        return f"{normalize(track.get('name'))}|{normalize(track.get('artists'))}"
+
+    def add(self, track):
+        """Agrega o actualiza un track ya formateado (name, artists, image, preview)."""
+        key = self._key(track)
+        name_words = tuple(tokenize(track.get('name')))
+        words = set(name_words) | set(tokenize(track.get('artists')))
+        with self._lock:
+            entry = self._tracks.pop(key, None)
+            hits = entry['hits'] + 1 if entry else 1
+            if entry:
+                self._unlink(key, entry['words'] - words)
+            for word in words:
+                keys = self._postings.get(word)
+                if keys is None:
+                    keys = self._postings[word] = set()
+                    bisect.insort(self._words, word)
+                keys.add(key)
+            self._tracks[key] = {'track': dict(track), 'words': words,
+                                 'name_words': name_words, 'hits': hits}
+            while len(self._tracks) > self.max_tracks:
+                old_key, old = self._tracks.popitem(last=False)
+                self._unlink(old_key, old['words'])
+
+    def add_many(self, tracks):
+        """Agrega varios tracks."""
+        for track in tracks:
+            self.add(track)
+
+    def _unlink(self, key, words):
+        """Quita `key` de las listas de palabras (requiere el lock)."""
+        for word in words:
+            keys = self._postings.get(word)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._postings[word]
+                del self._words[bisect.bisect_left(self._words, word)]
+
+    def _prefix_keys(self, prefix, cap=None):
+        """Tracks con alguna palabra que empieza por `prefix` (requiere el lock)."""
+        keys = set()
+        i = bisect.bisect_left(self._words, prefix)
+        while i < len(self._words) and self._words[i].startswith(prefix):
+            keys |= self._postings[self._words[i]]
+            if cap is not None and len(keys) >= cap:
+                break
+            i += 1
+        return keys
+
+    def search(self, query, limit=5):
+        """Busca tracks cuyas palabras empiecen por cada palabra del query.
+
+        Todas las palabras del query deben coincidir (como prefijo) con alguna
+        palabra del nombre o de los artistas. Se ordena primero por
+        coincidencias al inicio del nombre y luego por veces visto.
+
+        Args:
+            query: Texto escrito por el usuario (p. ej. 'bohem rha')
+            limit: Máximo de resultados
+
+        Returns:
+            list: Tracks formateados, mejores primero
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self._lock:
+            # Empezar por el término más largo reduce el conjunto inicial
+            terms_by_len = sorted(terms, key=len, reverse=True)
+            cap = MAX_SINGLE_TERM_CANDIDATES if len(terms) == 1 else None
+            keys = self._prefix_keys(terms_by_len[0], cap)
+            for term in terms_by_len[1:]:
+                if not keys:
+                    break
+                keys &= self._prefix_keys(term)
+
+            def rank(key):
+                entry = self._tracks[key]
+                name_words = entry['name_words']
+                starts_name = bool(name_words) and name_words[0].startswith(terms[0])
+                return (not starts_name, -entry['hits'], entry['track'].get('name', ''))
+
+            best = heapq.nsmallest(limit, keys, key=rank)
+            return [dict(self._tracks[k]['track']) for k in best]
@@ -0,0 +1,188 @@
+"""Almacén de tokens OAuth en el servidor con renovación anticipada.
+
+En lugar de viajar en la cookie firmada, el token_info de cada usuario se
+guarda en memoria del servidor indexado por un ID de sesión aleatorio; la
+cookie solo lleva ese ID.
+
+Características:
+    - Renovación en background antes de que el token expire, para que las
+      peticiones del usuario no esperen a Spotify
+    - Renovaciones serializadas por sesión: dos peticiones paralelas nunca
+      renuevan el mismo token dos veces
+    - Limpieza de sesiones inactivas
+
+Note:
+    El almacén vive en memoria de un solo proceso. Con varios workers cada
+    uno tiene su propio almacén y el usuario debería volver a iniciar sesión
+    si cae en otro worker.
+"""
+
+import secrets
+import threading
+import time
+
+REFRESH_MARGIN_SECONDS = 300  # Renovar cuando falten menos de 5 minutos
+REFRESH_POLL_SECONDS = 30  # Cada cuánto revisa el thread de renovación
+ACTIVE_SESSION_SECONDS = 3600  # Solo se renuevan en background sesiones usadas en la última hora
+MAX_IDLE_SECONDS = 7 * 24 * 3600  # Sesiones sin uso durante una semana se descartan
+
+
+class TokenManager:
+    """Gestiona tokens OAuth de Spotify por ID de sesión.
+
+    Args:
+        oauth: Instancia de SpotifyOAuth usada para renovar tokens
+        refresh_margin: Segundos antes de expirar en que se renueva el token
+        poll_interval: Segundos entre revisiones del thread de renovación
+
+    Example:
+        >>> manager = TokenManager(sp_oauth)
+        >>> sid = manager.new_session(token_info)
+        >>> manager.get_access_token(sid)
+        'BQD...'
+    """
+
+    def __init__(self, oauth, refresh_margin=REFRESH_MARGIN_SECONDS,
+                 poll_interval=REFRESH_POLL_SECONDS):
+        self.oauth = oauth
+        self.refresh_margin = refresh_margin
+        self.poll_interval = poll_interval
+        # Estructura: {sid: {'token_info': {...}, 'last_used': time.time()}}
+        self._sessions = {}
+        self._refresh_locks = {}
+        self._pending = set()  # Sesiones con renovación en background ya programada
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def new_session(self, token_info):
+        """Guarda un token recién obtenido y devuelve el ID de sesión nuevo."""
+        sid = secrets.token_urlsafe(32)
+        with self._lock:
+            self._sessions[sid] = {'token_info': token_info, 'last_used': time.time()}
+            self._refresh_locks[sid] = threading.Lock()
+        self.start()
+        return sid
+
+    def drop(self, sid):
+        """Elimina una sesión del almacén (logout o token revocado)."""
+        with self._lock:
+            self._sessions.pop(sid, None)
+            self._refresh_locks.pop(sid, None)
+
+    def _expires_in(self, token_info):
+        return token_info.get('expires_at', 0) - time.time()
+
+    def cached_access_token(self, sid):
+        """Devuelve el token sin bloquear, o None si hace falta renovarlo ya.
+
+        Si el token es válido pero está dentro del margen de renovación,
+        programa una renovación en background y devuelve el token actual.
+        """
+        with self._lock:
+            entry = self._sessions.get(sid)
+            if entry is None:
+                return None
+            entry['last_used'] = time.time()
+            token_info = entry['token_info']
+            if self.oauth.is_token_expired(token_info):
+                return None
+            schedule = (self._expires_in(token_info) < self.refresh_margin
+                        and sid not in self._pending)
+            if schedule:
+                self._pending.add(sid)
+        if schedule:
+            threading.Thread(target=self._background_refresh, args=(sid,), daemon=True).start()
+        return token_info['access_token']
+
+    def _background_refresh(self, sid):
+        try:
+            self.refresh(sid)
+        finally:
+            with self._lock:
+                self._pending.discard(sid)
+
+    def get_access_token(self, sid):
+        """Devuelve un token válido, renovándolo en el momento si ya expiró.
+
+        Returns:
+            str or None: Token de acceso, o None si la sesión no existe o la
+            renovación falló (en cuyo caso la sesión se descarta)
+        """
+        if sid is None:
+            return None
+        token = self.cached_access_token(sid)
+        if token is not None:
+            return token
+        if self.refresh(sid, force=True):
+            with self._lock:
+                entry = self._sessions.get(sid)
+                return entry['token_info']['access_token'] if entry else None
+        self.drop(sid)
+        return None
+
+    def refresh(self, sid, force=False):
+        """Renueva el token de una sesión, como máximo una vez a la vez.
+
+        Si otra renovación de la misma sesión está en curso, espera a que
+        termine y reutiliza su resultado en lugar de pedir otro token.
+
+        Args:
+            sid: ID de sesión
+            force: Si False, no bloquea cuando otra renovación está en curso
+
+        Returns:
+            bool: True si la sesión tiene un token vigente al terminar
+        """
+        with self._lock:
+            refresh_lock = self._refresh_locks.get(sid)
+        if refresh_lock is None:
+            return False
+        if not refresh_lock.acquire(blocking=force):
+            return True  # Otra renovación en curso; el token actual sigue siendo válido
+        try:
+            with self._lock:
+                entry = self._sessions.get(sid)
+            if entry is None:
+                return False
+            token_info = entry['token_info']
+            # Otro thread pudo haberlo renovado mientras esperábamos el lock
+            if self._expires_in(token_info) >= self.refresh_margin:
+                return True
+            try:
+                new_info = self.oauth.refresh_access_token(token_info['refresh_token'])
+            except Exception:
+                return not self.oauth.is_token_expired(token_info)
+            with self._lock:
+                if sid in self._sessions:
+                    self._sessions[sid]['token_info'] = new_info
+            return True
+        finally:
+            refresh_lock.release()
+
+    def start(self):
+        """Inicia el thread de renovación en background (idempotente)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._refresh_loop, daemon=True,
+                                            name='spotify-token-refresh')
+        self._thread.start()
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.poll_interval)
+            self.refresh_due()
+
+    def refresh_due(self):
+        """Renueva las sesiones activas cuyo token entra en el margen y purga las inactivas."""
+        now = time.time()
+        with self._lock:
+            idle = [sid for sid, e in self._sessions.items()
+                    if now - e['last_used'] > MAX_IDLE_SECONDS]
+            due = [sid for sid, e in self._sessions.items()
+                   if now - e['last_used'] <= ACTIVE_SESSION_SECONDS
+                   and self._expires_in(e['token_info']) < self.refresh_margin]
+        for sid in idle:
+            self.drop(sid)
+        for sid in due:
+            self.refresh(sid)
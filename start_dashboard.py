@@ -9,21 +9,17 @@ componentes disponibles, y lanza el dashboard con configuración básica.
 import sys
 import subprocess
 
+from capabilities import StartupTimer, module_available
 
-def check_dependency(module_name, package_name=None):
-    """Verifica si un módulo está instalado."""
-    if package_name is None:
-        package_name = module_name
 
-    try:
-        __import__(module_name)
-        return True
-    except ImportError:
-        return False
+def check_dependency(module_name, package_name=None):
+    """Verifica si un módulo está instalado (sin importarlo)."""
+    return module_available(module_name)
 
 
 def main():  # noqa: C901
     """Función principal que verifica dependencias e inicia el dashboard."""
+    timer = StartupTimer()
     print("=" * 60)
     print("🌈 Inicio Rápido del Dashboard de Rainvow")
     print("=" * 60)
@@ -63,6 +59,7 @@ def main():  # noqa: C901
             print(f"  ○ {desc} (pip install {package})")
 
     print()
+    timer.mark('verificar dependencias')
 
     if missing:
         print("⚠️  Faltan dependencias principales:")
@@ -95,7 +92,11 @@ def main():  # noqa: C901
     # Importar y ejecutar dashboard
     try:
         import dashboard
+        timer.mark('importar dashboard')
         dashboard.start_background_threads()
+        timer.mark('threads de monitoreo')
+        print(timer.report())
+        print()
         port = 5000
         dashboard.socketio.run(
             dashboard.app,
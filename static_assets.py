@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""Librerías JavaScript servidas por el dashboard en lugar de los CDN.
+
+El dashboard y los demos (ar.html, pdf_overlay.html, aurawave/) cargan
+socket.io, A-Frame, AR.js, hydra-synth, pdf.js y p5 desde CDNs de
+terceros; en los kioscos sin conexión o con enlaces lentos la página no
+pinta hasta que esas descargas terminan (o fallan). Este módulo:
+
+    - Descarga una vez cada librería a static/vendor/ (comando fetch)
+    - Genera en static/dist/ una copia con el hash del contenido en el
+      nombre (socket.io.min.3f2a9c1b2d.js) más sus variantes .gz y .br
+      precomprimidas, y un manifest.json {librería: archivo con hash}
+    - Resuelve la URL de cada librería: la copia local si está generada,
+      si no la del CDN (así nada se rompe antes de ejecutar fetch)
+
+Las librerías no vienen en el repositorio: hasta ejecutar fetch en una
+máquina con acceso a los CDN (y copiar static/ al kiosco) se siguen
+cargando de internet, y el dashboard lo avisa al arrancar.
+
+Como el nombre cambia con el contenido, dashboard.py sirve los archivos
+con caché de un año (immutable) y elige la variante comprimida según el
+Accept-Encoding del navegador, sin comprimir en cada petición.
+
+Requisitos:
+    pip install brotli  # Opcional: variantes .br (si no, solo .gz)
+
+Uso:
+    python3 static_assets.py fetch   # Descargar librerías y generar dist/
+    python3 static_assets.py build   # Regenerar dist/ desde static/vendor/
+    python3 static_assets.py list    # Estado de cada librería
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import urllib.request
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+VENDOR_DIR = os.path.join(STATIC_DIR, 'vendor')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_NAME = 'manifest.json'
+FETCH_TIMEOUT = 30
+HASH_LENGTH = 10
+MIN_COMPRESS_SIZE = 1024  # Archivos más chicos no ganan nada comprimidos
+
+# {archivo en static/vendor/: URL del CDN que reemplaza}. Todas con versión fija:
+# el hash del contenido y el build deben ser reproducibles
+VENDOR_ASSETS = {
+    'socket.io.min.js': 'https://cdn.socket.io/4.5.4/socket.io.min.js',
+    'aframe.min.js': 'https://aframe.io/releases/1.4.0/aframe.min.js',
+    'aframe-ar.js': 'https://cdn.jsdelivr.net/gh/AR-js-org/AR.js@3.3.2/aframe/build/aframe-ar.js',
+    'hydra-synth.js': 'https://unpkg.com/hydra-synth@1.3.29/dist/hydra-synth.js',
+    'pdf.min.js': 'https://cdnjs.cloudflare.com/ajax/libs/pdf.js/3.11.174/pdf.min.js',
+    'pdf.worker.min.js': 'https://cdnjs.cloudflare.com/ajax/libs/pdf.js/3.11.174/pdf.worker.min.js',
+    'p5.min.js': 'https://cdnjs.cloudflare.com/ajax/libs/p5.js/1.6.0/p5.min.js',
+}
+
+# Codificaciones precomprimidas, en orden de preferencia
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def hashed_name(name, data):
+    """Nombre con el hash del contenido antes de la extensión."""
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    root, ext = os.path.splitext(name)
+    return f"{root}.{digest}{ext}"
+
+
+def compress_variants(data):
+    """Variantes precomprimidas de un archivo.
+
+    Returns:
+        dict: {extensión: bytes} solo con las que resultan más chicas
+    """
+    if len(data) < MIN_COMPRESS_SIZE:
+        return {}
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if BROTLI_AVAILABLE:
+        variants['.br'] = brotli.compress(data, quality=11)
+    return {ext: blob for ext, blob in variants.items() if len(blob) < len(data)}
+
+
+def build_assets(source=VENDOR_DIR, dest=DIST_DIR):
+    """Genera las copias con hash y sus variantes comprimidas.
+
+    Los archivos de `dest` que ya no figuran en el manifest (versiones
+    anteriores) se eliminan.
+
+    Returns:
+        dict: Manifest {nombre original: nombre con hash}
+    """
+    os.makedirs(dest, exist_ok=True)
+    manifest = {}
+    keep = {MANIFEST_NAME}
+    for name in sorted(os.listdir(source)) if os.path.isdir(source) else []:
+        path = os.path.join(source, name)
+        if not os.path.isfile(path) or name.startswith('.'):
+            continue
+        with open(path, 'rb') as f:
+            data = f.read()
+        target = hashed_name(name, data)
+        outputs = {target: data}
+        outputs.update({target + ext: blob for ext, blob in compress_variants(data).items()})
+        for out_name, blob in outputs.items():
+            out_path = os.path.join(dest, out_name)
+            if not os.path.exists(out_path):
+                with open(out_path, 'wb') as f:
+                    f.write(blob)
+            keep.add(out_name)
+        manifest[name] = target
+
+    for name in os.listdir(dest):
+        if name not in keep:
+            os.remove(os.path.join(dest, name))
+    with open(os.path.join(dest, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def fetch_assets(names=None, dest=VENDOR_DIR, force=False, timeout=FETCH_TIMEOUT):
+    """Descarga las librerías de VENDOR_ASSETS que falten en `dest`.
+
+    Returns:
+        list: Nombres descargados
+    """
+    os.makedirs(dest, exist_ok=True)
+    fetched = []
+    for name in names or VENDOR_ASSETS:
+        path = os.path.join(dest, name)
+        if os.path.exists(path) and not force:
+            continue
+        with urllib.request.urlopen(VENDOR_ASSETS[name], timeout=timeout) as response:
+            data = response.read()
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+        fetched.append(name)
+    return fetched
+
+
+def load_manifest(dest=DIST_DIR):
+    """Manifest generado por build_assets() ({} si no existe)."""
+    try:
+        with open(os.path.join(dest, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def accepted_encodings(header):
+    """Codificaciones aceptadas según un encabezado Accept-Encoding."""
+    accepted = set()
+    for part in (header or '').split(','):
+        token, *params = [p.strip() for p in part.split(';')]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if token and quality > 0:
+            accepted.add(token.lower())
+    return accepted
+
+
+class StaticAssets:
+    """Resuelve URLs y archivos de las librerías generadas.
+
+    Args:
+        dist: Directorio generado por build_assets()
+        url_prefix: Ruta bajo la que se sirven los archivos de `dist`
+    """
+
+    def __init__(self, dist=DIST_DIR, url_prefix='/assets/'):
+        self.dist = dist
+        self.url_prefix = url_prefix
+        self.manifest = load_manifest(dist)
+        self._files = set(self.manifest.values())
+        self._pages = {}  # {ruta: (mtime, html reescrito)}
+
+    def url(self, name):
+        """URL local de una librería, o la del CDN si no está generada."""
+        if name in self.manifest:
+            return self.url_prefix + self.manifest[name]
+        return VENDOR_ASSETS.get(name, self.url_prefix + name)
+
+    def missing(self):
+        """Librerías sin copia local generada (se siguen cargando del CDN)."""
+        return [name for name in VENDOR_ASSETS if name not in self.manifest]
+
+    def rewrite_html(self, html):
+        """Reemplaza las URLs de CDN de VENDOR_ASSETS por las locales."""
+        for name, cdn_url in VENDOR_ASSETS.items():
+            if name in self.manifest:
+                html = html.replace(cdn_url, self.url(name))
+        return html
+
+    def page(self, path):
+        """HTML de un demo con las URLs ya reescritas (cacheado por mtime)."""
+        mtime = os.path.getmtime(path)
+        cached = self._pages.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = (mtime, self.rewrite_html(f.read()))
+            self._pages[path] = cached
+        return cached[1]
+
+    def resolve(self, filename, accept_encoding=None):
+        """Archivo a servir para una petición.
+
+        Args:
+            filename: Nombre con hash (como en el manifest)
+            accept_encoding: Encabezado Accept-Encoding de la petición
+
+        Returns:
+            tuple: (ruta, codificación o None), o None si no existe
+        """
+        if filename not in self._files:
+            return None
+        path = os.path.join(self.dist, filename)
+        accepted = accepted_encodings(accept_encoding)
+        for encoding, ext in ENCODINGS:
+            if encoding in accepted and os.path.isfile(path + ext):
+                return path + ext, encoding
+        return (path, None) if os.path.isfile(path) else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Librerías JS locales del dashboard")
+    parser.add_argument('command', choices=('fetch', 'build', 'list'))
+    parser.add_argument('--force', action='store_true', help="Volver a descargar aunque existan")
+    args = parser.parse_args(argv)
+
+    if args.command == 'fetch':
+        try:
+            fetched = fetch_assets(force=args.force)
+        except OSError as e:
+            print(f"❌ Error al descargar: {e}", file=sys.stderr)
+            return 1
+        print(f"✓ Descargadas: {', '.join(fetched) or 'ninguna (ya estaban)'}")
+    if args.command in ('fetch', 'build'):
+        manifest = build_assets()
+        print(f"✓ {len(manifest)} archivos generados en {DIST_DIR}"
+              f"{'' if BROTLI_AVAILABLE else ' (sin .br: pip install brotli)'}")
+        return 0
+
+    manifest = load_manifest()
+    for name, url in VENDOR_ASSETS.items():
+        local = manifest.get(name)
+        print(f"{'✓' if local else '○'} {name:<20} {local or url}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Tests para el motor de animación de terminal (animation.py).
+"""
+import io
+import sys
+from pathlib import Path
+
+# Agregar el directorio raíz al path para importar módulos
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import animation  # noqa: E402
+from animation import TerminalScreen, center, run_animation, visible_len  # noqa: E402
+
+
+def test_screen_reescribe_solo_lineas_cambiadas():
+    out = io.StringIO()
+    screen = TerminalScreen(stream=out, alt_screen=False)
+    assert screen.draw(['a', 'b', 'c']) == 3
+    assert out.getvalue().startswith(animation.HOME + animation.CLEAR_SCREEN)
+
+    out.seek(0)
+    out.truncate()
+    assert screen.draw(['a', 'B', 'c']) == 1
+    assert out.getvalue() == f"{animation.move_to(2)}B{animation.RESET}{animation.CLEAR_LINE}"
+
+    out.seek(0)
+    out.truncate()
+    assert screen.draw(['a', 'B', 'c']) == 0
+    assert out.getvalue() == ''
+
+    # Cuadro más corto: se borra lo que queda debajo
+    screen.draw(['a'])
+    assert out.getvalue().endswith(animation.move_to(2) + animation.CLEAR_BELOW)
+
+
+def test_screen_context_restaura_terminal():
+    out = io.StringIO()
+    with TerminalScreen(stream=out) as screen:
+        screen.draw(['hola'])
+    text = out.getvalue()
+    assert text.startswith(animation.ALT_SCREEN_ON + animation.HIDE_CURSOR)
+    assert text.endswith(animation.SHOW_CURSOR + animation.ALT_SCREEN_OFF)
+
+    out = io.StringIO()
+    with TerminalScreen(stream=out, alt_screen=False) as screen:
+        screen.draw(['uno', 'dos'])
+    # Sin pantalla alternativa el cursor queda debajo del último cuadro
+    assert animation.move_to(3) + animation.RESET + animation.SHOW_CURSOR in out.getvalue()
+
+
+def test_run_animation_con_scheduler_fijo():
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    out = io.StringIO()
+    screen = TerminalScreen(stream=out)
+    scheduler = animation.FrameScheduler(10, clock=lambda: now[0], sleep=sleep)
+    seen = []
+    run_animation(screen, lambda i, t: seen.append(round(t, 2)) or [str(i)],
+                  frames=3, scheduler=scheduler)
+    assert seen == [0.0, 0.1, 0.2]
+    assert screen.stats()['frames'] == 3
+
+
+def test_center_ignora_codigos_ansi():
+    text = animation.BOLD + 'HOLI' + animation.RESET
+    assert visible_len(text) == 4
+    assert center(text, width=10) == '   ' + text
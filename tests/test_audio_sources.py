@@ -0,0 +1,110 @@
+"""
+Tests para las fuentes de audio sintéticas (audio_sources.py).
+"""
+import itertools
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Agregar el directorio raíz al path para importar módulos
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import audio_sources  # noqa: E402
+from audio_sources import check_source, noise, parse_source, sine, sine_sweep  # noqa: E402
+
+FS = 8000
+BLOCKSIZE = 800
+
+
+def take(blocks, n):
+    return [block.copy() for block in itertools.islice(blocks, n)]
+
+
+def dominant_freq(block, fs=FS):
+    spectrum = np.abs(np.fft.rfft(block[:, 0]))
+    return np.fft.rfftfreq(len(block), 1 / fs)[np.argmax(spectrum)]
+
+
+@pytest.mark.parametrize('spec', ['sweep', 'sine:440', 'noise:3'])
+def test_fuentes_son_deterministas(spec):
+    first = take(parse_source(spec, FS, BLOCKSIZE), 5)
+    second = take(parse_source(spec, FS, BLOCKSIZE), 5)
+    for a, b in zip(first, second):
+        assert a.shape == (BLOCKSIZE, 1)
+        assert a.dtype == np.float32
+        assert np.array_equal(a, b)
+
+
+def test_sweep_recorre_frecuencias_y_se_repite():
+    blocks = take(sine_sweep(FS, BLOCKSIZE, 100, 3000, period=1.0), 20)
+    freqs = [dominant_freq(block) for block in blocks]
+    assert freqs[0] < 200
+    assert freqs[9] > 2000
+    assert freqs[:10] == sorted(freqs[:10])
+    assert freqs[10] == freqs[0]
+
+
+def test_sweep_tiene_fase_continua():
+    signal = np.concatenate(take(sine_sweep(FS, 64, 100, 400, period=1.0), 50))[:, 0]
+    # Sin saltos de fase, dos muestras seguidas nunca difieren más que la
+    # pendiente máxima de una senoidal a la frecuencia más alta
+    assert np.max(np.abs(np.diff(signal))) <= 0.5 * 2 * np.pi * 400 / FS + 1e-4
+
+
+def test_sine_y_noise():
+    block = next(sine(FS, BLOCKSIZE, 1000))
+    assert dominant_freq(block) == pytest.approx(1000, abs=FS / BLOCKSIZE)
+    assert not np.array_equal(next(noise(FS, BLOCKSIZE, 1)), next(noise(FS, BLOCKSIZE, 2)))
+
+
+def test_file_reproduce_clip_en_bucle(tmp_path):
+    clip = np.arange(2 * BLOCKSIZE * 2, dtype=np.float32).reshape(-1, 2) / 10000
+    path = tmp_path / 'clip.npy'
+    np.save(path, clip)
+    blocks = take(parse_source(str(path), FS, BLOCKSIZE), 3)
+    assert np.allclose(blocks[0][:, 0], clip[:BLOCKSIZE].mean(axis=1))
+    assert np.array_equal(blocks[2], blocks[0])
+    assert np.array_equal(take(parse_source(f'file:{path}', FS, BLOCKSIZE), 1)[0], blocks[0])
+
+
+@pytest.mark.parametrize('spec', ['sweep:8000-55', 'sine:la', 'chirp', 'ruido.txt'])
+def test_parse_source_rechaza_especificaciones_invalidas(spec):
+    with pytest.raises(ValueError):
+        next(parse_source(spec, FS, BLOCKSIZE))
+
+
+@pytest.mark.parametrize('spec', ['sweep:8000-55', 'file:no_existe.npy'])
+def test_check_source_detecta_errores_de_la_fuente(spec):
+    with pytest.raises((ValueError, OSError)):
+        check_source(spec, FS, BLOCKSIZE)
+    check_source('sweep', FS, BLOCKSIZE)
+
+
+def test_dashboard_usa_ruido_si_la_fuente_falla(monkeypatch, capsys):
+    """Una fuente inválida no detiene el thread de audio del dashboard."""
+    import dashboard
+
+    monkeypatch.setattr(dashboard, 'AUDIO_SOURCE', 'file:no_existe.npy')
+    blocks = take(dashboard.audio_blocks(), 2)
+    assert [b.shape for b in blocks] == [(dashboard.BLOCKSIZE, 1)] * 2
+    assert 'no_existe.npy' in capsys.readouterr().out
+
+
+def test_paced_entrega_al_ritmo_del_bloque(monkeypatch):
+    now = [0.0]
+    sleeps = []
+
+    class FakeScheduler(audio_sources.FrameScheduler):
+        def __init__(self, fps):
+            super().__init__(fps, clock=lambda: now[0], sleep=self.fake_sleep)
+
+        def fake_sleep(self, seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+    monkeypatch.setattr(audio_sources, 'FrameScheduler', FakeScheduler)
+    blocks = take(audio_sources.paced(noise(FS, BLOCKSIZE), FS, BLOCKSIZE), 4)
+    assert len(blocks) == 4
+    assert sleeps == pytest.approx([BLOCKSIZE / FS] * 3)
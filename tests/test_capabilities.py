@@ -0,0 +1,59 @@
+"""
+Tests para la carga diferida de componentes opcionales (capabilities.py).
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Agregar el directorio raíz al path para importar módulos
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import capabilities  # noqa: E402
+from capabilities import OptionalModule, StartupTimer, module_available  # noqa: E402
+
+
+def test_module_available_no_importa():
+    """find_spec detecta el módulo sin ejecutarlo."""
+    sys.modules.pop('colorsys', None)
+    assert module_available('colorsys')
+    assert 'colorsys' not in sys.modules
+    assert not module_available('modulo_que_no_existe_rainvow')
+
+
+def test_optional_module_importa_en_el_primer_uso():
+    sys.modules.pop('colorsys', None)
+    mod = OptionalModule('colorsys')
+    assert mod.installed and mod.available and not mod.loaded
+    assert 'colorsys' not in sys.modules
+
+    assert mod.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert mod.loaded
+    assert 'colorsys' in capabilities.IMPORT_TIMES
+
+
+def test_optional_module_guarda_el_error(tmp_path, monkeypatch):
+    """Instalado pero roto (p. ej. sin PortAudio): available pasa a False."""
+    (tmp_path / 'roto_rainvow.py').write_text("raise OSError('libreria nativa no encontrada')\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    mod = OptionalModule('roto_rainvow')
+    assert mod.installed and mod.available
+    with pytest.raises(ImportError, match='libreria nativa'):
+        mod.algo
+    assert not mod.available
+    assert isinstance(mod.error, OSError)
+
+    missing = OptionalModule('modulo_que_no_existe_rainvow')
+    assert not missing.available
+    with pytest.raises(ImportError):
+        missing.algo
+
+
+def test_startup_timer_report():
+    timer = StartupTimer()
+    timer.mark('etapa 1')
+    timer.mark('etapa 2')
+    report = timer.report()
+    assert [stage for stage, _ in timer.stages] == ['etapa 1', 'etapa 2']
+    assert 'etapa 1' in report and 'Arranque en' in report
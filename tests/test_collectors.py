@@ -0,0 +1,106 @@
+"""
+Tests para el registry de collectors y el StateStore versionado (collectors.py).
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Agregar el directorio raíz al path para importar módulos
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from collectors import (  # noqa: E402
+    Collector, CollectorRegistry, CollectorScheduler, StateStore
+)
+
+
+def test_state_store_versiona_solo_cambios():
+    store = StateStore({'cpu': 0.0, 'memory': 0.0})
+    assert store.update({'cpu': 10.0}) == 1
+    assert store.update({'cpu': 10.0}) == 1  # Sin cambios: misma versión
+    assert store.update({'memory': 50.0, 'rgb_status': 'conectado'}) == 2
+
+    assert store.changes_since(1) == (2, {'memory': 50.0, 'rgb_status': 'conectado'})
+    assert store.changes_since(0)[1].keys() == {'cpu', 'memory', 'rgb_status'}
+    assert store.snapshot(['cpu']) == (2, {'cpu': 10.0})
+
+
+def test_collector_valida_schema():
+    collector = Collector('rgb', lambda: None, 1.0,
+                          schema={'rgb_status': str, 'spotify': (dict, type(None))})
+    collector.validate({'rgb_status': 'conectado', 'spotify': None})
+    with pytest.raises(ValueError, match='faltantes'):
+        collector.validate({'rgb_status': 'conectado'})
+    with pytest.raises(ValueError, match='tipo'):
+        collector.validate({'rgb_status': 1, 'spotify': None})
+    with pytest.raises(ValueError, match='dict'):
+        collector.validate([1, 2])
+
+
+def test_scheduler_respeta_cadencia_y_salta_atrasos():
+    registry = CollectorRegistry()
+    calls = []
+
+    @registry.register('fast', interval=1.0, schema={'n': int})
+    def fast():
+        calls.append('fast')
+        return {'n': len(calls)}
+
+    @registry.register('broken', interval=1.0, schema={'n': int})
+    def broken():
+        return {'n': 'x'}
+
+    store = StateStore()
+    published = []
+    scheduler = CollectorScheduler(registry, store, workers=0,
+                                   on_publish=lambda c, v, ver: published.append((c.name, ver)))
+    assert scheduler.tick(0.0) == ['fast', 'broken']
+    assert scheduler.tick(0.5) == []
+    assert scheduler.tick(1.0) == ['fast', 'broken']
+    # Scheduler detenido 3.5 s: se ejecuta una vez y las perdidas se saltan
+    assert scheduler.tick(4.5) == ['fast', 'broken']
+    assert scheduler.tick(4.9) == []
+    assert scheduler.tick(5.0) == ['fast', 'broken']
+
+    stats = scheduler.stats()
+    assert stats['fast']['runs'] == 4 and stats['fast']['skipped'] == 2
+    # El resultado inválido no se publica
+    assert stats['broken']['errors'] == 4 and 'tipo' in stats['broken']['last_error']
+    assert [name for name, _ in published] == ['fast'] * 4
+    assert store.get('n') == 4
+
+
+def test_collector_lento_no_bloquea_ni_se_encola():
+    registry = CollectorRegistry()
+    release = threading.Event()
+
+    @registry.register('slow', interval=0.01, timeout=0.02)
+    def slow():
+        release.wait(2)
+        return {'rgb_status': 'tarde'}
+
+    @registry.register('fast', interval=0.01)
+    def fast():
+        return {'cpu': time.perf_counter()}
+
+    store = StateStore()
+    scheduler = CollectorScheduler(registry, store)
+    clock = 0.0
+    for _ in range(10):
+        scheduler.tick(clock)
+        clock += 0.01
+        time.sleep(0.005)
+    release.set()
+    deadline = time.time() + 2
+    while scheduler.stats()['slow']['runs'] < 1 and time.time() < deadline:
+        time.sleep(0.01)
+    scheduler.stop()
+
+    stats = scheduler.stats()
+    # Una sola ejecución del lento; el resto se saltó mientras seguía en curso
+    assert stats['slow']['runs'] == 1 and stats['slow']['skipped'] == 9
+    assert stats['slow']['timeouts'] == 1 and stats['slow']['last_error'] == 'timeout'
+    assert store.get('rgb_status') is None  # Fuera de presupuesto: no se publica
+    assert stats['fast']['runs'] >= 8
@@ -0,0 +1,539 @@
+"""
+Tests para los módulos auxiliares de Hydra Observer.
+
+hydra_observer.py necesita teclado, ratón y micrófono, así que aquí se
+prueban solo los módulos sin dependencias de hardware que usa.
+"""
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Agregar el directorio raíz al path para importar módulos
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def test_session_log_writer_rotates_and_reads_back(tmp_path):
+    """Los eventos se escriben en NDJSON, rotan por tamaño y se leen en orden."""
+    import hydra_log
+
+    writer = hydra_log.SessionLogWriter(tmp_path, 'test', rotate_bytes=2000).start()
+    for i in range(200):
+        assert writer.write({'time': float(i), 'event': 'key', 'info': {'n': i}})
+    writer.close()
+
+    files = hydra_log.session_files(str(tmp_path), 'test')
+    assert len(files) > 1
+    assert all(f.endswith('.ndjson') for f in files)
+    entries = [e for f in files for e in hydra_log.iter_log_entries(f)]
+    assert [e['info']['n'] for e in entries] == list(range(200))
+
+
+@pytest.mark.parametrize('compress', ['gzip', 'zstd'])
+def test_session_log_writer_compression(tmp_path, compress):
+    """Los logs comprimidos se leen igual que los planos."""
+    import hydra_log
+
+    if compress == 'zstd' and not hydra_log.ZSTD_AVAILABLE:
+        pytest.skip('zstandard no instalado')
+    writer = hydra_log.SessionLogWriter(tmp_path, 'c', compress=compress).start()
+    for i in range(50):
+        writer.write({'time': float(i), 'event': 'click', 'info': i})
+    writer.close()
+
+    [path] = hydra_log.session_files(str(tmp_path), 'c')
+    assert path.endswith(hydra_log.COMPRESS_EXTENSIONS[compress])
+    assert [e['info'] for e in hydra_log.iter_log_entries(path)] == list(range(50))
+
+
+def test_session_log_close_timeout_leaves_file_to_writer_thread(tmp_path):
+    """Si close() vence el timeout, el thread escritor termina y cierra el archivo."""
+    import threading
+    import hydra_log
+
+    writer = hydra_log.SessionLogWriter(tmp_path, 'slow', compress='gzip').start()
+    release = threading.Event()
+    stream_write = writer._stream.write
+
+    def slow_write(data):
+        release.wait(5)
+        return stream_write(data)
+
+    writer._stream.write = slow_write
+    for i in range(10):
+        writer.write({'time': float(i), 'event': 'click', 'info': i})
+    writer.close(timeout=0.05)
+    assert writer._thread.is_alive() and writer._stream is not None
+    release.set()
+    writer._thread.join(5)
+
+    [path] = hydra_log.session_files(str(tmp_path), 'slow')
+    assert [e['info'] for e in hydra_log.iter_log_entries(path)] == list(range(10))
+
+
+def test_session_log_drops_when_full_and_reads_legacy(tmp_path):
+    """Con la cola llena se descartan eventos; el formato JSON antiguo sigue legible."""
+    import hydra_log
+
+    # Sin start(): nadie vacía la cola
+    writer = hydra_log.SessionLogWriter(tmp_path, 'full', max_queue=3)
+    results = [writer.write({'event': 'key'}) for _ in range(5)]
+    assert results == [True, True, True, False, False]
+    assert writer.dropped == 2
+
+    legacy = tmp_path / 'session_old.json'
+    legacy.write_text(json.dumps([{'time': 1.0, 'event': 'system', 'info': {}}]))
+    assert list(hydra_log.iter_log_entries(str(legacy)))[0]['event'] == 'system'
+
+    # Un .gz cortado a la mitad (corte de luz) no rompe la lectura
+    truncated = tmp_path / 'session_cut_000.ndjson.gz'
+    data = gzip.compress(b''.join(b'{"event":"key","info":%d}\n' % i for i in range(1000)))
+    truncated.write_bytes(data[:len(data) // 2])
+    entries = list(hydra_log.iter_log_entries(str(truncated)))
+    assert 0 < len(entries) < 1000
+
+
+def write_session(directory, session_id, entries):
+    import hydra_log
+
+    writer = hydra_log.SessionLogWriter(directory, session_id).start()
+    for entry in entries:
+        writer.write(entry)
+    writer.close()
+
+
+def sample_entries(t0):
+    return [
+        {'time': t0, 'event': 'system', 'info': {'window': 'Code', 'cpu': 10.0, 'mem': 40.0}},
+        {'time': t0 + 1, 'event': 'key', 'info': 'a'},
+        {'time': t0 + 2, 'event': 'system', 'info': {'window': None, 'cpu': 30.0, 'mem': 60.0}},
+        {'time': t0 + 3, 'event': 'click', 'info': {'button': 'Button.left', 'pos': [5, 7]}},
+        {'time': t0 + 4, 'event': 'hydra', 'info': 'music_mode'},
+        {'time': t0 + 5, 'event': 'system', 'info': {'window': 'Code', 'cpu': 20.0, 'mem': 50.0}},
+    ]
+
+
+def test_columnar_roundtrip_and_time_filter(tmp_path):
+    """La sesión compactada devuelve los mismos eventos y se filtra por tiempo."""
+    import hydra_columnar
+    import hydra_query
+
+    write_session(tmp_path, 's1', sample_entries(1000.0))
+    path = hydra_columnar.compact_session(str(tmp_path), 's1')
+    assert (Path(path) / 'system.cpu.npy').exists()
+
+    events = list(hydra_query.iter_events(str(tmp_path)))
+    assert events == sample_entries(1000.0)
+    assert [e['event'] for e in hydra_query.iter_events(str(tmp_path), 'hydra')] == ['hydra']
+    in_range = list(hydra_query.iter_events(str(tmp_path), 'system', since=1001, until=1005))
+    assert [e['info']['cpu'] for e in in_range] == [30.0]
+    by_window = list(hydra_query.iter_events(str(tmp_path), window='code'))
+    assert [e['time'] for e in by_window] == [1000.0, 1005.0]
+
+
+def test_query_stats_across_compacted_and_raw_sessions(tmp_path):
+    """Las estadísticas combinan sesiones columnar y sesiones aún en NDJSON."""
+    import hydra_columnar
+    import hydra_query
+
+    write_session(tmp_path, 's1', sample_entries(1000.0))
+    hydra_columnar.compact_session(str(tmp_path), 's1')
+    write_session(tmp_path, 's2', sample_entries(5000.0))  # Sin compactar
+
+    stats = hydra_query.compute_stats(str(tmp_path))['total']
+    assert stats['cpu'] == {'samples': 6, 'mean': 20.0, 'min': 10.0, 'max': 30.0}
+    assert stats['events'] == {'system': 6, 'key': 2, 'click': 2, 'hydra': 2}
+
+    per_session = hydra_query.compute_stats(str(tmp_path), since=4000, by='session')
+    assert list(per_session) == ['s2']
+
+    # Cada muestra dura hasta la siguiente; la última de cada sesión no suma
+    windows = {title: seconds for title, seconds, _ in hydra_query.compute_window_time(str(tmp_path))}
+    assert windows == {None: 6.0, 'Code': 4.0}
+
+
+def test_window_tracker_serves_cached_title():
+    """Las lecturas usan solo la caché; únicamente refresh() consulta al sistema."""
+    import time
+    import window_tracker
+
+    calls = []
+
+    def query():
+        calls.append(1)
+        return f'Ventana {len(calls)}'
+
+    tracker = window_tracker.WindowTracker(poll_interval=0.05, query=query)
+    assert tracker.title() is None and not calls  # Sin consultas todavía
+    assert tracker.refresh() == 'Ventana 1'
+    tracker._state = ('Ventana 1', time.monotonic() - 3600)  # Muy viejo: igual no consulta
+    for _ in range(1000):
+        assert tracker.title() == 'Ventana 1'
+    assert len(calls) == 1
+
+    tracker.start()
+    try:
+        time.sleep(0.3)
+        assert len(calls) > 2
+        assert int(tracker.title().split()[1]) > 2
+        assert tracker.age() < 0.2
+    finally:
+        tracker.stop()
+
+
+def test_audio_ring_buffer_keeps_last_seconds():
+    """El buffer circular devuelve los últimos frames en orden."""
+    import numpy as np
+    import hydra_audio
+
+    ring = hydra_audio.AudioRingBuffer(seconds=1, samplerate=10, channels=1)
+    for start in range(0, 25, 4):
+        ring.write(np.arange(start, start + 4, dtype=np.float32).reshape(-1, 1))
+    assert ring.snapshot()[:, 0].tolist() == list(range(18, 28))
+
+
+class FakeSoundDevice:
+    """sounddevice sin dispositivo: el stream abre y cierra sin hacer nada."""
+
+    class PortAudioError(Exception):
+        pass
+
+    class InputStream:
+        def __init__(self, **kwargs):
+            pass
+
+        def start(self):
+            pass
+
+        def stop(self):
+            pass
+
+        def close(self):
+            pass
+
+
+def test_audio_recorder_pre_roll_post_roll_and_debounce(tmp_path, monkeypatch):
+    """Un trigger guarda pre-roll + post-roll en WAV y los siguientes se ignoran."""
+    import wave
+    import numpy as np
+    import hydra_audio
+
+    saved = []
+    recorder = hydra_audio.AudioRecorder(tmp_path, pre_roll=1, post_roll=0.5, cooldown=60,
+                                         samplerate=100, channels=2,
+                                         on_saved=lambda p, s: saved.append((p, s)))
+    monkeypatch.setattr(hydra_audio, 'AUDIO_AVAILABLE', True)
+    monkeypatch.setattr(hydra_audio, 'sd', FakeSoundDevice)
+    recorder.start()  # Stream falso: los bloques se inyectan con _callback
+
+    block = np.full((10, 2), 0.5, dtype=np.float32)
+    for _ in range(15):
+        recorder._callback(block, 10, None, None)
+    path = recorder.trigger()
+    assert path and recorder.trigger() is None  # Debounce
+    for _ in range(10):
+        recorder._callback(block, 10, None, None)
+    recorder.stop()
+
+    assert saved == [(path, 1.5)]
+    with wave.open(path) as f:
+        assert (f.getnchannels(), f.getframerate(), f.getnframes()) == (2, 100, 150)
+    assert not list(tmp_path.glob('*.part'))
+
+
+def test_audio_recorder_sin_microfono_no_deja_clips_abiertos(tmp_path, monkeypatch):
+    """Sin stream de entrada trigger() no hace nada: no hay post-roll que esperar."""
+    import hydra_audio
+
+    monkeypatch.setattr(hydra_audio, 'AUDIO_AVAILABLE', False)
+    recorder = hydra_audio.AudioRecorder(tmp_path, cooldown=0).start()
+    assert recorder.trigger() is None
+    assert recorder.trigger() is None
+    assert recorder.queue.empty()
+    recorder.stop()
+    assert not list(tmp_path.iterdir())
+
+
+def test_audio_recorder_sin_dispositivo_de_entrada(tmp_path, monkeypatch):
+    """Si PortAudio no puede abrir la entrada, start() avisa y los triggers se ignoran."""
+    import hydra_audio
+
+    class NoDevice(FakeSoundDevice):
+        class InputStream:
+            def __init__(self, **kwargs):
+                raise OSError('No Default Input Device Available')
+
+    errors = []
+    monkeypatch.setattr(hydra_audio, 'AUDIO_AVAILABLE', True)
+    monkeypatch.setattr(hydra_audio, 'sd', NoDevice)
+    recorder = hydra_audio.AudioRecorder(tmp_path, cooldown=0, on_error=errors.append).start()
+    assert len(errors) == 1 and 'No Default Input Device' in errors[0]
+    assert recorder.trigger() is None
+    recorder.stop()
+    assert not list(tmp_path.iterdir())
+
+
+def test_keyword_matcher_finds_overlapping_keywords():
+    """Aho-Corasick encuentra todas las palabras, incluso solapadas."""
+    import hydra_rules
+
+    matcher = hydra_rules.KeywordMatcher({'he': {0}, 'she': {1}, 'his': {2}, 'HERS': {3}})
+    assert matcher.match('uSHErs') == {0, 1, 3}
+    assert matcher.match('nada') == set()
+
+
+def test_rule_engine_edge_level_and_cooldown():
+    """Edge dispara al empezar a coincidir; level repite respetando el cooldown."""
+    import threading
+    import hydra_rules
+
+    calls = []
+    done = threading.Event()
+
+    def record(value):
+        calls.append(value)
+        if len(calls) == 4:
+            done.set()
+
+    rules = [
+        {'name': 'zip', 'match': ['zip'], 'trigger': 'edge', 'actions': [{'hydra': 'zip_hud'}]},
+        {'name': 'music', 'match': ['music'], 'regex': r'\bspotify\b', 'trigger': 'level',
+         'cooldown': 10, 'actions': [{'hydra': 'music_mode'}]},
+    ]
+    engine = hydra_rules.RuleEngine(rules, {'hydra': record})
+    try:
+        assert engine.evaluate('a.zip', now=0) == ['zip']
+        assert engine.evaluate('a.zip', now=1) == []  # Edge: sigue coincidiendo
+        assert engine.evaluate('Editor', now=2) == []
+        assert engine.evaluate('b.ZIP', now=3) == ['zip']  # Vuelve a empezar
+        assert engine.evaluate('Spotify', now=4) == ['music']
+        assert engine.evaluate('Music', now=8) == []  # Cooldown
+        assert engine.evaluate('Music', now=15) == ['music']  # Level: sigue disparando
+        assert done.wait(5)
+        assert sorted(calls) == ['music_mode', 'music_mode', 'zip_hud', 'zip_hud']
+    finally:
+        engine.shutdown()
+
+
+def test_rule_engine_rejects_invalid_rules_and_loads_default_file():
+    """Las reglas mal formadas fallan al cargar; el archivo del repo es válido."""
+    import hydra_rules
+
+    with pytest.raises(ValueError):
+        hydra_rules.RuleEngine([{'name': 'x', 'actions': []}], {})
+    with pytest.raises(ValueError):
+        hydra_rules.RuleEngine([{'match': ['x'], 'actions': [{'unknown': 1}]}], {})
+
+    default = Path(__file__).parent.parent / 'hydra_rules.json'
+    engine = hydra_rules.RuleEngine.from_file(default, {'print': print, 'hydra': print,
+                                                        'audio': print})
+    assert [r.name for r in engine.rules] == ['zip_hud', 'music_mode']
+    engine.shutdown()
+
+
+def test_hydra_channel_pipe_keeps_one_process(tmp_path):
+    """En modo pipe todos los mensajes llegan a un único proceso por stdin."""
+    import hydra_channel
+
+    out = tmp_path / 'received.txt'
+    reader = f"import sys\nwith open({str(out)!r}, 'w') as f:\n    f.writelines(sys.stdin)\n"
+    channel = hydra_channel.HydraChannel(sys.executable, mode='pipe',
+                                         pipe_args=['-c', reader]).start()
+    for i in range(20):
+        assert channel.send(f'msg {i}')
+    channel.close()
+
+    assert channel.transport_name == 'pipe'
+    assert channel.sent == 20 and channel.batches < 20
+    assert channel.fallback.spawned == 0
+    assert out.read_text().splitlines() == [f'msg {i}' for i in range(20)]
+
+
+def test_hydra_channel_socket_and_spawn_fallback(tmp_path):
+    """El modo socket envía líneas; si no hay socket se usa un proceso por mensaje."""
+    import socket
+    import threading
+    import hydra_channel
+
+    path = str(tmp_path / 'hydra.sock')
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+    received = []
+
+    def serve():
+        conn, _ = server.accept()
+        with conn, conn.makefile('r') as lines:
+            received.extend(line.strip() for line in lines)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    channel = hydra_channel.HydraChannel('hydra', socket_path=path).start()
+    channel.send('zip_hud')
+    channel.send('music_mode')
+    channel.close()
+    thread.join(5)
+    server.close()
+    assert received == ['zip_hud', 'music_mode']
+
+    errors = []
+    channel = hydra_channel.HydraChannel('true', socket_path=str(tmp_path / 'missing.sock'),
+                                         on_error=errors.append).start()
+    channel.send('zip_hud')
+    channel.close()
+    assert channel.transport_name == 'spawn'
+    assert channel.fallback.spawned == 1 and channel.fallback.children == []
+    assert errors and 'socket' in errors[0]
+
+
+def test_observer_loop_threadsafe_events_tasks_and_metrics():
+    """Eventos de otros threads llegan al sink; las tareas corren y hay métricas."""
+    import asyncio
+    import threading
+    import hydra_loop
+
+    received = []
+    ticks = []
+    loop = hydra_loop.ObserverLoop(sink=received.append, max_queue=1000)
+
+    async def slow_io():
+        await asyncio.to_thread(threading.Event().wait, 0.05)  # Bloqueante, fuera del loop
+        ticks.append('io')
+
+    def producer():
+        for i in range(200):
+            loop.submit('key', i)
+
+    async def scenario():
+        loop.every(0.01, lambda: ticks.append('fast'), name='fast')
+        loop.every(0.01, slow_io, name='io')
+        runner = asyncio.create_task(loop.run())
+        await asyncio.sleep(0.05)
+        threads = [threading.Thread(target=producer) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        await asyncio.sleep(0.2)
+        loop.stop()
+        await runner
+
+    asyncio.run(scenario())
+    assert sorted(e['info'] for e in received) == sorted(list(range(200)) * 3)
+    assert ticks.count('fast') > 10 and ticks.count('io') >= 2
+
+    metrics = loop.metrics()
+    assert metrics['events'] == 600 and metrics['dropped'] == 0
+    assert metrics['queue_depth'] == 0 and metrics['handoff_pending'] == 0
+    assert metrics['tasks']['io']['overruns'] > 0  # 50 ms de trabajo cada 10 ms
+    assert metrics['lag_max_ms'] < 100
+
+    loop.submit('system', {})  # Con el loop detenido va directo al sink
+    assert received[-1]['event'] == 'system'
+
+
+def test_spectrum_matches_original_band_analysis():
+    """band_amps() con la disposición cacheada da lo mismo que el cálculo por bloque."""
+    import numpy as np
+    import spectrum
+
+    def original(block, fs, n_bands):
+        data = block[:, 0]
+        mag = np.abs(np.fft.rfft(data * np.hanning(len(data))))
+        freqs = np.fft.rfftfreq(len(data), 1 / fs)
+        edges = np.linspace(0, fs // 2, n_bands + 1)
+        amps = [mag[(freqs >= edges[i]) & (freqs < edges[i + 1])].max()
+                if np.any((freqs >= edges[i]) & (freqs < edges[i + 1])) else 0
+                for i in range(n_bands)]
+        return np.log1p(np.array(amps))
+
+    rng = np.random.default_rng(0)
+    for n_samples, n_bands in ((2205, 7), (4410, 7), (1024, 16), (64, 40)):
+        block = rng.standard_normal((n_samples, 2))
+        np.testing.assert_allclose(spectrum.band_amps(block, 44100, n_bands),
+                                   original(block, 44100, n_bands))
+    normalized = spectrum.normalized_band_amps(block, 44100, 40)
+    assert max(normalized) == 1.0 and len(normalized) == 40
+
+
+def test_session_replay_counts_rules_and_audio(tmp_path):
+    """La reproducción dispara las mismas reglas y analiza los clips de la sesión."""
+    import numpy as np
+    import hydra_columnar
+    import hydra_replay
+
+    rules = [{'name': 'music', 'match': ['spotify'], 'trigger': 'edge', 'cooldown': 10,
+              'actions': [{'audio': True}, {'hydra': 'music_mode'}]}]
+    clip = tmp_path / 'audio_x.npy'
+    np.save(clip, np.zeros((hydra_replay.BLOCKSIZE * 4, 2), dtype=np.float32))
+    entries = [{'time': 100.0 + i, 'event': 'system',
+                'info': {'window': 'Spotify' if i % 3 == 0 else 'Code', 'cpu': 1.0, 'mem': 2.0}}
+               for i in range(30)]
+    entries.append({'time': 131.0, 'event': 'audio',
+                    'info': {'file': '/ya/no/existe/audio_x.npy', 'seconds': 0.2}})
+    write_session(tmp_path, 'r1', entries)
+
+    # Flancos cada 3 s, pero el cooldown de 10 s deja pasar uno de cada 4
+    report = hydra_replay.SessionReplay(rules, audio_dir=str(tmp_path)).run(
+        hydra_replay.iter_session(str(tmp_path), 'r1'))
+    assert report['rules_fired'] == {'music': 3}
+    assert report['actions'] == {'audio': 3, 'hydra': 3}
+    assert report['by_type'] == {'audio': 1, 'system': 30}
+    assert report['dsp']['blocks'] == 4 and report['dsp']['missing_clips'] == 0
+
+    # La sesión compactada (sin NDJSON) se reproduce igual
+    hydra_columnar.compact_session(str(tmp_path), 'r1', delete_source=True)
+    again = hydra_replay.SessionReplay(rules).run(hydra_replay.iter_session(str(tmp_path), 'r1'))
+    assert again['rules_fired'] == report['rules_fired']
+    assert again['dsp']['missing_clips'] == 1
+    assert hydra_replay.compare_reports(again, report) == []
+    assert hydra_replay.compare_reports(again, {'rules_fired': {'music': 2}}) != []
+
+
+def test_session_replay_skips_unreadable_clips(tmp_path, capsys):
+    """Un clip en formato no soportado se cuenta y la reproducción sigue."""
+    import json
+    import wave
+    import numpy as np
+    import hydra_replay
+
+    good = tmp_path / 'audio_ok.npy'
+    np.save(good, np.zeros((hydra_replay.BLOCKSIZE * 2, 1), dtype=np.float32))
+    bad = tmp_path / 'audio_8bit.wav'
+    with wave.open(str(bad), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(1)
+        f.setframerate(8000)
+        f.writeframes(bytes(800))
+    entries = [{'time': 1.0, 'event': 'audio', 'info': {'file': str(bad)}},
+               {'time': 2.0, 'event': 'audio', 'info': {'file': str(good)}},
+               {'time': 3.0, 'event': 'system', 'info': {'window': 'Code'}}]
+    write_session(tmp_path, 'r2', entries)
+
+    # Los eventos se leen a medida que se reproducen, sin cargar la sesión en una lista
+    session = hydra_replay.iter_session(str(tmp_path), 'r2')
+    assert not isinstance(session, list)
+    report = hydra_replay.SessionReplay([]).run(session, [str(bad)])
+    assert report['events'] == 3
+    assert report['dsp']['blocks'] == 2
+    assert report['dsp']['invalid_clips'] == 2 and report['dsp']['missing_clips'] == 0
+
+    rules = tmp_path / 'rules.json'
+    rules.write_text('[]')
+    assert hydra_replay.main(['--logs', str(tmp_path), '--session', 'r2',
+                              '--rules', str(rules), '--json']) == 0
+    assert json.loads(capsys.readouterr().out)['dsp']['invalid_clips'] == 1
+    assert hydra_replay.main(['--logs', str(tmp_path), '--session', 'nada',
+                              '--rules', str(rules)]) == 1
+
+
+def test_hydra_channel_auto_usa_spawn_y_pipe_requiere_args():
+    """Sin HYDRA_SOCKET, auto envía un proceso por mensaje; pipe es opt-in."""
+    import hydra_channel
+
+    assert hydra_channel.HydraChannel('hydra').mode == 'spawn'
+    assert hydra_channel.HydraChannel('hydra', socket_path='/tmp/h.sock').mode == 'socket'
+    with pytest.raises(ValueError):
+        hydra_channel.HydraChannel('hydra', mode='pipe')
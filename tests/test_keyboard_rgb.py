@@ -0,0 +1,175 @@
+"""
+Tests para el motor de efectos de keyboard_rgb.
+
+No hace falta un servidor OpenRGB: los dispositivos son objetos falsos
+con la misma forma (leds, zonas con matrix_map y set_colors).
+"""
+import colorsys
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+# Agregar el directorio raíz al path para importar módulos
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+keyboard_rgb = pytest.importorskip('keyboard_rgb')
+
+
+class FakeDevice:
+    """Teclado de 2x3 teclas en matriz más una tira de 2 LEDs sin matriz."""
+
+    def __init__(self):
+        keys = [SimpleNamespace(id=i) for i in range(6)]
+        strip = [SimpleNamespace(id=6 + i) for i in range(2)]
+        self.leds = keys + strip
+        self.zones = [SimpleNamespace(leds=keys, matrix_map=[[0, 1, 2], [3, None, 4]]),
+                      SimpleNamespace(leds=strip, matrix_map=None)]
+        self.sent = []
+
+    def set_colors(self, colors, fast=False):
+        self.sent.append(([(c.red, c.green, c.blue) for c in colors], fast))
+
+
+def test_hsv_to_rgb_matches_colorsys():
+    """La conversión vectorizada coincide con colorsys para cada tono."""
+    hues = np.linspace(0, 1, 97, endpoint=False)
+    expected = [[int(255 * x) for x in colorsys.hsv_to_rgb(h, 1, 1)] for h in hues]
+    assert keyboard_rgb.hsv_to_rgb(hues).tolist() == expected
+
+
+def test_led_positions_use_matrix_and_fill_the_rest():
+    """Las teclas toman su posición de la matriz; el resto queda en una línea."""
+    pos = keyboard_rgb.led_positions(FakeDevice())
+    assert pos[0].tolist() == [0.0, 0.0]
+    assert pos[4].tolist() == [1.0, 1.0]
+    # El LED 5 no aparece en la matriz: se reparte con la tira
+    assert pos[[5, 6, 7], 0].tolist() == [0.0, 0.5, 1.0]
+    assert np.all(pos[[5, 6, 7], 1] == 0.5)
+
+
+def test_frame_scheduler_keeps_deadlines_and_skips_late_frames():
+    """El ritmo no acumula el tiempo de trabajo y los cuadros atrasados se saltan."""
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    scheduler = keyboard_rgb.FrameScheduler(10, clock=lambda: now[0], sleep=sleep)
+    times = []
+    for index, t in scheduler.ticks(frames=5):
+        times.append(round(t, 3))
+        now[0] += 0.25 if index == 1 else 0.03  # El cuadro 1 tarda 2.5 periodos
+    # El cuadro 2 (0.2) se salta; el 3 sale enseguida y el ritmo se recupera
+    assert times == [0.0, 0.1, 0.3, 0.4, 0.5]
+    assert scheduler.skipped == 1
+    assert sleeps[-1] == pytest.approx(0.07)
+
+
+def test_run_effect_sends_one_frame_per_tick():
+    """Cada cuadro se envía con una sola llamada set_colors(fast=True)."""
+    device = FakeDevice()
+    scheduler = keyboard_rgb.run_effect(device, keyboard_rgb.wave_effect(), fps=200, frames=3)
+    assert scheduler.frames == 3
+    assert len(device.sent) == 3
+    colors, fast = device.sent[0]
+    assert fast and len(colors) == len(device.leds)
+    # Onda horizontal: teclas de la misma columna comparten color
+    assert colors[0] == colors[3] and colors[0] != colors[1]
+
+
+def test_spectrum_bars_fill_columns_from_the_bottom():
+    """Cada columna es una banda y se enciende desde la fila inferior."""
+    device = FakeDevice()
+    pos = keyboard_rgb.led_positions(device)[:6]
+    bands, n_bands = keyboard_rgb.column_bands(pos)
+    # Fila superior: 0, 1, 2; inferior: 3, 4 (columna 2); el 5 queda a media altura
+    assert n_bands == 3 and bands.tolist() == [0, 1, 2, 0, 2, 0]
+
+    lit = keyboard_rgb.spectrum_bars(pos, bands, [0.0, 0.5, 1.0]).any(axis=1).tolist()
+    assert lit == [False, False, True, False, True, False]
+    lit = keyboard_rgb.spectrum_bars(pos, bands, [0.5, 0.0, 0.0]).any(axis=1).tolist()
+    assert lit == [False, False, False, True, False, True]
+
+
+def test_frame_sender_drops_stale_frames_instead_of_queueing():
+    """Con OpenRGB lento solo se envía el cuadro más reciente."""
+    import threading
+    import time
+
+    class SlowDevice(FakeDevice):
+        def set_colors(self, colors, fast=False):
+            release.wait(1)
+            super().set_colors(colors, fast)
+
+    release = threading.Event()
+    device = SlowDevice()
+    sender = keyboard_rgb.FrameSender(device).start()
+    frames = [np.full((8, 3), i, dtype=np.uint8) for i in range(10)]
+    for frame in frames:
+        sender.submit(frame, time.monotonic())
+    release.set()
+    sender.close()
+
+    assert sender.sent + sender.skipped == 10
+    assert sender.sent <= 2
+    assert device.sent[-1][0][0] == (9, 9, 9)
+
+
+def test_audio_reactive_maps_bass_to_left_columns_within_budget():
+    """Un tono grave enciende las columnas izquierdas y el cuadro sale en < 30 ms."""
+    import time
+
+    device = FakeDevice()
+    target = keyboard_rgb.DeviceTarget(device)
+    target.sender.start()
+    reactive = keyboard_rgb.AudioReactive([target], n_bands=3)
+    t = np.arange(keyboard_rgb.AUDIO_BLOCKSIZE) / keyboard_rgb.FS
+    block = np.sin(2 * np.pi * 440 * t)[:, None].astype(np.float32)
+    levels = reactive.process(block, time.monotonic())[3]
+    target.sender.close()
+
+    assert levels.argmax() == 0
+    assert target.sender.sent == 1
+    assert target.sender.stats()['latency_max_ms'] < keyboard_rgb.LATENCY_BUDGET_MS
+
+
+def test_fanout_sends_in_parallel_with_latency_compensation():
+    """Un dispositivo lento no frena a los demás y cada uno recibe el cuadro adelantado."""
+    import threading
+    import time
+
+    class SlowDevice(FakeDevice):
+        def set_colors(self, colors, fast=False):
+            release.wait(1)
+            super().set_colors(colors, fast)
+
+    release = threading.Event()
+    fast, slow = FakeDevice(), SlowDevice()
+    fanout = keyboard_rgb.RGBFanout([
+        keyboard_rgb.DeviceTarget(fast, 'a:6742', threading.Lock()),
+        keyboard_rgb.DeviceTarget(slow, 'b:6742', threading.Lock(), offset_ms=100),
+    ]).start()
+
+    def effect(t, pos):  # Codifica t (en centésimas) en el color
+        return np.full((len(pos), 3), round(t * 100), dtype=np.uint8)
+
+    for i in range(5):
+        fanout.push(effect, 1.0 + i / 100)
+        for _ in range(100):  # Esperar al dispositivo rápido
+            if len(fast.sent) == i + 1:
+                break
+            time.sleep(0.01)
+    assert [sent[0][0][0] for sent in fast.sent] == [100, 101, 102, 103, 104]
+    assert slow.sent == []
+    release.set()
+    fanout.close(lights_off_devices=False)
+
+    # El lento recibió el primero y el último; los intermedios se saltaron
+    assert [sent[0][0][0] for sent in slow.sent][-1] == 114
+    stats = fanout.stats()
+    assert stats['b:6742/device']['skipped'] == 5 - len(slow.sent)
@@ -0,0 +1,161 @@
+"""
+Tests para el subsistema de capturas de screenshot.py.
+
+Se usa un backend falso que devuelve arrays NumPy, así que no hace falta
+pantalla ni mss/pyautogui.
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Agregar el directorio raíz al path para importar módulos
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import screenshot  # noqa: E402
+
+
+class FakeBackend:
+    """Pantalla de 40x30 cuyo color cambia en cada captura."""
+
+    name = 'fake'
+
+    def __init__(self):
+        self.grabs = 0
+        self.closed = False
+
+    def grab(self):
+        self.grabs += 1
+        return np.full((30, 40, 3), self.grabs % 256, dtype=np.uint8)
+
+    def close(self):
+        self.closed = True
+
+
+def test_burst_writes_every_frame_in_background(tmp_path):
+    """Una ráfaga guarda todas las capturas como PNG y cierra el backend."""
+    backend = FakeBackend()
+    with screenshot.ScreenCapture(backend, directory=str(tmp_path)) as capture:
+        futures = capture.burst('demo', count=5)
+    assert backend.closed
+    paths = sorted(f.result() for f in futures)
+    assert len(paths) == 5 and all(p.endswith('.png') for p in paths)
+    assert not list(tmp_path.glob('*.part'))
+    with Image.open(paths[2]) as image:
+        assert image.size == (40, 30)
+        assert image.getpixel((0, 0)) == (3, 3, 3)
+    assert capture.stats()['written'] == 5
+
+
+def test_writer_drops_frames_instead_of_slowing_capture(tmp_path, monkeypatch):
+    """Con el pool lleno el timelapse descarta capturas y no se frena."""
+    release = threading.Event()
+    original = screenshot.FrameWriter._write
+
+    def slow_write(self, frame, path):
+        release.wait(2)
+        return original(self, frame, path)
+
+    monkeypatch.setattr(screenshot.FrameWriter, '_write', slow_write)
+    capture = screenshot.ScreenCapture(FakeBackend(), directory=str(tmp_path), workers=1,
+                                       max_pending=2)
+    started = time.monotonic()
+    futures = capture.timelapse('busy', interval=0, count=6)
+    assert time.monotonic() - started < 1.0
+    release.set()
+    capture.close()
+    assert len(futures) == 2
+    assert capture.stats()['dropped'] == 4
+    assert len(list(tmp_path.glob('snap_busy_*.png'))) == 2
+
+
+def test_burst_never_drops_frames(tmp_path, monkeypatch):
+    """La ráfaga espera al escritor en lugar de descartar las capturas pedidas."""
+    original = screenshot.FrameWriter._write
+
+    def slow_write(self, frame, path):
+        time.sleep(0.02)
+        return original(self, frame, path)
+
+    monkeypatch.setattr(screenshot.FrameWriter, '_write', slow_write)
+    with screenshot.ScreenCapture(FakeBackend(), directory=str(tmp_path), workers=1,
+                                  max_pending=2) as capture:
+        futures = capture.burst('all', count=8)
+    assert len(futures) == 8
+    assert capture.stats()['dropped'] == 0
+    assert len(list(tmp_path.glob('snap_all_*.png'))) == 8
+
+
+def test_timelapse_keeps_a_fixed_schedule(tmp_path):
+    """El timelapse captura en horarios fijos y respeta la duración."""
+    with screenshot.ScreenCapture(FakeBackend(), directory=str(tmp_path), fmt='jpg') as capture:
+        started = time.monotonic()
+        futures = capture.timelapse('tl', interval=0.05, duration=0.22)
+        elapsed = time.monotonic() - started
+    assert len(futures) == 5  # t = 0, 0.05, 0.10, 0.15, 0.20
+    assert 0.18 < elapsed < 0.5
+    assert all(f.result().endswith('.jpg') for f in futures)
+
+
+def desktop_frames(n, seed=0):
+    """Capturas sintéticas: fondo fijo, un 'reloj' que cambia y alguna ventana nueva."""
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 256, (100, 150, 3), dtype=np.uint8)  # 150 no es múltiplo de 32
+    frames = []
+    for i in range(n):
+        frame = base.copy()
+        frame[90:100, 130:150] = (i // 2) % 256  # Cambia cada 2 capturas
+        if i == 7:
+            base = rng.integers(0, 256, base.shape, dtype=np.uint8)  # Cambio completo
+        frames.append(frame)
+    return frames
+
+
+def test_timelapse_store_dedups_and_rebuilds_every_frame(tmp_path):
+    """Las capturas repetidas se descartan y cualquier captura se reconstruye exacta."""
+    import timelapse_store
+
+    path = str(tmp_path / 'tl.tlx')
+    writer = timelapse_store.TimelapseWriter(path, keyframe_interval=3)
+    frames = desktop_frames(12)
+    kinds = [writer.add(frame, t=float(i)) for i, frame in enumerate(frames)]
+    writer.close()
+
+    assert kinds[:4] == ['keyframe', 'unchanged', 'delta', 'unchanged']
+    assert kinds[8] == 'keyframe'  # Toda la pantalla cambió
+    stored = [frames[i] for i, kind in enumerate(kinds) if kind != 'unchanged']
+    reader = timelapse_store.TimelapseReader(path)
+    assert len(reader) == len(stored) == writer.stats()['stored']
+    # Acceso aleatorio (desde el keyframe) y secuencial (con la caché)
+    for i in (4, 1, 0, 5, 2, 3):
+        np.testing.assert_array_equal(reader.frame(i), stored[i])
+    for frame, expected in zip(reader, stored):
+        np.testing.assert_array_equal(frame, expected)
+    assert reader.index_at(5.5) == kinds[:6].count('keyframe') + kinds[:6].count('delta') - 1
+    reader.close()
+
+    # Un archivo cortado a la mitad del último registro sigue siendo legible
+    data = Path(path).read_bytes()
+    Path(path).write_bytes(data[:-10])
+    assert len(timelapse_store.TimelapseReader(path)) == len(stored) - 1
+
+
+def test_screen_capture_timelapse_into_store(tmp_path):
+    """El timelapse de ScreenCapture puede escribir en el contenedor .tlx."""
+    import timelapse_store
+
+    class StillBackend(FakeBackend):
+        def grab(self):
+            self.grabs += 1
+            return np.zeros((30, 40, 3), dtype=np.uint8)  # Escritorio sin cambios
+
+    store = timelapse_store.TimelapseWriter(str(tmp_path / 's.tlx')).start()
+    with screenshot.ScreenCapture(StillBackend(), directory=str(tmp_path)) as capture:
+        accepted = capture.timelapse('still', interval=0.0, count=6, store=store)
+    store.close()
+    assert len(accepted) + store.dropped == 6
+    assert store.stats()['stored'] == 1
+    assert not list(tmp_path.glob('*.png'))
@@ -4,12 +4,18 @@ Tests para la aplicación Spotify Live.
 Este archivo contiene tests básicos para verificar la funcionalidad
 de la aplicación Flask y sus endpoints.
 """
+import os
 import sys
 from pathlib import Path
 
 # Agregar el directorio raíz al path para importar módulos
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Credenciales ficticias: spotify_live.app crea SpotifyOAuth al importarse
+os.environ.setdefault('SPOTIPY_CLIENT_ID', 'test_id')
+os.environ.setdefault('SPOTIPY_CLIENT_SECRET', 'test_secret')
+os.environ.setdefault('FLASK_SECRET', 'test_secret')
+
 
 def test_app_imports():
     """Verifica que se pueden importar los módulos de la aplicación."""
@@ -65,6 +71,351 @@ def test_search_params_validation():
     assert limit == test_limit_low, "Límite válido debe mantenerse"
 
 
+def test_async_app_requires_authentication():
+    """Verifica que la variante asíncrona responde 401 sin sesión."""
+    import asyncio
+
+    import pytest
+    pytest.importorskip('quart')
+    pytest.importorskip('aiohttp')
+
+    from spotify_live import async_app
+
+    async def fetch():
+        client = async_app.app.test_client()
+        response = await client.get('/current')
+        return response.status_code, await response.get_json()
+
+    status, data = asyncio.run(fetch())
+    assert status == 401
+    assert data == {'error': 'not_authenticated'}
+
+
+def test_async_app_maps_timeout_to_504():
+    """Verifica que un timeout hacia Spotify se traduce en un 504."""
+    import asyncio
+
+    import pytest
+    pytest.importorskip('quart')
+    pytest.importorskip('aiohttp')
+
+    from spotify_live import async_app
+
+    async def check():
+        async with async_app.app.app_context():
+            response, status = async_app.upstream_error(asyncio.TimeoutError())
+            return status, await response.get_json()
+
+    status, data = asyncio.run(check())
+    assert status == 504
+    assert data['error'] == 'spotify_timeout'
+
+
+def test_parse_track_ids_normalizes_and_limits():
+    """Verifica normalización, deduplicación y límite de IDs del lote."""
+    import pytest
+    from spotify_live import app as spotify_app
+
+    track_id = '4uLU6hMCjMI75M1A2tKUQC'
+    ids = spotify_app.parse_track_ids([
+        track_id,
+        f'spotify:track:{track_id}',
+        f'https://open.spotify.com/track/{track_id}?si=abc',
+        '',
+    ])
+    assert ids == [track_id]
+
+    with pytest.raises(ValueError):
+        spotify_app.parse_track_ids(['no-es-un-id'])
+    too_many = [f'{i:022d}' for i in range(spotify_app.MAX_BATCH_IDS + 1)]
+    with pytest.raises(ValueError):
+        spotify_app.parse_track_ids(too_many)
+
+    assert [len(c) for c in spotify_app.chunked(list(range(120)), 50)] == [50, 50, 20]
+
+
+def test_search_cache_store_enforces_max_size():
+    """Verifica que cache_store respeta CACHE_MAX_SIZE con stores concurrentes."""
+    from concurrent.futures import ThreadPoolExecutor
+    from spotify_live import app as spotify_app
+
+    spotify_app.SEARCH_CACHE.clear()
+    queries = [f'query {i}' for i in range(spotify_app.CACHE_MAX_SIZE * 3)]
+    with ThreadPoolExecutor(16) as pool:
+        list(pool.map(lambda q: spotify_app.cache_store(q, []), queries))
+    assert len(spotify_app.SEARCH_CACHE) <= spotify_app.CACHE_MAX_SIZE
+    spotify_app.cache_store(queries[-1], ['nuevo'])
+    assert spotify_app.cache_lookup(queries[-1]) == ['nuevo']
+    spotify_app.SEARCH_CACHE.clear()
+
+
+def test_tracks_batch_merges_chunks_and_caches():
+    """Verifica que /tracks/batch combina trozos y usa el caché por ID."""
+    from unittest.mock import patch
+    from spotify_live import app as spotify_app
+
+    spotify_app.TRACK_CACHE.clear()
+    spotify_app.FEATURES_CACHE.clear()
+    ids = [f'{i:022d}' for i in range(120)]
+    calls = {'tracks': 0, 'features': 0}
+
+    def fake_tracks(token, chunk):
+        calls['tracks'] += 1
+        return [{'id': i, 'name': f'track {i}', 'artists': [], 'album': {}} for i in chunk]
+
+    def fake_features(token, chunk):
+        calls['features'] += 1
+        return [{'id': i, 'energy': 0.8} for i in chunk]
+
+    client = spotify_app.app.test_client()
+    with client.session_transaction() as sess:
+        sess['token_info'] = {'access_token': 'test', 'expires_at': 9999999999}
+
+    with patch.object(spotify_app, '_fetch_tracks_chunk', fake_tracks), \
+            patch.object(spotify_app, '_fetch_features_chunk', fake_features):
+        data = client.post('/tracks/batch', json={'ids': ids}).get_json()
+        assert [t['id'] for t in data['tracks']] == ids
+        assert data['tracks'][0]['features']['energy'] == 0.8
+        assert data['cached'] == 0
+        assert calls == {'tracks': 3, 'features': 2}
+
+        data = client.get('/tracks/batch?ids=' + ','.join(ids[:10])).get_json()
+        assert data['cached'] == 10
+        assert calls == {'tracks': 3, 'features': 2}
+
+
+def test_tracks_batch_returns_json_on_connection_errors():
+    """Un error de red en un trozo devuelve JSON 502, no la página 500 de Flask."""
+    from unittest.mock import patch
+    import requests
+    from spotify_live import app as spotify_app
+
+    spotify_app.TRACK_CACHE.clear()
+    spotify_app.FEATURES_CACHE.clear()
+
+    def failing(token, chunk):
+        raise requests.ConnectionError('connection refused')
+
+    client = spotify_app.app.test_client()
+    with client.session_transaction() as sess:
+        sess['token_info'] = {'access_token': 'test', 'expires_at': 9999999999}
+
+    with patch.object(spotify_app, '_fetch_tracks_chunk', failing), \
+            patch.object(spotify_app, '_fetch_features_chunk', failing):
+        response = client.get('/tracks/batch?ids=' + '1' * 22)
+    assert response.status_code == 502
+    assert response.get_json()['error'] == 'spotify_connection_error'
+
+
+class FakeOAuth:
+    """OAuth falso que cuenta renovaciones y tarda un poco en cada una."""
+
+    def __init__(self):
+        import threading
+        self.refreshes = 0
+        self.lock = threading.Lock()
+
+    def is_token_expired(self, token_info):
+        import time
+        return token_info['expires_at'] - time.time() < 60
+
+    def refresh_access_token(self, refresh_token):
+        import time
+        time.sleep(0.05)
+        with self.lock:
+            self.refreshes += 1
+            n = self.refreshes
+        return {'access_token': f'token-{n}', 'refresh_token': refresh_token,
+                'expires_at': int(time.time()) + 3600}
+
+
+def test_token_manager_serializes_refreshes():
+    """Verifica que peticiones paralelas con token expirado renuevan una sola vez."""
+    import threading
+    import time
+    from spotify_live.token_manager import TokenManager
+
+    oauth = FakeOAuth()
+    manager = TokenManager(oauth, poll_interval=3600)
+    sid = manager.new_session({'access_token': 'old', 'refresh_token': 'r',
+                               'expires_at': int(time.time()) - 10})
+
+    tokens = []
+    threads = [threading.Thread(target=lambda: tokens.append(manager.get_access_token(sid)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert oauth.refreshes == 1
+    assert set(tokens) == {'token-1'}
+    assert manager.get_access_token('sid-desconocido') is None
+
+
+def test_token_manager_refreshes_ahead_of_expiry():
+    """Verifica que un token por expirar se sirve sin esperar y se renueva en background."""
+    import time
+    from spotify_live.token_manager import TokenManager
+
+    oauth = FakeOAuth()
+    manager = TokenManager(oauth, refresh_margin=300, poll_interval=3600)
+    sid = manager.new_session({'access_token': 'current', 'refresh_token': 'r',
+                               'expires_at': int(time.time()) + 120})
+
+    assert manager.get_access_token(sid) == 'current'
+    deadline = time.time() + 2
+    while manager.get_access_token(sid) == 'current' and time.time() < deadline:
+        time.sleep(0.01)
+    assert manager.get_access_token(sid) == 'token-1'
+    assert oauth.refreshes == 1
+
+
+def test_track_index_prefix_search():
+    """Verifica búsqueda por prefijo, acentos y descarte de tracks antiguos."""
+    from spotify_live.search_index import TrackIndex
+
+    index = TrackIndex(max_tracks=2)
+    index.add({'id': '1', 'name': 'Bohemian Rhapsody', 'artists': 'Queen'})
+    index.add({'id': '2', 'name': 'Canción Animal', 'artists': 'Soda Stereo'})
+
+    assert [t['id'] for t in index.search('bohem rha')] == ['1']
+    assert [t['id'] for t in index.search('cancion')] == ['2']
+    assert [t['id'] for t in index.search('SODA st')] == ['2']
+    assert index.search('queen soda') == []
+
+    index.add({'id': '3', 'name': 'Bohemian Like You', 'artists': 'The Dandy Warhols'})
+    assert len(index) == 2
+    assert [t['id'] for t in index.search('bohemian')] == ['3']
+
+
+def test_suggest_prefers_local_index():
+    """Verifica que /suggest responde del índice y solo consulta Spotify si faltan resultados."""
+    from unittest.mock import patch
+    from spotify_live import app as spotify_app
+
+    spotify_app.index_tracks([
+        {'id': f'{i:022d}', 'name': f'Rainbow Song {i}', 'artists': 'Rainvow Band'}
+        for i in range(3)
+    ])
+    client = spotify_app.app.test_client()
+    with client.session_transaction() as sess:
+        sess['token_info'] = {'access_token': 'test', 'expires_at': 9999999999}
+
+    with patch.object(spotify_app, 'search_tracks') as search_tracks:
+        search_tracks.return_value = ([{'id': 'x', 'name': 'Zebra', 'artists': 'Z'}], False)
+
+        data = client.get('/suggest?q=rainb so').get_json()
+        assert data['source'] == 'local'
+        assert len(data['results']) == 3
+        search_tracks.assert_not_called()
+
+        data = client.get('/suggest?q=zebr').get_json()
+        assert data['source'] == 'spotify'
+        assert data['results'][0]['name'] == 'Zebra'
+
+
+def make_art_cache(tmp_path, max_bytes=10 * 1024 * 1024):
+    """Crea un ArtCache cuyo 'CDN' devuelve imágenes PNG generadas en memoria."""
+    import io
+    from unittest.mock import Mock
+    from PIL import Image
+    from spotify_live.art_cache import ArtCache
+
+    cache = ArtCache(directory=str(tmp_path), max_bytes=max_bytes)
+    downloads = []
+
+    def fake_get(url, timeout):
+        downloads.append(url)
+        image = Image.new('RGB', (640, 640), (200, 30, 30))
+        image.paste((20, 20, 220), (0, 0, 640, 160))
+        buffer = io.BytesIO()
+        image.save(buffer, 'PNG')
+        return Mock(content=buffer.getvalue(), raise_for_status=lambda: None)
+
+    cache._session = Mock(get=fake_get)
+    return cache, downloads
+
+
+def test_art_cache_variants_and_palette(tmp_path):
+    """Verifica miniaturas, ETag estable, descarga única y paleta dominante."""
+    import io
+    import pytest
+    from PIL import Image
+
+    cache, downloads = make_art_cache(tmp_path)
+    image_id = 'ab67616d0000b273' + 'a' * 24
+
+    data, mimetype, etag = cache.variant(image_id, 100, 'webp')
+    assert mimetype == 'image/webp'
+    assert Image.open(io.BytesIO(data)).size == (160, 160)
+    assert cache.variant(image_id, 160, 'webp')[2] == etag
+    assert cache.variant(image_id, 64, 'jpeg')[1] == 'image/jpeg'
+    assert len(downloads) == 1
+
+    assert cache.palette(image_id) == ['#c81e1e', '#1414dc']
+    with pytest.raises(ValueError):
+        cache.variant('../etc/passwd', 64)
+
+
+def test_art_cache_evicts_least_recently_used(tmp_path):
+    """Verifica que el LRU en disco respeta el límite de bytes."""
+    import os
+
+    def disk_usage():
+        return sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path))
+
+    cache, _ = make_art_cache(tmp_path)
+    first, second = 'a' * 40, 'b' * 40
+    cache.variant(first, 640, 'jpeg')
+    # Límite para poco más de una carátula con su variante
+    cache.max_bytes = int(disk_usage() * 1.5)
+    cache.variant(second, 640, 'jpeg')
+
+    assert disk_usage() <= cache.max_bytes
+    assert not (tmp_path / f'{first}.orig').exists()
+    assert (tmp_path / f'{second}_640.jpeg').exists()
+
+
+def test_art_route_supports_etag(tmp_path):
+    """Verifica que /art responde 304 cuando el cliente ya tiene la versión."""
+    from unittest.mock import patch
+    from spotify_live import app as spotify_app
+
+    cache, _ = make_art_cache(tmp_path)
+    client = spotify_app.app.test_client()
+    with patch.object(spotify_app, 'get_art_cache', return_value=cache):
+        response = client.get('/art/' + 'c' * 40 + '?size=64', headers={'Accept': 'image/webp'})
+        assert response.status_code == 200
+        assert response.mimetype == 'image/webp'
+        assert 'immutable' in response.headers['Cache-Control']
+
+        etag = response.headers['ETag']
+        again = client.get('/art/' + 'c' * 40 + '?size=64',
+                           headers={'Accept': 'image/webp', 'If-None-Match': etag})
+        assert again.status_code == 304
+
+    assert spotify_app.art_path('https://i.scdn.co/image/' + 'd' * 40) == '/art/' + 'd' * 40
+    assert spotify_app.art_path('https://example.com/x.jpg') is None
+
+
+def test_art_route_returns_502_for_non_image_upstream(tmp_path):
+    """Una respuesta del CDN que no es imagen da 502 y no deja locks de descarga."""
+    from unittest.mock import Mock, patch
+    from spotify_live import app as spotify_app
+
+    cache, _ = make_art_cache(tmp_path)
+    cache._session = Mock(get=lambda url, timeout: Mock(content=b'<html>error</html>',
+                                                        raise_for_status=lambda: None))
+    client = spotify_app.app.test_client()
+    with patch.object(spotify_app, 'get_art_cache', return_value=cache):
+        assert client.get('/art/' + 'e' * 40).status_code == 502
+        response = client.get('/art/' + 'e' * 40 + '/palette')
+        assert response.status_code == 502
+        assert response.get_json()['error'] == 'art_decode_error'
+    assert cache._fetch_locks == {}
+
+
 if __name__ == "__main__":
     # Ejecutar tests manualmente
     print("Ejecutando tests de Spotify Live...")
@@ -0,0 +1,94 @@
+"""
+Tests para las librerías JS locales con hash y precomprimidas (static_assets.py).
+"""
+import gzip
+import sys
+from pathlib import Path
+
+# Agregar el directorio raíz al path para importar módulos
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import static_assets  # noqa: E402
+from static_assets import StaticAssets, accepted_encodings, build_assets  # noqa: E402
+
+SOCKET_IO = static_assets.VENDOR_ASSETS['socket.io.min.js']
+
+
+def make_vendor(tmp_path, content=b'console.log("socket.io");\n' * 200):
+    vendor = tmp_path / 'vendor'
+    vendor.mkdir(exist_ok=True)
+    (vendor / 'socket.io.min.js').write_bytes(content)
+    return vendor
+
+
+def test_build_genera_hash_y_variantes(tmp_path):
+    vendor = make_vendor(tmp_path)
+    dist = tmp_path / 'dist'
+    manifest = build_assets(vendor, dist)
+
+    hashed = manifest['socket.io.min.js']
+    assert hashed.startswith('socket.io.min.') and hashed.endswith('.js')
+    data = (vendor / 'socket.io.min.js').read_bytes()
+    assert (dist / hashed).read_bytes() == data
+    assert gzip.decompress((dist / (hashed + '.gz')).read_bytes()) == data
+
+    # Otro contenido: otro nombre, y la versión anterior se elimina
+    make_vendor(tmp_path, b'console.log("v2");\n' * 200)
+    new = build_assets(vendor, dist)['socket.io.min.js']
+    assert new != hashed
+    assert not (dist / hashed).exists() and (dist / new).exists()
+
+
+def test_url_local_o_cdn(tmp_path):
+    assets = StaticAssets(dist=str(tmp_path / 'no_existe'))
+    assert assets.url('socket.io.min.js') == SOCKET_IO
+    assert assets.rewrite_html(f'<script src="{SOCKET_IO}">') == f'<script src="{SOCKET_IO}">'
+
+    dist = tmp_path / 'dist'
+    manifest = build_assets(make_vendor(tmp_path), dist)
+    assets = StaticAssets(dist=str(dist))
+    local = '/assets/' + manifest['socket.io.min.js']
+    assert assets.url('socket.io.min.js') == local
+    assert assets.rewrite_html(f'<script src="{SOCKET_IO}">') == f'<script src="{local}">'
+
+
+def test_missing_lista_las_librerias_sin_copia_local(tmp_path):
+    assert StaticAssets(dist=str(tmp_path / 'no_existe')).missing() == \
+        list(static_assets.VENDOR_ASSETS)
+    build_assets(make_vendor(tmp_path), tmp_path / 'dist')
+    missing = StaticAssets(dist=str(tmp_path / 'dist')).missing()
+    assert 'socket.io.min.js' not in missing and 'p5.min.js' in missing
+
+
+def test_resolve_negocia_codificacion(tmp_path):
+    dist = tmp_path / 'dist'
+    hashed = build_assets(make_vendor(tmp_path), dist)['socket.io.min.js']
+    assets = StaticAssets(dist=str(dist))
+
+    path, encoding = assets.resolve(hashed, 'gzip, deflate, br')
+    expected = 'br' if static_assets.BROTLI_AVAILABLE else 'gzip'
+    assert encoding == expected and path.endswith('.br' if expected == 'br' else '.gz')
+    assert assets.resolve(hashed, 'gzip;q=0, identity') == (str(dist / hashed), None)
+    assert assets.resolve('socket.io.min.js', 'gzip') is None
+    assert assets.resolve('../manifest.json', 'gzip') is None
+
+    assert accepted_encodings('br;q=0.5, gzip;q=0, *') == {'br', '*'}
+
+
+def test_ruta_de_assets_del_dashboard(tmp_path, monkeypatch):
+    """La ruta /assets de dashboard.py con caché inmutable y Vary."""
+    import dashboard
+
+    dist = tmp_path / 'dist'
+    hashed = build_assets(make_vendor(tmp_path), dist)['socket.io.min.js']
+    monkeypatch.setattr(dashboard, 'assets', StaticAssets(dist=str(dist)))
+    client = dashboard.app.test_client()
+
+    response = client.get(f'/assets/{hashed}', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'immutable' in response.headers['Cache-Control']
+    assert 'max-age=31536000' in response.headers['Cache-Control']
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data).startswith(b'console.log')
+    assert client.get('/assets/otro.js').status_code == 404
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""Contenedor compacto para timelapses de capturas de pantalla.
+
+Guardar cada captura de un timelapse como PNG completo desperdicia casi
+todo el espacio: en un escritorio la mayoría de las capturas son iguales
+a la anterior o cambian en una zona pequeña (un reloj, una terminal).
+Este módulo guarda el timelapse en un único archivo .tlx:
+
+    - Cada captura se divide en bloques (tiles) de TILE x TILE píxeles y se
+      compara con la anterior; si ningún bloque cambió no se guarda nada
+    - Si cambian pocos bloques se guarda un delta: índices de los bloques
+      cambiados y sus píxeles comprimidos con zlib
+    - Cada KEYFRAME_INTERVAL capturas guardadas (o si cambió más de la
+      mitad de la pantalla) se guarda la captura completa (keyframe)
+
+Cualquier captura se reconstruye desde el keyframe anterior aplicando
+los deltas; leyendo en orden cada captura cuesta solo su delta.
+
+Formato (little-endian, solo se agregan datos al final; si el proceso se
+corta, el lector ignora el último registro incompleto):
+    Cabecera:  b'TLX1', tile (H)
+    Registro:  tipo (B: 0 keyframe, 1 delta), tiempo (d), ancho (I),
+               alto (I), bloques (I), bytes (I), datos zlib
+               keyframe: píxeles RGB del cuadro (alto redondeado a bloques)
+               delta:    índices uint32 de los bloques + sus píxeles
+
+Uso:
+    python3 timelapse_store.py info screenshots/timelapse_dia_1700000000.tlx
+    python3 timelapse_store.py extract screenshots/timelapse_dia_1700000000.tlx --index 120 --out f.png
+    python3 timelapse_store.py extract screenshots/timelapse_dia_1700000000.tlx --all --out frames/
+"""
+
+import argparse
+import bisect
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+
+MAGIC = b'TLX1'
+HEADER = struct.Struct('<4sH')
+RECORD = struct.Struct('<BdIIII')
+KEYFRAME, DELTA = 0, 1
+TILE = 32
+KEYFRAME_INTERVAL = 300  # Capturas guardadas entre keyframes
+KEYFRAME_CHANGE_RATIO = 0.5  # Con más bloques cambiados, un keyframe sale más barato
+ZLIB_LEVEL = 3
+STORE_MAX_PENDING = 8
+
+
+def _padded(frame, tile):
+    """Cuadro con alto y ancho redondeados hacia arriba a múltiplos de `tile`."""
+    h, w = frame.shape[:2]
+    ph, pw = -h % tile, -w % tile
+    if ph or pw:
+        frame = np.pad(frame, ((0, ph), (0, pw), (0, 0)))
+    return np.ascontiguousarray(frame)
+
+
+def _tiles(frame, tile):
+    """Vista (filas, columnas, tile, tile, 3) de un cuadro ya redondeado."""
+    h, w = frame.shape[:2]
+    return frame.reshape(h // tile, tile, w // tile, tile, 3).swapaxes(1, 2)
+
+
+class TimelapseWriter:
+    """Escribe capturas en un contenedor .tlx descartando las repetidas.
+
+    Args:
+        path: Archivo de salida (se crea o se sobrescribe)
+        tile: Tamaño de bloque en píxeles
+        keyframe_interval: Capturas guardadas entre keyframes
+        threshold: Diferencia máxima por canal (0-255) para considerar un
+            bloque sin cambios; 0 = sin pérdidas
+        level: Nivel de compresión zlib
+        max_pending: Capturas en cola para el thread escritor
+
+    Example:
+        >>> store = TimelapseWriter('screenshots/timelapse_dia.tlx').start()
+        >>> store.submit(frame)
+        True
+        >>> store.close()
+    """
+
+    def __init__(self, path, tile=TILE, keyframe_interval=KEYFRAME_INTERVAL, threshold=0,
+                 level=ZLIB_LEVEL, max_pending=STORE_MAX_PENDING):
+        self.path = path
+        self.tile = tile
+        self.keyframe_interval = keyframe_interval
+        self.threshold = threshold
+        self.level = level
+        self.received = 0
+        self.keyframes = 0
+        self.deltas = 0
+        self.unchanged = 0
+        self.dropped = 0
+        self.bytes_written = HEADER.size
+        self.raw_bytes = 0
+        self._reference = None  # Último cuadro tal como lo reconstruye el lector
+        self._size = None
+        self._since_key = 0
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, tile))
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+
+    def start(self):
+        """Inicia el thread escritor para usar submit()."""
+        self._thread = threading.Thread(target=self._run, name='timelapse-writer', daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, frame, t=None):
+        """Encola una captura sin bloquear.
+
+        Returns:
+            bool: False si la cola estaba llena y la captura se descartó
+        """
+        try:
+            self._queue.put_nowait((frame, time.time() if t is None else t))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self.add(*item)
+
+    def add(self, frame, t=None):
+        """Compara y guarda una captura (en el thread que llama).
+
+        Args:
+            frame: Array RGB (alto, ancho, 3) uint8
+            t: Tiempo de la captura (time.time() por defecto)
+
+        Returns:
+            str: 'keyframe', 'delta' o 'unchanged'
+        """
+        t = time.time() if t is None else t
+        h, w = frame.shape[:2]
+        self.received += 1
+        self.raw_bytes += h * w * 3
+        current = _padded(np.asarray(frame, dtype=np.uint8), self.tile)
+        reference = self._reference
+        if reference is None or reference.shape != current.shape or (h, w) != self._size \
+                or self._since_key >= self.keyframe_interval:
+            return self._write_keyframe(current, t, h, w)
+
+        ref_tiles, cur_tiles = _tiles(reference, self.tile), _tiles(current, self.tile)
+        if self.threshold:
+            diff = np.abs(cur_tiles.astype(np.int16) - ref_tiles)
+            changed = (diff > self.threshold).any(axis=(2, 3, 4))
+        else:
+            changed = (cur_tiles != ref_tiles).any(axis=(2, 3, 4))
+        count = int(changed.sum())
+        if count == 0:
+            self.unchanged += 1
+            return 'unchanged'
+        if count > changed.size * KEYFRAME_CHANGE_RATIO:
+            return self._write_keyframe(current, t, h, w)
+
+        indices = np.flatnonzero(changed).astype('<u4')
+        pixels = cur_tiles[changed]  # (n, tile, tile, 3), copia solo lo cambiado
+        ref_tiles[changed] = pixels  # El lector verá estos bloques (también con threshold)
+        self._write(DELTA, t, w, h, count, indices.tobytes() + pixels.tobytes())
+        self.deltas += 1
+        self._since_key += 1
+        return 'delta'
+
+    def _write_keyframe(self, current, t, h, w):
+        self._reference = current.copy()
+        self._size = (h, w)
+        self._write(KEYFRAME, t, w, h, 0, current.tobytes())
+        self.keyframes += 1
+        self._since_key = 0
+        return 'keyframe'
+
+    def _write(self, kind, t, w, h, tiles, raw):
+        data = zlib.compress(raw, self.level)
+        self._file.write(RECORD.pack(kind, t, w, h, tiles, len(data)))
+        self._file.write(data)
+        self._file.flush()
+        self.bytes_written += RECORD.size + len(data)
+
+    def close(self, timeout=30.0):
+        """Escribe lo pendiente y cierra el archivo."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+        self._file.close()
+
+    def stats(self):
+        stored = self.keyframes + self.deltas
+        return {'received': self.received, 'stored': stored, 'keyframes': self.keyframes,
+                'deltas': self.deltas, 'unchanged': self.unchanged, 'dropped': self.dropped,
+                'bytes': self.bytes_written,
+                'ratio': round(self.raw_bytes / self.bytes_written, 1) if stored else None}
+
+
+class TimelapseReader:
+    """Lee un contenedor .tlx y reconstruye cualquier captura guardada.
+
+    Al abrir solo se leen las cabeceras de los registros (saltando los
+    datos), así que abrir un timelapse de un día entero es inmediato.
+
+    Args:
+        path: Archivo .tlx
+
+    Example:
+        >>> reader = TimelapseReader('screenshots/timelapse_dia.tlx')
+        >>> frame = reader.frame(len(reader) - 1)   # Última captura
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        magic, self.tile = HEADER.unpack(self._file.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path}: no es un timelapse .tlx")
+        self.records = []  # (tipo, tiempo, ancho, alto, bloques, offset de datos, bytes)
+        self._keyframes = []  # Índices de los keyframes
+        size = os.fstat(self._file.fileno()).st_size
+        offset = HEADER.size
+        while offset + RECORD.size <= size:
+            self._file.seek(offset)
+            kind, t, w, h, tiles, length = RECORD.unpack(self._file.read(RECORD.size))
+            if offset + RECORD.size + length > size:
+                break  # Registro cortado (proceso interrumpido)
+            if kind == KEYFRAME:
+                self._keyframes.append(len(self.records))
+            elif not self._keyframes:
+                break  # Delta sin keyframe: archivo dañado
+            self.records.append((kind, t, w, h, tiles, offset + RECORD.size, length))
+            offset += RECORD.size + length
+        self._cache = None  # (índice, cuadro redondeado) del último cuadro reconstruido
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def times(self):
+        return [r[1] for r in self.records]
+
+    def index_at(self, t):
+        """Índice de la captura visible en el instante t (la última guardada antes)."""
+        return max(0, bisect.bisect_right(self.times, t) - 1)
+
+    def _payload(self, record):
+        self._file.seek(record[5])
+        return zlib.decompress(self._file.read(record[6]))
+
+    def frame(self, index):
+        """Reconstruye la captura `index` como array RGB (alto, ancho, 3) uint8."""
+        if not 0 <= index < len(self.records):
+            raise IndexError(index)
+        key = self._keyframes[bisect.bisect_right(self._keyframes, index) - 1]
+        if self._cache is not None and key <= self._cache[0] <= index:
+            start, current = self._cache
+            current = current.copy()
+        else:
+            start, current = key, None
+        tile = self.tile
+        for i in range(start if current is None else start + 1, index + 1):
+            kind, _, w, h, tiles, _, _ = record = self.records[i]
+            data = self._payload(record)
+            if kind == KEYFRAME:
+                ph, pw = h + (-h % tile), w + (-w % tile)
+                current = np.frombuffer(data, dtype=np.uint8).reshape(ph, pw, 3).copy()
+            else:
+                indices = np.frombuffer(data, dtype='<u4', count=tiles)
+                pixels = np.frombuffer(data, dtype=np.uint8, offset=tiles * 4)
+                # reshape() de la vista de bloques copiaría: se indexa por fila y columna
+                rows, cols = np.divmod(indices, current.shape[1] // tile)
+                _tiles(current, tile)[rows, cols] = pixels.reshape(tiles, tile, tile, 3)
+        self._cache = (index, current)
+        _, _, w, h = self.records[index][:4]
+        return current[:h, :w]
+
+    def __iter__(self):
+        for i in range(len(self.records)):
+            yield self.frame(i)
+
+    def close(self):
+        self._file.close()
+
+
+def export_frame(frame, path):
+    """Guarda una captura reconstruida como imagen (formato según la extensión)."""
+    from PIL import Image
+    Image.fromarray(np.ascontiguousarray(frame)).save(path)
+
+
+def cmd_info(args):
+    reader = TimelapseReader(args.path)
+    if not len(reader):
+        print("Timelapse vacío")
+        return 0
+    keyframes = sum(1 for r in reader.records if r[0] == KEYFRAME)
+    _, first, w, h = reader.records[0][:4]
+    raw = sum(r[2] * r[3] * 3 for r in reader.records)
+    size = os.path.getsize(args.path)
+    print(f"{len(reader)} capturas ({keyframes} keyframes), {w}x{h}, "
+          f"{(reader.times[-1] - first) / 60:.1f} min")
+    print(f"{size / 1e6:.1f} MB en disco, {raw / 1e6:.1f} MB sin comprimir "
+          f"({raw / size:.0f}x)")
+    return 0
+
+
+def cmd_extract(args):
+    reader = TimelapseReader(args.path)
+    if args.all:
+        os.makedirs(args.out, exist_ok=True)
+        for i, frame in enumerate(reader):
+            export_frame(frame, os.path.join(args.out, f"frame_{i:05d}.png"))
+        print(f"{len(reader)} capturas en {args.out}")
+        return 0
+    index = reader.index_at(args.time) if args.time is not None else args.index
+    if index < 0:
+        index += len(reader)
+    export_frame(reader.frame(index), args.out)
+    print(f"Captura {index} -> {args.out}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Timelapses compactos de capturas de pantalla")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('info', help="Resumen del timelapse")
+    p.add_argument('path')
+    p.set_defaults(func=cmd_info)
+
+    p = sub.add_parser('extract', help="Reconstruir capturas como PNG")
+    p.add_argument('path')
+    which = p.add_mutually_exclusive_group()
+    which.add_argument('--index', type=int, default=-1, help="Índice (negativo desde el final)")
+    which.add_argument('--time', type=float, help="Captura visible en este timestamp Unix")
+    which.add_argument('--all', action='store_true', help="Todas las capturas a un directorio")
+    p.add_argument('--out', required=True, help="Archivo (o directorio con --all)")
+    p.set_defaults(func=cmd_extract)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError, IndexError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
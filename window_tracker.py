@@ -0,0 +1,112 @@
+"""Seguimiento de la ventana activa con el título en caché.
+
+Consultar al sistema de ventanas (pygetwindow) cuesta milisegundos y en
+algunos sistemas bastante más. En lugar de hacerlo en cada pulsación de
+tecla o clic, un único thread consulta la ventana activa cada
+WINDOW_POLL_INTERVAL segundos y guarda el título; los handlers de
+teclado y ratón solo leen ese valor.
+
+Lo comparten hydra_observer.py (que llama a refresh() desde una tarea
+de su event loop en lugar de usar el thread) y dashboard.py.
+
+Uso:
+    >>> from window_tracker import tracker
+    >>> tracker.start()
+    >>> tracker.title()
+    'README.md - Visual Studio Code'
+"""
+
+import sys
+import threading
+import time
+
+from capabilities import OptionalModule
+
+# pygetwindow solo funciona en Windows y macOS (en el resto lanza
+# NotImplementedError al importarse); se importa en la primera consulta
+gw = OptionalModule('pygetwindow', errors=(ImportError, NotImplementedError))
+WINDOW_TRACKING = gw.installed and sys.platform in ('win32', 'darwin')
+
+WINDOW_POLL_INTERVAL = 0.25  # Segundos entre consultas del thread
+
+
+def query_active_window():
+    """Consulta el título de la ventana activa al sistema (lento).
+
+    Returns:
+        str or None: Título, o None si no se puede obtener
+    """
+    if not WINDOW_TRACKING or not gw.available:
+        return None
+    try:
+        win = gw.getActiveWindow()
+        if win:
+            return win.title
+    except Exception:
+        # pygetwindow lanza errores distintos según la plataforma
+        pass
+    return None
+
+
+class WindowTracker:
+    """Título de la ventana activa, actualizado por un thread en background.
+
+    Args:
+        poll_interval: Segundos entre consultas del thread
+        query: Función que devuelve el título actual (por defecto pygetwindow)
+    """
+
+    def __init__(self, poll_interval=WINDOW_POLL_INTERVAL, query=query_active_window):
+        self.poll_interval = poll_interval
+        self.query = query
+        self._state = (None, float('-inf'))  # (título, time.monotonic() de la consulta)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Inicia el thread de consulta (idempotente)."""
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='window-tracker', daemon=True)
+        self.refresh()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Detiene el thread de consulta."""
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(self.poll_interval * 2)
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self.refresh()
+
+    def refresh(self):
+        """Consulta la ventana activa ahora y actualiza el valor guardado."""
+        title = self.query()
+        # Reemplazar la tupla entera es atómico: los lectores no necesitan lock
+        self._state = (title, time.monotonic())
+        return title
+
+    def title(self):
+        """Título de la ventana activa desde la caché (None antes de la primera consulta).
+
+        Nunca consulta al sistema, aunque el valor esté viejo: solo lo
+        actualizan refresh() periódico (el thread o la tarea de quien lo use)
+        y age() dice cuánto tiene.
+        """
+        return self._state[0]
+
+    def age(self):
+        """Segundos desde la última consulta."""
+        return time.monotonic() - self._state[1]
+
+
+# Instancia compartida por hydra_observer y dashboard
+tracker = WindowTracker()